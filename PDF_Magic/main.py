@@ -5,10 +5,12 @@
 
 import sys
 import os
+import time
 import logging
 from datetime import datetime
-from PyQt5.QtWidgets import QApplication
-from src.ui.main_window import PDFMagicApp
+
+# Startzeitpunkt für die Messung der Startzeit (siehe auch: python -X importtime main.py)
+START_TIME = time.perf_counter()
 
 def setup_logging():
     """
@@ -37,7 +39,22 @@ def setup_logging():
 def main():
     """
     Hauptfunktion zum Starten der Anwendung.
+    Mit 'convert', 'merge', 'batch', 'sync', 'pipe', 'watch' oder 'serve' als erstem Argument wird die Kommandozeile ohne Oberfläche gestartet.
     """
+    if len(sys.argv) > 1 and sys.argv[1] in ('convert', 'merge', 'batch', 'sync', 'pipe', 'watch', 'serve'):
+        from src.cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+
+    # Läuft bereits eine Instanz, übernimmt sie die Dateien und dieser Prozess endet sofort
+    from src.single_instance import SingleInstanceServer, send_to_running_instance
+    files = [arg for arg in sys.argv[1:] if arg.lower().endswith('.pdf')]
+    if send_to_running_instance(files):
+        sys.exit(0)
+
+    # Qt-Widgets erst hier importieren, damit die Kommandozeile ohne PyQt5 läuft
+    from PyQt5.QtWidgets import QApplication
+    from src.ui.main_window import PDFMagicApp
+
     try:
         # Logging einrichten
         setup_logging()
@@ -51,8 +68,15 @@ def main():
         # Hauptfenster erstellen
         window = PDFMagicApp()
         window.show()
+
+        # Dateien späterer Starts in die Warteschlange dieser Instanz übernehmen
+        instance_server = SingleInstanceServer(parent=window)
+        instance_server.filesReceived.connect(window.receive_files)
+        instance_server.start()
+        window.receive_files(files)
         
-        logging.info("PDF Magic wurde erfolgreich gestartet")
+        startup_ms = (time.perf_counter() - START_TIME) * 1000
+        logging.info(f"PDF Magic wurde erfolgreich gestartet ({startup_ms:.0f} ms bis zum Fenster)")
         
         # Anwendung ausführen
         sys.exit(app.exec_())
@@ -0,0 +1,629 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# cli.py
+# Kommandozeile für die Stapelkonvertierung ohne grafische Oberfläche (ohne PyQt5)
+
+import os
+import sys
+import glob
+import json
+import shutil
+import logging
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from src.core.engine import convert_job, convert_pdf_bytes, scan_pdf
+from src.core.framing import FRAME_ERROR, FRAME_OK, read_frame, write_response
+from src.core.metrics import create_run_record, get_time_model, order_by_predicted_duration
+from src.core.diskspace import DiskSpaceReservation, estimate_output_size
+from src.core.paths import (IF_EXISTS_POLICIES, OutputPathAllocator, atomic_write, output_files,
+                            resolve_output_path, resolve_output_targets)
+from src.core.writers import WRITERS
+from src.core.zipwriter import COMPRESSION_POLICIES
+from src.core.archive import ARCHIVE_FORMATS, ArchiveWriter, archive_format_for, convert_to_archive
+from src.core.watcher import FolderWatcher
+from src.core.batch import convert_tasks
+from src.core.executors import discard_pending
+from src.core.merge import merge_pdfs_to_docx
+from src.core.ocr import create_ocr_budget, default_ocr_cpus, find_tesseract, set_ocr_budget
+from src.core.errors import ConversionError
+from src.core.manifest import ResultManifest, iter_manifest_tasks, load_completed_rows
+from src.core.sync import sync_tree
+from src.core.volumes import VOLUME_INDEX_SUFFIX, volume_template
+from src.core.service import ConversionService
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_DISK_FULL = 3
+
+def iter_input_files(inputs: List[str], recursive: bool = False) -> Iterator[str]:
+    """
+    Löst Dateien, Glob-Muster und Verzeichnisse in PDF-Pfade auf.
+
+    Args:
+        inputs: Angaben von der Kommandozeile
+        recursive: Verzeichnisse rekursiv durchsuchen
+
+    Yields:
+        str: Pfad einer PDF-Datei (jede Datei nur einmal)
+    """
+    seen = set()
+
+    def accept(path: str) -> bool:
+        key = os.path.normcase(os.path.abspath(path))
+        if key in seen:
+            return False
+        seen.add(key)
+        return True
+
+    for item in inputs:
+        if os.path.isdir(item):
+            if recursive:
+                for root, _, files in os.walk(item):
+                    for name in sorted(files):
+                        path = os.path.join(root, name)
+                        if name.lower().endswith('.pdf') and accept(path):
+                            yield path
+            else:
+                with os.scandir(item) as entries:
+                    for entry in sorted(entries, key=lambda e: e.name):
+                        if entry.is_file() and entry.name.lower().endswith('.pdf') and accept(entry.path):
+                            yield entry.path
+        elif glob.has_magic(item):
+            for path in sorted(glob.glob(item, recursive=recursive)):
+                if os.path.isfile(path) and accept(path):
+                    yield path
+        elif accept(item):
+            # Nicht existierende Dateien werden als Fehler gemeldet
+            yield item
+
+
+def parse_formats(value: str) -> List[str]:
+    """Wertet eine kommagetrennte Liste von Ausgabeformaten aus (z.B. "docx,txt")."""
+    formats = [item.strip().lower() for item in value.split(",") if item.strip()]
+    unknown = [item for item in formats if item not in WRITERS]
+    if not formats or unknown:
+        raise argparse.ArgumentTypeError(
+            f"Unbekanntes Format: {', '.join(unknown) or value} (erlaubt: {', '.join(WRITERS)})")
+    return list(dict.fromkeys(formats))
+
+
+def parse_client_weight(value: str) -> Tuple[str, float]:
+    """Wertet eine Angabe CLIENT=GEWICHT aus; das Gewicht muss eine positive Zahl sein."""
+    client_id, separator, weight_text = value.partition("=")
+    try:
+        weight = float(weight_text)
+    except ValueError:
+        weight = 0.0
+    if not separator or not client_id or not weight > 0 or weight == float("inf"):
+        raise argparse.ArgumentTypeError(f"Ungültiges Gewicht: {value} (erwartet CLIENT=GEWICHT mit GEWICHT > 0)")
+    return client_id, weight
+
+
+class ProgressPrinter:
+    """Schreibt maschinenlesbare Fortschrittsereignisse als JSON-Lines auf stdout"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def emit(self, event: str, **fields):
+        """Schreibt ein Ereignis als eine JSON-Zeile."""
+        self.stream.write(json.dumps({"event": event, **fields}, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+
+def run_convert(args: argparse.Namespace) -> int:
+    """Führt den Befehl 'convert' aus und gibt den Exit-Code zurück."""
+    if args.archive:
+        return run_convert_to_archive(args)
+    printer = ProgressPrinter()
+    volumes = bool(args.volume_pages or args.volume_mb)
+    if volumes and args.formats != ["docx"]:
+        printer.emit("error", message="--volume-pages/--volume-mb unterstützen nur das Format docx")
+        return EXIT_FAILED
+    if volumes and args.images:
+        printer.emit("error", message="--images kann nicht mit --volume-pages/--volume-mb kombiniert werden")
+        return EXIT_FAILED
+    if args.ocr:
+        if volumes:
+            printer.emit("error", message="--ocr kann nicht mit --volume-pages/--volume-mb kombiniert werden")
+            return EXIT_FAILED
+        try:
+            find_tesseract()
+        except ConversionError as e:
+            printer.emit("error", message=str(e))
+            return EXIT_FAILED
+    output_dir = args.output_dir
+    os.makedirs(output_dir, exist_ok=True)
+    # Unveränderte Ausgaben sollen an ihrem Platz bleiben, statt umbenannte Kopien zu erzeugen
+    if_exists = "overwrite" if args.skip_identical else args.if_exists
+
+    pdf_files = list(iter_input_files(args.inputs, args.recursive))
+    file_infos = {path: scan_pdf(path) for path in pdf_files}
+    time_model = get_time_model()
+    predictions = {path: time_model.predict(info["size"], info["pages"], producer=info["producer"])
+                   for path, info in file_infos.items()}
+    if args.jobs > 1:
+        # Bei mehreren Workern verkürzen lange Aufträge am Anfang die Gesamtdauer
+        pdf_files = order_by_predicted_duration(pdf_files, predictions, longest_first=True)
+
+    reservation = DiskSpaceReservation(output_dir)
+    for path, info in file_infos.items():
+        reservation.reserve(path, estimate_output_size(info["pages"], text_density=time_model.text_density))
+    error_msg = reservation.check_batch()
+    if error_msg:
+        printer.emit("disk_full", message=error_msg)
+        return EXIT_DISK_FULL
+
+    printer.emit("start", total=len(pdf_files), jobs=args.jobs, output_dir=output_dir)
+    allocator = OutputPathAllocator(output_dir)
+    counts = {"ok": 0, "failed": 0, "skipped": 0, "unchanged": 0}
+    exit_code = EXIT_OK
+    job_options = (args.skip_identical, args.compression, args.volume_pages, args.volume_mb,
+                   args.images, args.max_image_px, args.ocr, args.ocr_lang, if_exists)
+    pool_options = {}
+    if args.ocr:
+        # Gemeinsames CPU-Budget, damit die Texterkennung die übrigen Konvertierungen nicht verdrängt
+        budget = create_ocr_budget(args.ocr_cpus or default_ocr_cpus(args.jobs))
+        if args.jobs <= 1:
+            set_ocr_budget(budget)
+        else:
+            pool_options = {"initializer": set_ocr_budget, "initargs": (budget,)}
+
+    def resolve_targets(pdf_path: str):
+        if volumes:
+            # Das Verzeichnis der Bände ist die eigentliche Ausgabe; die Bände belegt der Worker
+            return resolve_output_path(pdf_path, output_dir, if_exists, allocator, VOLUME_INDEX_SUFFIX)
+        return resolve_output_targets(pdf_path, output_dir, if_exists, allocator, args.formats)
+
+    def job_target(output_path):
+        return volume_template(output_path) if volumes else output_path
+
+    def finish(pdf_path: str, output_path: str, get_stats: Callable[[], dict]):
+        try:
+            stats = get_stats()
+        except Exception as e:
+            counts["failed"] += 1
+            allocator.release(output_path)
+            reservation.release(pdf_path)
+            printer.emit("error", input=pdf_path, output=output_path, message=str(e))
+            return
+        except BaseException:
+            # Abbruch, z.B. per Strg+C: den belegten Namen nicht leer zurücklassen
+            allocator.release(output_path)
+            raise
+        counts["ok"] += 1
+        if stats["unchanged"]:
+            counts["unchanged"] += 1
+        written = stats.get("outputs") or output_files(output_path)
+        reservation.release(pdf_path, sum(os.path.getsize(path) for path in written))
+        time_model.observe(create_run_record(file_infos[pdf_path]["size"], stats["pages"],
+                                             stats["text_chars"], stats["producer"], stats["duration"]))
+        extra = {"volumes": len(written) - 1} if "index" in stats else {}
+        if stats.get("ocr_pages"):
+            extra["ocr_pages"] = stats["ocr_pages"]
+        printer.emit("done", input=pdf_path, output=stats.get("index", output_path), pages=stats["pages"],
+                     page_kinds=stats["page_kinds"], duration=round(stats["duration"], 3),
+                     warnings=stats["warnings"], unchanged=stats["unchanged"], **extra)
+
+    def submit_all(submit) -> bool:
+        for pdf_path in pdf_files:
+            error_msg = reservation.ensure_available(pdf_path)
+            if error_msg:
+                printer.emit("disk_full", input=pdf_path, message=error_msg)
+                return False
+            output_path = resolve_targets(pdf_path)
+            if output_path is None:
+                counts["skipped"] += 1
+                reservation.release(pdf_path)
+                printer.emit("skipped", input=pdf_path, reason="exists")
+                continue
+            submit(pdf_path, output_path)
+        return True
+
+    if args.jobs <= 1:
+        completed = submit_all(lambda pdf_path, output_path: finish(
+            pdf_path, output_path, lambda: convert_job(pdf_path, job_target(output_path), *job_options)))
+    else:
+        executor = ProcessPoolExecutor(max_workers=args.jobs, **pool_options)
+        pending = {}
+
+        def submit(pdf_path: str, output_path: str):
+            # Anzahl offener Aufträge begrenzen, damit riesige Batches keinen Speicher binden
+            while len(pending) >= args.jobs * 2:
+                drain(wait(pending, return_when=FIRST_COMPLETED).done)
+            future = executor.submit(convert_job, pdf_path, job_target(output_path), *job_options)
+            pending[future] = (pdf_path, output_path)
+
+        def drain(done_futures):
+            for future in done_futures:
+                pdf_path, output_path = pending.pop(future)
+                finish(pdf_path, output_path, future.result)
+
+        try:
+            completed = submit_all(submit)
+            drain(wait(pending).done)
+        finally:
+            # Nach einem Abbruch keine leeren Platzhalter offener Aufträge zurücklassen
+            discard_pending(executor, {future: output_path for future, (_, output_path) in pending.items()},
+                            allocator.release)
+
+    if not completed:
+        exit_code = EXIT_DISK_FULL
+    elif counts["failed"]:
+        exit_code = EXIT_FAILED
+    printer.emit("summary", total=len(pdf_files), **counts)
+    return exit_code
+
+
+def run_convert_to_archive(args: argparse.Namespace) -> int:
+    """Führt 'convert --archive' aus: alle Ergebnisse direkt in ein Archiv."""
+    to_stdout = args.archive == "-"
+    # Bei Ausgabe auf stdout trägt stdout das Archiv, Ereignisse gehen auf stderr
+    printer = ProgressPrinter(sys.stderr if to_stdout else None)
+    if args.formats != ["docx"]:
+        printer.emit("error", message="--archive unterstützt nur das Format docx")
+        return EXIT_FAILED
+    # Optionen für Dateien im Ausgabeverzeichnis; gleichnamige Einträge im Archiv werden immer umbenannt
+    unsupported = [option for option, used in (
+        (f"--if-exists {args.if_exists}", args.if_exists != "rename"),
+        ("--skip-identical", args.skip_identical),
+        ("--volume-pages/--volume-mb", bool(args.volume_pages or args.volume_mb))) if used]
+    if unsupported:
+        printer.emit("error", message=f"--archive kann nicht mit {', '.join(unsupported)} kombiniert werden")
+        return EXIT_FAILED
+    if args.ocr:
+        try:
+            find_tesseract()
+        except ConversionError as e:
+            printer.emit("error", message=str(e))
+            return EXIT_FAILED
+    archive_format = args.archive_format or ("zip" if to_stdout else archive_format_for(args.archive))
+    pdf_files = iter_input_files(args.inputs, args.recursive)
+    counts = {"ok": 0, "failed": 0}
+
+    def write_archive(stream):
+        archive = ArchiveWriter(stream, archive_format)
+        for result in convert_to_archive(pdf_files, archive, args.jobs, args.compression, args.images,
+                                         args.max_image_px, args.ocr, args.ocr_lang, args.ocr_cpus):
+            if result.ok:
+                counts["ok"] += 1
+                printer.emit("done", input=result.input_path, entry=result.output_path,
+                             pages=result.pages, duration=round(result.duration, 3), warnings=result.warnings)
+            else:
+                counts["failed"] += 1
+                printer.emit("error", input=result.input_path, message=result.error)
+        archive.close()
+
+    printer.emit("start", jobs=args.jobs, archive=args.archive, format=archive_format)
+    if to_stdout:
+        write_archive(sys.stdout.buffer)
+        sys.stdout.buffer.flush()
+    else:
+        # Über eine temporäre Datei, damit nie ein halbes Archiv zurückbleibt
+        def write_file(temp_path: str):
+            with open(temp_path, 'wb') as archive_file:
+                write_archive(archive_file)
+        atomic_write(args.archive, write_file)
+    printer.emit("summary", total=counts["ok"] + counts["failed"], **counts)
+    return EXIT_FAILED if counts["failed"] else EXIT_OK
+
+
+def run_merge(args: argparse.Namespace) -> int:
+    """Führt den Befehl 'merge' aus: alle PDFs in eine DOCX-Datei."""
+    printer = ProgressPrinter()
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    def on_source(pdf_path: str, result: Optional[dict], error: Optional[str]):
+        if error:
+            printer.emit("error", input=pdf_path, message=error)
+        else:
+            printer.emit("done", input=pdf_path, pages=result["pages"],
+                         duration=round(result["duration"], 3), warnings=result["warnings"])
+
+    printer.emit("start", output=args.output, jobs=args.jobs)
+    try:
+        stats = merge_pdfs_to_docx(iter_input_files(args.inputs, args.recursive), args.output,
+                                   jobs=args.jobs, skip_errors=args.skip_errors,
+                                   compression=args.compression, on_source=on_source)
+    except (ConversionError, OSError) as e:
+        printer.emit("error", output=args.output, message=str(e))
+        return EXIT_FAILED
+    printer.emit("summary", output=args.output, **stats)
+    return EXIT_FAILED if stats["failed"] else EXIT_OK
+
+
+def run_batch(args: argparse.Namespace) -> int:
+    """Führt den Befehl 'batch' aus: Konvertierung gemäß CSV-/JSONL-Manifest."""
+    printer = ProgressPrinter()
+    os.makedirs(args.output_dir, exist_ok=True)
+    results_path = args.results or os.path.join(args.output_dir, "results.jsonl")
+
+    completed = None
+    if args.resume:
+        completed = load_completed_rows(results_path, args.retry_failed)
+        printer.emit("resume", completed_through=completed[0], completed_after=len(completed[1]),
+                     retry=len(completed[2]))
+
+    allocator = OutputPathAllocator(args.output_dir)
+    # Das Manifest wird erst beim Durchlaufen gelesen, der Speicherbedarf bleibt konstant
+    tasks = iter_manifest_tasks(args.manifest, args.output_dir, allocator, args.if_exists, completed)
+    counts = {"ok": 0, "failed": 0, "skipped": 0}
+    printer.emit("start", manifest=args.manifest, results=results_path, jobs=args.jobs)
+    try:
+        with ResultManifest(results_path, append=args.resume) as results:
+            for result in convert_tasks(tasks, args.jobs, allocator=allocator):
+                results.write(result)
+                counts[result.status] += 1
+                processed = sum(counts.values())
+                if processed % args.report_every == 0:
+                    printer.emit("progress", processed=processed, **counts)
+    except (ConversionError, OSError, ValueError) as e:
+        printer.emit("error", input=args.manifest, message=str(e))
+        return EXIT_FAILED
+    printer.emit("summary", total=sum(counts.values()), **counts)
+    return EXIT_FAILED if counts["failed"] else EXIT_OK
+
+
+def run_sync(args: argparse.Namespace) -> int:
+    """Führt den Befehl 'sync' aus: Eingabebaum inkrementell in den Ausgabebaum spiegeln."""
+    printer = ProgressPrinter()
+    try:
+        stats = sync_tree(args.input_dir, args.output_dir, jobs=args.jobs, formats=args.formats,
+                          use_hash=args.hash, delete=args.delete, state_path=args.state,
+                          compression=args.compression,
+                          on_event=printer.emit)
+    except (ConversionError, OSError) as e:
+        printer.emit("error", input=args.input_dir, message=str(e))
+        return EXIT_FAILED
+    printer.emit("summary", **stats)
+    return EXIT_FAILED if stats["failed"] else EXIT_OK
+
+
+def run_pipe(args: argparse.Namespace) -> int:
+    """
+    Führt den Befehl 'pipe' aus: PDF auf stdin, DOCX auf stdout.
+    Mit --framed werden beliebig viele Dokumente als längenpräfixierte Rahmen
+    (siehe src.core.framing) durch denselben Prozess geschleust.
+    """
+    # stdout trägt die DOCX-Daten, Ereignisse gehen daher auf stderr
+    printer = ProgressPrinter(sys.stderr)
+    stdin = sys.stdin.buffer
+    stdout = sys.stdout.buffer
+
+    if not args.framed:
+        start_time = time.monotonic()
+        try:
+            docx_data, stats = convert_pdf_bytes(stdin.read())
+        except Exception as e:
+            printer.emit("error", message=str(e))
+            return EXIT_FAILED
+        stdout.write(docx_data)
+        stdout.flush()
+        printer.emit("done", pages=stats["pages"], bytes=len(docx_data),
+                     duration=round(time.monotonic() - start_time, 3))
+        return EXIT_OK
+
+    counts = {"ok": 0, "failed": 0}
+    while True:
+        try:
+            pdf_data = read_frame(stdin)
+        except EOFError as e:
+            printer.emit("error", message=f"Unvollständiger Rahmen: {str(e)}")
+            return EXIT_FAILED
+        if pdf_data is None:
+            break
+        index = counts["ok"] + counts["failed"]
+        start_time = time.monotonic()
+        try:
+            docx_data, stats = convert_pdf_bytes(pdf_data)
+        except Exception as e:
+            counts["failed"] += 1
+            write_response(stdout, FRAME_ERROR, str(e).encode('utf-8'))
+            printer.emit("error", index=index, message=str(e))
+            continue
+        counts["ok"] += 1
+        write_response(stdout, FRAME_OK, docx_data)
+        printer.emit("done", index=index, pages=stats["pages"], bytes=len(docx_data),
+                     duration=round(time.monotonic() - start_time, 3))
+    printer.emit("summary", total=counts["ok"] + counts["failed"], **counts)
+    return EXIT_FAILED if counts["failed"] else EXIT_OK
+
+
+def run_watch(args: argparse.Namespace) -> int:
+    """Führt den Befehl 'watch' aus, bis er mit Strg+C beendet wird."""
+    printer = ProgressPrinter()
+    for directory in args.inbox:
+        if not os.path.isdir(directory):
+            printer.emit("error", input=directory, message="Eingangsordner existiert nicht")
+            return EXIT_FAILED
+    watcher = FolderWatcher(args.inbox, args.output_dir, done_dir=args.done_dir,
+                            failed_dir=args.failed_dir, jobs=args.jobs,
+                            stable_seconds=args.stable_seconds, poll_interval=args.poll_interval,
+                            force_polling=args.polling, on_event=printer.emit)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        printer.emit("stopped")
+    return EXIT_OK
+
+
+def run_serve(args: argparse.Namespace) -> int:
+    """Führt den Befehl 'serve' aus, bis er mit Strg+C beendet wird."""
+    from src.server import create_server
+
+    client_weights = dict(args.client_weight)
+    service = ConversionService(jobs=args.jobs, max_queue=args.max_queue,
+                                max_queue_per_client=args.max_queue_per_client,
+                                max_running_per_client=args.max_running_per_client,
+                                client_weights=client_weights, time_limit=args.timeout)
+    server = create_server(service, host=args.host, port=args.port, socket_path=args.socket,
+                           request_timeout=args.timeout, max_upload_mb=args.max_upload_mb)
+    address = args.socket or f"http://{args.host}:{args.port}"
+    logging.getLogger('ConversionService').warning(f"Konvertierungsdienst läuft auf {address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+        shutil.rmtree(server.work_dir, ignore_errors=True)
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+    return EXIT_OK
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Erstellt den Parser für die Kommandozeile."""
+    parser = argparse.ArgumentParser(prog="pdf-magic", description="PDF Magic - PDF zu DOCX Konverter")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = subparsers.add_parser("convert", help="PDF-Dateien ohne Oberfläche konvertieren")
+    convert_parser.add_argument("inputs", nargs="+", help="PDF-Dateien, Glob-Muster oder Verzeichnisse")
+    target_group = convert_parser.add_mutually_exclusive_group(required=True)
+    target_group.add_argument("-o", "--output-dir", help="Ausgabeverzeichnis")
+    target_group.add_argument("--archive", metavar="DATEI",
+                              help="Alle Ergebnisse in ein ZIP-/TAR-Archiv schreiben (.zip, .tar, .tar.gz; '-' für stdout)")
+    convert_parser.add_argument("-j", "--jobs", type=int, default=1,
+                                help="Anzahl paralleler Konvertierungsprozesse (Standard: 1)")
+    convert_parser.add_argument("--if-exists", choices=IF_EXISTS_POLICIES, default="rename",
+                                help="Verhalten bei bereits vorhandener Ausgabe (Standard: rename)")
+    convert_parser.add_argument("--skip-identical", action="store_true",
+                                help="Vorhandene Ausgaben nur ersetzen, wenn sich der Inhalt geändert hat "
+                                     "(Vergleich per SHA-256; impliziert --if-exists overwrite)")
+    convert_parser.add_argument("-f", "--format", dest="formats", type=parse_formats, default=["docx"],
+                                help="Ausgabeformate, kommagetrennt: docx, txt, md, html (Standard: docx). "
+                                     "Alle Formate entstehen aus einer einzigen Textextraktion")
+    convert_parser.add_argument("--compression", choices=COMPRESSION_POLICIES, default="default",
+                                help="DOCX-Kompression: store (keine, am schnellsten), fast, default oder max (Standard: default)")
+    convert_parser.add_argument("--images", action="store_true",
+                                help="Bilder übernehmen (wiederkehrende Bilder wie Logos nur einmal)")
+    convert_parser.add_argument("--max-image-px", type=int, metavar="PX",
+                                help="Bilder mit --images auf höchstens PX Pixel Kantenlänge verkleinern")
+    convert_parser.add_argument("--ocr", action="store_true",
+                                help="Seiten ohne Textebene (Scans) per tesseract erkennen; "
+                                     "Ergebnisse werden in ~/.pdf_magic/ocr_cache zwischengespeichert")
+    convert_parser.add_argument("--ocr-lang", metavar="SPRACHEN",
+                                help="tesseract-Sprachen für --ocr, z.B. deu oder deu+eng")
+    convert_parser.add_argument("--ocr-cpus", type=int, metavar="N",
+                                help="Höchstens N gleichzeitige OCR-Prozesse im ganzen Stapel "
+                                     "(Standard: CPUs minus --jobs, mindestens 1)")
+    convert_parser.add_argument("--volume-pages", type=int, metavar="N",
+                                help="Große PDFs in DOCX-Bände zu je N Seiten aufteilen (name_001.docx, ...)")
+    convert_parser.add_argument("--volume-mb", type=float, metavar="M",
+                                help="Neuen DOCX-Band beginnen, sobald der aktuelle M MB erreicht")
+    convert_parser.add_argument("--archive-format", choices=ARCHIVE_FORMATS,
+                                help="Archivformat (Standard: anhand der Endung, bei stdout zip)")
+    convert_parser.add_argument("-r", "--recursive", action="store_true",
+                                help="Verzeichnisse und **-Muster rekursiv durchsuchen")
+    convert_parser.set_defaults(func=run_convert)
+
+    merge_parser = subparsers.add_parser("merge", help="Mehrere PDFs zu einer DOCX-Datei zusammenführen")
+    merge_parser.add_argument("inputs", nargs="+", help="PDF-Dateien, Glob-Muster oder Verzeichnisse (in dieser Reihenfolge)")
+    merge_parser.add_argument("-o", "--output", required=True, help="Zu schreibende DOCX-Datei")
+    merge_parser.add_argument("-j", "--jobs", type=int, default=1,
+                              help="Anzahl paralleler Extraktionsprozesse (Standard: 1)")
+    merge_parser.add_argument("--compression", choices=COMPRESSION_POLICIES, default="default",
+                              help="DOCX-Kompression: store (keine, am schnellsten), fast, default oder max (Standard: default)")
+    merge_parser.add_argument("--skip-errors", action="store_true",
+                              help="Fehlerhafte PDFs auslassen statt abzubrechen")
+    merge_parser.add_argument("-r", "--recursive", action="store_true",
+                              help="Verzeichnisse und **-Muster rekursiv durchsuchen")
+    merge_parser.set_defaults(func=run_merge)
+
+    batch_parser = subparsers.add_parser("batch", help="Konvertierung gemäß CSV-/JSONL-Manifest")
+    batch_parser.add_argument("manifest", help="Manifest mit den Spalten input[, output, if_exists]")
+    batch_parser.add_argument("-o", "--output-dir", required=True,
+                              help="Ausgabeverzeichnis für Zeilen ohne eigene Ausgabe")
+    batch_parser.add_argument("--results", help="Ergebnisprotokoll (Standard: <output-dir>/results.jsonl)")
+    batch_parser.add_argument("--resume", action="store_true",
+                              help="Bereits protokollierte Zeilen überspringen und das Protokoll fortsetzen")
+    batch_parser.add_argument("--retry-failed", action="store_true",
+                              help="Bei --resume fehlgeschlagene Zeilen erneut versuchen")
+    batch_parser.add_argument("-j", "--jobs", type=int, default=1,
+                              help="Anzahl paralleler Konvertierungsprozesse (Standard: 1)")
+    batch_parser.add_argument("--if-exists", choices=IF_EXISTS_POLICIES, default="rename",
+                              help="Standard für Zeilen ohne eigene Option (Standard: rename)")
+    batch_parser.add_argument("--report-every", type=int, default=1000,
+                              help="Fortschritt alle N Zeilen ausgeben (Standard: 1000)")
+    batch_parser.set_defaults(func=run_batch)
+
+    sync_parser = subparsers.add_parser("sync", help="Verzeichnisbaum spiegeln und nur geänderte PDFs konvertieren")
+    sync_parser.add_argument("input_dir", help="Eingabeverzeichnis (wird rekursiv durchsucht)")
+    sync_parser.add_argument("-o", "--output-dir", required=True,
+                             help="Ausgabeverzeichnis mit derselben Ordnerstruktur")
+    sync_parser.add_argument("-j", "--jobs", type=int, default=1,
+                             help="Anzahl paralleler Konvertierungsprozesse (Standard: 1)")
+    sync_parser.add_argument("-f", "--format", dest="formats", type=parse_formats, default=["docx"],
+                             help="Ausgabeformate, kommagetrennt: docx, txt, md, html (Standard: docx)")
+    sync_parser.add_argument("--compression", choices=COMPRESSION_POLICIES, default="default",
+                             help="DOCX-Kompression: store (keine, am schnellsten), fast, default oder max (Standard: default)")
+    sync_parser.add_argument("--hash", action="store_true",
+                             help="Bei geänderter Änderungszeit den Inhalt per SHA-256 vergleichen")
+    sync_parser.add_argument("--delete", action="store_true",
+                             help="Ausgaben gelöschter Quellen ebenfalls löschen")
+    sync_parser.add_argument("--state",
+                             help="Sidecar-Manifest (Standard: <output-dir>/.pdf_magic_sync.jsonl)")
+    sync_parser.set_defaults(func=run_sync)
+
+    pipe_parser = subparsers.add_parser("pipe", help="PDF von stdin lesen und DOCX auf stdout schreiben")
+    pipe_parser.add_argument("--framed", action="store_true",
+                             help="Mehrere Dokumente als längenpräfixierte Rahmen verarbeiten")
+    pipe_parser.set_defaults(func=run_pipe)
+
+    watch_parser = subparsers.add_parser("watch", help="Eingangsordner überwachen und neue PDFs konvertieren")
+    watch_parser.add_argument("inbox", nargs="+", help="Zu überwachende Eingangsordner")
+    watch_parser.add_argument("-o", "--output-dir", required=True, help="Ausgabeverzeichnis")
+    watch_parser.add_argument("--done-dir", help="Ziel für konvertierte PDFs (Standard: <inbox>/done)")
+    watch_parser.add_argument("--failed-dir", help="Ziel für fehlgeschlagene PDFs (Standard: <inbox>/failed)")
+    watch_parser.add_argument("-j", "--jobs", type=int, default=1,
+                              help="Anzahl paralleler Konvertierungsprozesse (Standard: 1)")
+    watch_parser.add_argument("--stable-seconds", type=float, default=2.0,
+                              help="Sekunden ohne Änderung, bevor eine Datei verarbeitet wird (Standard: 2)")
+    watch_parser.add_argument("--poll-interval", type=float, default=1.0,
+                              help="Abfrageintervall in Sekunden (Standard: 1)")
+    watch_parser.add_argument("--polling", action="store_true",
+                              help="Ordner per Polling statt über inotify überwachen")
+    watch_parser.set_defaults(func=run_watch)
+
+    serve_parser = subparsers.add_parser("serve", help="Lokalen HTTP-Konvertierungsdienst starten")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Adresse (Standard: 127.0.0.1)")
+    serve_parser.add_argument("--port", type=int, default=8765, help="Port (Standard: 8765)")
+    serve_parser.add_argument("--socket", help="Unix-Socket statt TCP verwenden")
+    serve_parser.add_argument("-j", "--jobs", type=int, default=2,
+                              help="Anzahl paralleler Konvertierungsprozesse (Standard: 2)")
+    serve_parser.add_argument("--max-queue", type=int, default=32,
+                              help="Maximale Anzahl wartender Aufträge, darüber 503 (Standard: 32)")
+    serve_parser.add_argument("--max-queue-per-client", type=int, default=8,
+                              help="Maximale Anzahl wartender Aufträge je Client (Standard: 8)")
+    serve_parser.add_argument("--max-running-per-client", type=int,
+                              help="Maximale Anzahl gleichzeitig laufender Aufträge je Client")
+    serve_parser.add_argument("--client-weight", action="append", default=[], metavar="CLIENT=GEWICHT",
+                              type=parse_client_weight,
+                              help="Gewicht eines Clients für die faire Verteilung (mehrfach möglich)")
+    serve_parser.add_argument("--timeout", type=float, default=300.0,
+                              help="Maximale Dauer je Anfrage in Sekunden; danach wird die Konvertierung "
+                                   "abgebrochen (Standard: 300)")
+    serve_parser.add_argument("--max-upload-mb", type=int, default=200,
+                              help="Maximale Größe hochgeladener PDFs in MB (Standard: 200)")
+    serve_parser.set_defaults(func=run_serve)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Einstiegspunkt der Kommandozeile."""
+    # Protokoll auf stderr, damit stdout nur Fortschrittsereignisse enthält
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,18 +3,35 @@
 # Version: 2.1
 # Automatisch generierte __init__.py für core
 
-# Importiere Module
-from .converter import *
-from .file_handler import *
-from .utils import *
-from .validator import *
+# Module werden erst beim ersten Zugriff importiert (PEP 562), damit z.B.
+# "import src.core.errors" nicht PyPDF2 und python-docx mitlädt und die
+# Oberfläche schneller erscheint.
+import importlib
+
+_SUBMODULES = ('batch', 'converter', 'engine', 'file_handler', 'utils', 'validator')
 
 # Core-spezifische Importe
-from PyPDF2 import PdfReader, PdfWriter
-from docx import Document
+_EXTERNAL = {
+    'PdfReader': 'PyPDF2',
+    'PdfWriter': 'PyPDF2',
+    'Document': 'docx',
+}
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f'.{name}', __name__)
+    if name in _EXTERNAL:
+        return getattr(importlib.import_module(_EXTERNAL[name]), name)
+    for module_name in _SUBMODULES:
+        module = importlib.import_module(f'.{module_name}', __name__)
+        if hasattr(module, name):
+            return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
+    'batch',
     'converter',
+    'engine',
     'file_handler',
     'utils',
     'validator',
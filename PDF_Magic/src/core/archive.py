@@ -0,0 +1,172 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# archive.py
+# Schreibt die Ergebnisse eines Stapels direkt in ein ZIP- oder TAR-Archiv
+
+import io
+import os
+import gzip
+import json
+import tarfile
+import tempfile
+import zipfile
+from datetime import datetime
+from typing import BinaryIO, Iterable, Iterator, Optional, Set
+
+from .batch import ConversionResult, convert_tasks
+from .writers import ZIP_EPOCH, stable_zip_info, zip_date_time
+
+ARCHIVE_FORMATS = ("zip", "tar", "tar.gz")
+INDEX_NAME = "index.jsonl"
+
+
+def archive_format_for(path: str) -> str:
+    """Bestimmt das Archivformat anhand der Dateiendung (Standard: zip)."""
+    lower = path.lower()
+    if lower.endswith(('.tar.gz', '.tgz')):
+        return "tar.gz"
+    if lower.endswith('.tar'):
+        return "tar"
+    return "zip"
+
+
+class ArchiveWriter:
+    """
+    Schreibt Dokumente nacheinander in ein ZIP- oder TAR-Archiv, auch in nicht
+    durchsuchbare Datenströme wie stdout. Zu jedem Dokument wird ein Eintrag
+    im Index vermerkt, der zum Schluss als index.jsonl angehängt wird.
+
+    Zeitstempel und Attribute der Einträge hängen nur von den Quellen ab,
+    nicht vom Zeitpunkt der Erstellung; gleiche Eingaben ergeben so ein
+    byte-identisches Archiv.
+    """
+
+    def __init__(self, stream: BinaryIO, archive_format: str = "zip"):
+        """
+        Args:
+            stream: Beschreibbarer Datenstrom für das Archiv
+            archive_format: "zip", "tar" oder "tar.gz"
+        """
+        if archive_format not in ARCHIVE_FORMATS:
+            raise ValueError(f"Unbekanntes Archivformat: {archive_format}")
+        self.archive_format = archive_format
+        self.gzip_file = None
+        if archive_format == "zip":
+            self.zip_file = zipfile.ZipFile(stream, 'w')
+            self.tar_file = None
+        else:
+            self.zip_file = None
+            if archive_format == "tar.gz":
+                # tarfile schreibt die aktuelle Uhrzeit in den gzip-Kopf, daher selbst komprimieren
+                self.gzip_file = gzip.GzipFile(filename="", mode='wb', fileobj=stream, mtime=0)
+                stream = self.gzip_file
+            self.tar_file = tarfile.open(fileobj=stream, mode='w|')
+        self.names: Set[str] = set()
+        self.latest_mtime = ZIP_EPOCH.timestamp()
+        # Der Index bleibt bis 1 MB im Speicher und wird darüber ausgelagert
+        self.index = tempfile.SpooledTemporaryFile(max_size=1024 * 1024, mode='w+b')
+
+    def unique_name(self, file_name: str) -> str:
+        """Vergibt einen im Archiv eindeutigen Namen (name_1.docx, name_2.docx, ...)."""
+        base, ext = os.path.splitext(file_name)
+        candidate = file_name
+        counter = 1
+        while candidate in self.names:
+            candidate = f"{base}_{counter}{ext}"
+            counter += 1
+        self.names.add(candidate)
+        return candidate
+
+    def add(self, name: str, data: bytes, mtime: Optional[float] = None):
+        """
+        Hängt ein Dokument an das Archiv an.
+
+        Args:
+            name: Name im Archiv
+            data: Inhalt
+            mtime: Änderungszeit des Eintrags, üblicherweise die der Quelle
+        """
+        mtime = max(mtime if mtime is not None else 0, ZIP_EPOCH.timestamp())
+        self.latest_mtime = max(self.latest_mtime, mtime)
+        if self.zip_file is not None:
+            # DOCX ist bereits komprimiert, erneutes Komprimieren kostet nur Zeit
+            info = stable_zip_info(name, zip_date_time(datetime.fromtimestamp(mtime)), zipfile.ZIP_STORED)
+            self.zip_file.writestr(info, data)
+        else:
+            self.tar_file.addfile(self.tar_info(name, len(data), mtime), io.BytesIO(data))
+
+    @staticmethod
+    def tar_info(name: str, size: int, mtime: float) -> tarfile.TarInfo:
+        info = tarfile.TarInfo(name)
+        info.size = size
+        info.mtime = int(mtime)
+        info.mode = 0o644
+        return info
+
+    def add_index_entry(self, entry: dict):
+        """Vermerkt ein Dokument (oder einen Fehler) im Index."""
+        self.index.write((json.dumps(entry, ensure_ascii=False) + "\n").encode('utf-8'))
+
+    def close(self):
+        """Hängt den Index an und schließt das Archiv."""
+        index_size = self.index.tell()
+        self.index.seek(0)
+        if self.zip_file is not None:
+            info = stable_zip_info(INDEX_NAME, zip_date_time(datetime.fromtimestamp(self.latest_mtime)))
+            with self.zip_file.open(info, 'w') as index_entry:
+                while True:
+                    chunk = self.index.read(64 * 1024)
+                    if not chunk:
+                        break
+                    index_entry.write(chunk)
+            self.zip_file.close()
+        else:
+            self.tar_file.addfile(self.tar_info(INDEX_NAME, index_size, self.latest_mtime), self.index)
+            self.tar_file.close()
+            if self.gzip_file is not None:
+                self.gzip_file.close()
+        self.index.close()
+
+
+def convert_to_archive(pdf_paths: Iterable[str], archive: ArchiveWriter,
+                       jobs: int = 1, compression: str = "default", images: bool = False,
+                       max_image_px: Optional[int] = None, ocr: bool = False,
+                       ocr_lang: Optional[str] = None, ocr_cpus: Optional[int] = None) -> Iterator[ConversionResult]:
+    """
+    Konvertiert PDF-Dateien und schreibt die DOCX-Dateien direkt ins Archiv,
+    ohne Zwischendateien auf dem Datenträger. Die Einträge folgen der
+    Eingabereihenfolge, damit das Archiv unabhängig von der Anzahl der Worker
+    gleich aussieht; es sind höchstens 2 * jobs Dokumente gleichzeitig im Speicher.
+
+    Args:
+        pdf_paths: PDF-Pfade
+        archive: Ziel-Archiv (wird nicht geschlossen)
+        jobs: Anzahl paralleler Konvertierungsprozesse
+        compression: Kompressionsrichtlinie der DOCX-Dateien (store, fast, default, max)
+        images: Bilder übernehmen
+        max_image_px: Größere Bilder auf diese Kantenlänge verkleinern
+        ocr: Seiten ohne Textebene (Scans) per tesseract erkennen
+        ocr_lang: tesseract-Sprachen, z.B. "deu+eng"
+        ocr_cpus: Gleichzeitige OCR-Prozesse im ganzen Stapel (Standard: CPUs - jobs, mindestens 1)
+
+    Yields:
+        ConversionResult: Ergebnis je Datei; output_path ist der Name im Archiv
+    """
+    tasks = ((index, pdf_path, archive.unique_name(
+                 f"{os.path.splitext(os.path.basename(pdf_path))[0]}.docx"))
+             for index, pdf_path in enumerate(pdf_paths))
+    for result in convert_tasks(tasks, jobs, ordered=True, in_memory=True, compression=compression,
+                                images=images, max_image_px=max_image_px, ocr=ocr,
+                                ocr_lang=ocr_lang, ocr_cpus=ocr_cpus):
+        # Keine Laufzeiten im Index, sie würden das Archiv bei jedem Lauf verändern
+        entry = {"name": result.output_path if result.ok else None, "input": result.input_path,
+                 "status": result.status, "pages": result.pages, "error": result.error}
+        if result.ok:
+            archive.add(result.output_path, result.data, os.path.getmtime(result.input_path))
+            entry["size"] = len(result.data)
+            entry["page_kinds"] = result.page_kinds
+            # Dokument nicht länger als nötig im Speicher halten
+            result.data = None
+        archive.add_index_entry(entry)
+        yield result
@@ -0,0 +1,229 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# batch.py
+# Programmierschnittstelle für Stapelkonvertierungen ohne PyQt5
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .engine import convert_job
+from .executors import discard_pending
+from .metrics import create_run_record, get_time_model
+from .ocr import create_ocr_budget, default_ocr_cpus, set_ocr_budget
+from .paths import OutputPathAllocator, resolve_output_targets
+
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"
+
+
+class ConversionResult:
+    """Ergebnis der Konvertierung einer einzelnen Datei"""
+
+    def __init__(self, index: int, input_path: str, status: str, output_path: Optional[str] = None,
+                 stats: Optional[dict] = None, error: Optional[str] = None, elapsed: float = 0.0):
+        """
+        Args:
+            index: Position der Datei in der Eingabe
+            input_path: Pfad der PDF-Datei
+            status: STATUS_OK, STATUS_FAILED oder STATUS_SKIPPED
+            output_path: Pfad der DOCX-Datei
+            stats: Kennzahlen aus convert_job
+            error: Fehlermeldung bei STATUS_FAILED
+            elapsed: Zeit von der Übergabe bis zum Ergebnis in Sekunden (inkl. Wartezeit)
+        """
+        stats = stats or {}
+        self.index = index
+        self.input_path = input_path
+        self.status = status
+        self.output_path = output_path
+        self.pages = stats.get("pages", 0)
+        self.text_chars = stats.get("text_chars", 0)
+        self.duration = stats.get("duration", 0.0)
+        self.warnings: List[str] = stats.get("warnings", [])
+        self.unchanged: List[str] = stats.get("unchanged", [])  # Formate mit identischer Ausgabe
+        self.page_kinds: Dict[str, int] = stats.get("page_kinds", {})  # Seiten je Art laut Vorprüfung
+        self.data: Optional[bytes] = stats.get("data")  # nur bei in_memory
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.status == STATUS_OK
+
+    def as_dict(self) -> dict:
+        """Liefert das Ergebnis als dict, z.B. für JSON."""
+        return {"index": self.index, "input": self.input_path, "status": self.status,
+                "output": self.output_path, "pages": self.pages, "text_chars": self.text_chars,
+                "duration": self.duration, "elapsed": self.elapsed,
+                "page_kinds": self.page_kinds, "warnings": self.warnings, "unchanged": self.unchanged,
+                "error": self.error}
+
+    def __repr__(self) -> str:
+        return f"ConversionResult({self.status!r}, {self.input_path!r})"
+
+
+def convert_many(pdf_paths: Iterable[str], output_dir: str, jobs: int = 1, ordered: bool = False,
+                 if_exists: str = "rename", formats: Sequence[str] = ("docx",),
+                 skip_identical: bool = False, compression: str = "default", images: bool = False,
+                 max_image_px: Optional[int] = None, ocr: bool = False, ocr_lang: Optional[str] = None,
+                 ocr_cpus: Optional[int] = None) -> Iterator[ConversionResult]:
+    """
+    Konvertiert viele PDF-Dateien und liefert die Ergebnisse, sobald sie vorliegen.
+
+    Die Eingabe wird erst beim Durchlaufen gelesen und es sind höchstens
+    2 * jobs Dateien gleichzeitig in Arbeit, so dass auch sehr große oder
+    endlose Eingaben (z.B. Generatoren) keinen Speicher binden.
+
+    Args:
+        pdf_paths: PDF-Pfade (Liste, Generator, ...)
+        output_dir: Ausgabeverzeichnis
+        jobs: Anzahl paralleler Konvertierungsprozesse; 1 konvertiert im aufrufenden Prozess
+        ordered: Ergebnisse in Eingabereihenfolge statt in Fertigstellungsreihenfolge liefern
+        if_exists: Verhalten bei vorhandener Ausgabe (rename, overwrite, skip)
+        formats: Ausgabeformate (docx, txt, md, html); bei mehreren ist output_path ein dict
+        skip_identical: Vorhandene Ausgaben mit identischem Inhalt nicht ersetzen
+            (nur zusammen mit if_exists="overwrite" sinnvoll)
+        compression: Kompressionsrichtlinie der DOCX-Dateien (store, fast, default, max)
+        images: Bilder übernehmen; je Worker-Prozess werden wiederkehrende Bilder nur einmal dekodiert
+        max_image_px: Größere Bilder auf diese Kantenlänge verkleinern
+        ocr: Seiten ohne Textebene (Scans) per tesseract erkennen
+        ocr_lang: tesseract-Sprachen, z.B. "deu+eng"
+        ocr_cpus: Gleichzeitige OCR-Prozesse im ganzen Stapel (Standard: CPUs - jobs, mindestens 1)
+
+    Yields:
+        ConversionResult: Ergebnis je Datei
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    allocator = OutputPathAllocator(output_dir)
+    # Ausgabepfade erst belegen, wenn die Datei tatsächlich an der Reihe ist
+    tasks = ((index, pdf_path, resolve_output_targets(pdf_path, output_dir, if_exists, allocator, formats))
+             for index, pdf_path in enumerate(pdf_paths))
+    return convert_tasks(tasks, jobs, ordered, allocator, skip_identical=skip_identical,
+                         compression=compression, images=images, max_image_px=max_image_px,
+                         ocr=ocr, ocr_lang=ocr_lang, ocr_cpus=ocr_cpus)
+
+
+def convert_tasks(tasks: Iterable[Tuple[int, str, Optional[str]]], jobs: int = 1, ordered: bool = False,
+                  allocator: Optional[OutputPathAllocator] = None,
+                  in_memory: bool = False, skip_identical: bool = False,
+                  compression: str = "default", images: bool = False,
+                  max_image_px: Optional[int] = None, ocr: bool = False,
+                  ocr_lang: Optional[str] = None, ocr_cpus: Optional[int] = None) -> Iterator[ConversionResult]:
+    """
+    Führt Konvertierungsaufträge mit bereits bestimmten Ausgabepfaden aus.
+
+    Args:
+        tasks: (index, pdf_path, output_path); output_path None überspringt die Datei
+        jobs: Anzahl paralleler Konvertierungsprozesse; 1 konvertiert im aufrufenden Prozess
+        ordered: Ergebnisse in Reihenfolge der Aufträge liefern
+        allocator: Gibt belegte Ausgabepfade fehlgeschlagener Aufträge wieder frei
+        in_memory: Keine Dateien schreiben; die DOCX-Bytes stehen in ConversionResult.data
+            und output_path ist nur ein Name (z.B. für ein Archiv)
+        skip_identical: Vorhandene Ausgaben mit identischem Inhalt nicht ersetzen
+        compression: Kompressionsrichtlinie der DOCX-Dateien (store, fast, default, max)
+        images: Bilder übernehmen
+        max_image_px: Größere Bilder auf diese Kantenlänge verkleinern
+        ocr: Seiten ohne Textebene (Scans) per tesseract erkennen
+        ocr_lang: tesseract-Sprachen, z.B. "deu+eng"
+        ocr_cpus: Gleichzeitige OCR-Prozesse im ganzen Stapel (Standard: CPUs - jobs, mindestens 1),
+            damit die Texterkennung die übrigen Konvertierungen nicht ausbremst
+
+    Yields:
+        ConversionResult: Ergebnis je Auftrag
+    """
+    time_model = get_time_model()
+    job_options = {"skip_identical": skip_identical, "compression": compression, "images": images,
+                   "max_image_px": max_image_px, "ocr": ocr, "ocr_lang": ocr_lang}
+    pool_options = {}
+    if ocr:
+        # Ein gemeinsames Budget für alle Worker statt eines eigenen je Prozess
+        budget = create_ocr_budget(ocr_cpus or default_ocr_cpus(jobs))
+        if jobs <= 1:
+            set_ocr_budget(budget)
+        else:
+            pool_options = {"initializer": set_ocr_budget, "initargs": (budget,)}
+
+    def make_result(index: int, pdf_path: str, output_path: str, started: float,
+                    stats: Optional[dict] = None, error: Optional[Exception] = None) -> ConversionResult:
+        elapsed = time.monotonic() - started
+        if error is not None:
+            if allocator:
+                allocator.release(output_path)
+            return ConversionResult(index, pdf_path, STATUS_FAILED, output_path, error=str(error),
+                                    elapsed=elapsed)
+        time_model.observe(create_run_record(os.path.getsize(pdf_path), stats["pages"],
+                                             stats["text_chars"], stats["producer"], stats["duration"]))
+        return ConversionResult(index, pdf_path, STATUS_OK, output_path, stats, elapsed=elapsed)
+
+    if jobs <= 1:
+        for index, pdf_path, output_path in tasks:
+            if output_path is None:
+                yield ConversionResult(index, pdf_path, STATUS_SKIPPED)
+                continue
+            started = time.monotonic()
+            try:
+                stats = convert_job(pdf_path, None if in_memory else output_path, **job_options)
+            except Exception as e:
+                yield make_result(index, pdf_path, output_path, started, error=e)
+            except BaseException:
+                if allocator:
+                    allocator.release(output_path)
+                raise
+            else:
+                yield make_result(index, pdf_path, output_path, started, stats)
+        return
+
+    executor = ProcessPoolExecutor(max_workers=jobs, **pool_options)
+    pending = {}
+    buffered: Dict[int, ConversionResult] = {}  # nur bei ordered: fertig, aber noch nicht an der Reihe
+    next_position = 0
+    submitted = 0
+    exhausted = False
+    tasks = iter(tasks)
+    try:
+        while True:
+            finished = []  # (Position des Auftrags, Ergebnis)
+            while not exhausted and len(pending) + len(buffered) < jobs * 2:
+                try:
+                    index, pdf_path, output_path = next(tasks)
+                except StopIteration:
+                    exhausted = True
+                    break
+                position = submitted
+                submitted += 1
+                if output_path is None:
+                    finished.append((position, ConversionResult(index, pdf_path, STATUS_SKIPPED)))
+                    continue
+                future = executor.submit(convert_job, pdf_path, None if in_memory else output_path,
+                                         **job_options)
+                pending[future] = (position, index, pdf_path, output_path, time.monotonic())
+
+            if pending:
+                for future in wait(pending, return_when=FIRST_COMPLETED).done:
+                    position, index, pdf_path, output_path, started = pending.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        result = make_result(index, pdf_path, output_path, started, future.result())
+                    else:
+                        result = make_result(index, pdf_path, output_path, started, error=error)
+                    finished.append((position, result))
+
+            if ordered:
+                buffered.update(finished)
+                while next_position in buffered:
+                    yield buffered.pop(next_position)
+                    next_position += 1
+            else:
+                for _, result in finished:
+                    yield result
+
+            if exhausted and not pending and not buffered:
+                break
+    finally:
+        # Bei vorzeitigem Abbruch durch den Aufrufer offene Aufträge verwerfen
+        discard_pending(executor, {future: task[3] for future, task in pending.items()},
+                        allocator.release if allocator else lambda output_path: None)
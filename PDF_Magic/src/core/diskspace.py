@@ -0,0 +1,121 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# diskspace.py
+
+import shutil
+import threading
+from typing import Dict, Optional
+
+from .metrics import DEFAULT_TEXT_DENSITY
+
+DOCX_BASE_SIZE = 40 * 1024  # Leeres DOCX mit Stilen und Metadaten
+PAGE_OVERHEAD = 400  # Überschrift und Absatz-XML je Seite (komprimiert)
+TEXT_COMPRESSION_RATIO = 0.45  # Komprimierte Bytes je extrahiertem Zeichen
+DEFAULT_SAFETY_MARGIN = 50 * 1024 * 1024  # Reserve, die nie verbraucht werden soll
+
+
+def estimate_output_size(page_count: int, text_chars: Optional[float] = None,
+                         text_density: float = DEFAULT_TEXT_DENSITY) -> int:
+    """
+    Schätzt die Größe der DOCX-Ausgabe aus Seitenanzahl und Textmenge.
+
+    Args:
+        page_count (int): Anzahl der Seiten
+        text_chars (Optional[float]): Textmenge in Zeichen, falls bekannt
+        text_density (float): Angenommene Zeichen pro Seite, falls die Textmenge unbekannt ist
+
+    Returns:
+        int: Geschätzte Ausgabegröße in Bytes
+    """
+    if text_chars is None:
+        text_chars = page_count * text_density
+    return int(DOCX_BASE_SIZE + page_count * PAGE_OVERHEAD + text_chars * TEXT_COMPRESSION_RATIO)
+
+
+def format_megabytes(size: float) -> str:
+    """Formatiert eine Größe in Bytes als MB-Angabe."""
+    return f"{size / (1024 * 1024):.1f}MB"
+
+
+class DiskSpaceReservation:
+    """
+    Reserviert den geschätzten Speicherplatz eines ganzen Batches im
+    Ausgabeverzeichnis und verfolgt ihn, während die Ausgaben geschrieben werden.
+    """
+
+    def __init__(self, directory: str, safety_margin: int = DEFAULT_SAFETY_MARGIN):
+        """
+        Args:
+            directory: Ausgabeverzeichnis
+            safety_margin: Speicherplatz in Bytes, der immer frei bleiben soll
+        """
+        self.directory = directory
+        self.safety_margin = safety_margin
+        self.reservations: Dict[str, int] = {}
+        self.written = 0
+        self.lock = threading.Lock()
+
+    @property
+    def outstanding(self) -> int:
+        """Noch nicht geschriebener, reservierter Speicherplatz in Bytes."""
+        with self.lock:
+            return sum(self.reservations.values())
+
+    def free_space(self) -> int:
+        """Aktuell freier Speicherplatz im Ausgabeverzeichnis in Bytes."""
+        return shutil.disk_usage(self.directory).free
+
+    def reserve(self, key: str, size: int):
+        """Reserviert den geschätzten Speicherplatz für eine Ausgabe."""
+        with self.lock:
+            self.reservations[key] = size
+
+    def release(self, key: str, actual_size: int = 0):
+        """
+        Gibt die Reservierung einer Ausgabe frei und verbucht die tatsächlich geschriebene Größe.
+
+        Args:
+            key: Schlüssel der Reservierung (in der Regel der Eingabepfad)
+            actual_size: Tatsächlich geschriebene Bytes, 0 bei Fehlschlag
+        """
+        with self.lock:
+            self.reservations.pop(key, None)
+            self.written += actual_size
+
+    def check_batch(self) -> Optional[str]:
+        """
+        Prüft einmalig für den ganzen Batch, ob alle reservierten Ausgaben Platz finden.
+
+        Returns:
+            Optional[str]: Fehlermeldung wenn nicht genug Speicherplatz vorhanden ist, sonst None
+        """
+        try:
+            free = self.free_space()
+        except OSError:
+            return None
+        required = self.outstanding + self.safety_margin
+        if free < required:
+            return (f"Nicht genügend Speicherplatz für den gesamten Batch in {self.directory}. "
+                    f"Verfügbar: {format_megabytes(free)}, Benötigt: {format_megabytes(required)}")
+        return None
+
+    def ensure_available(self, key: str) -> Optional[str]:
+        """
+        Prüft vor dem Schreiben einer Ausgabe, ob ihre Reservierung noch gedeckt ist.
+
+        Returns:
+            Optional[str]: Fehlermeldung wenn die Ausgabe den Datenträger füllen würde, sonst None
+        """
+        with self.lock:
+            required = self.reservations.get(key, 0) + self.safety_margin
+        try:
+            free = self.free_space()
+        except OSError:
+            # Nicht ermittelbar, ein echter Schreibfehler wird beim Speichern gemeldet
+            return None
+        if free < required:
+            return (f"Der Datenträger von {self.directory} ist fast voll. "
+                    f"Verfügbar: {format_megabytes(free)}, für die nächste Datei benötigt: "
+                    f"{format_megabytes(required)}. Bitte Speicherplatz freigeben und fortsetzen.")
+        return None
@@ -0,0 +1,616 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# engine.py
+# Qt-freie Konvertierungsfunktionen für GUI, Kommandozeile und Worker-Prozesse
+
+import io
+import os
+import time
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, BinaryIO, Callable, Dict, List, Optional, Tuple, Union
+
+from .errors import ConversionError
+from .paths import OutputPathAllocator
+from .prescan import PAGE_EMPTY, PAGE_TEXT, classify_page, count_page_kinds
+from .writers import get_writer
+from .progress import BatchProgress
+from .metrics import (ConversionTimeModel, create_run_record, get_time_model,
+                      order_by_predicted_duration)
+from .diskspace import DiskSpaceReservation, estimate_output_size
+
+# PyPDF2 und python-docx werden erst bei der ersten Konvertierung geladen
+# (oder vorab über preload_dependencies), damit die Oberfläche schneller startet.
+if TYPE_CHECKING:
+    from PyPDF2 import PdfReader
+
+# Eingabe als Pfad, Bytes oder Datei-Objekt; Ausgabe als Pfad oder Datei-Objekt
+PdfSource = Union[str, bytes, BinaryIO]
+DocxTarget = Union[str, BinaryIO]
+
+
+def preload_dependencies():
+    """Lädt die schweren Konvertierungsbibliotheken vorab, z.B. in einem Hintergrund-Thread."""
+    import PyPDF2  # noqa: F401
+    import docx  # noqa: F401
+
+
+def get_pdf_producer(pdf_reader: "PdfReader") -> Optional[str]:
+    """
+    Liest den Erzeuger einer PDF-Datei aus den Metadaten.
+
+    Args:
+        pdf_reader (PdfReader): Geöffnete PDF-Datei
+
+    Returns:
+        Optional[str]: Erzeuger oder None, wenn nicht angegeben
+    """
+    try:
+        metadata = pdf_reader.metadata
+        return str(metadata.producer) if metadata and metadata.producer else None
+    except Exception:
+        return None
+
+
+def to_utc_naive(timestamp: datetime) -> datetime:
+    """Wandelt einen Zeitpunkt mit Zeitzone in UTC ohne Zeitzone um."""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+def get_pdf_dates(pdf_reader: "PdfReader", fallback: Optional[datetime] = None) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Liest Erstellungs- und Änderungsdatum einer PDF-Datei aus den Metadaten.
+
+    Args:
+        pdf_reader (PdfReader): Geöffnete PDF-Datei
+        fallback (Optional[datetime]): Zeitpunkt, falls die Metadaten keine Angaben enthalten
+
+    Returns:
+        Tuple[Optional[datetime], Optional[datetime]]: created und modified in UTC
+    """
+    created = modified = None
+    try:
+        metadata = pdf_reader.metadata
+        if metadata:
+            created = metadata.creation_date
+            modified = metadata.modification_date
+    except Exception:
+        # Ungültige Datumsangaben sind häufig und kein Grund, die Konvertierung abzubrechen
+        pass
+    created = to_utc_naive(created) if created else fallback
+    modified = to_utc_naive(modified) if modified else created
+    return created, modified
+
+
+def fallback_source_date() -> Optional[datetime]:
+    """
+    Datum für Quellen ohne Datumsangaben in den Metadaten: SOURCE_DATE_EPOCH,
+    falls gesetzt (reproduzierbare Builds), sonst None (die Writer verwenden
+    dann einen festen Zeitpunkt). Die Änderungszeit der Eingabedatei wird
+    bewusst nicht verwendet, da eine kopierte Datei sonst eine andere DOCX ergäbe.
+    """
+    value = os.environ.get("SOURCE_DATE_EPOCH")
+    if not value:
+        return None
+    try:
+        return to_utc_naive(datetime.fromtimestamp(int(value), timezone.utc))
+    except (ValueError, OverflowError, OSError):
+        logging.getLogger('ConversionEngine').warning(f"Ungültiges SOURCE_DATE_EPOCH ignoriert: {value}")
+        return None
+
+
+def scan_pdf(pdf_path: str) -> dict:
+    """
+    Ermittelt Größe, Seitenanzahl und Erzeuger einer PDF-Datei.
+
+    Args:
+        pdf_path (str): Pfad zur PDF-Datei
+
+    Returns:
+        dict: Dateiinformationen; bei unlesbaren Dateien mit 0 Seiten
+    """
+    from PyPDF2 import PdfReader
+
+    info = {"size": 0, "pages": 0, "producer": None}
+    try:
+        info["size"] = os.path.getsize(pdf_path)
+        pdf_reader = PdfReader(pdf_path)
+        info["pages"] = len(pdf_reader.pages)
+        info["producer"] = get_pdf_producer(pdf_reader)
+    except Exception:
+        # Fehlerhafte Dateien werden bei der Konvertierung gemeldet
+        pass
+    return info
+
+
+def extract_pages(pdf_path: PdfSource, on_page: Optional[Callable[[int], None]] = None,
+                  on_warning: Optional[Callable[[str], None]] = None, images: bool = False,
+                  max_image_px: Optional[int] = None, ocr: bool = False,
+                  ocr_lang: Optional[str] = None) -> dict:
+    """
+    Extrahiert den Text (und optional die Bilder) aller Seiten einer PDF-Datei.
+
+    Args:
+        pdf_path (PdfSource): Pfad zur PDF-Datei, PDF-Bytes oder lesbares Datei-Objekt
+        on_page (Optional[Callable[[int], None]]): Wird nach jeder Seite mit der Seitennummer aufgerufen
+        on_warning (Optional[Callable[[str], None]]): Empfängt Warnungen, z.B. zu Seiten ohne Text
+        images (bool): Bilder extrahieren; jedes Bild wird nur einmal je Dokument dekodiert
+        max_image_px (Optional[int]): Größere Bilder auf diese Kantenlänge verkleinern
+        ocr (bool): Bildseiten ohne Text per tesseract erkennen (parallel zur Extraktion)
+        ocr_lang (Optional[str]): tesseract-Sprachen, z.B. "deu+eng"
+
+    Returns:
+        dict: texts (Text je Seite), pages, text_chars, producer sowie created und
+            modified (aus den Metadaten, sonst Änderungszeit der Datei); mit images
+            zusätzlich images (Bildschlüssel je Seite) und image_data (Schlüssel -> ext, data),
+            mit ocr zusätzlich ocr_pages (Anzahl erkannter Seiten); page_kinds zählt die
+            Seiten je Art laut Vorprüfung (text, image, empty)
+
+    Raises:
+        ConversionError: Wenn die Datei nicht gelesen werden konnte
+    """
+    from PyPDF2 import PdfReader
+
+    source_name = pdf_path if isinstance(pdf_path, str) else "<Datenstrom>"
+    fallback_date = fallback_source_date()
+    page_ocr = None
+    if ocr:
+        from .ocr import PageOcr
+        page_ocr = PageOcr(pdf_path if isinstance(pdf_path, str) else None, ocr_lang)
+    if isinstance(pdf_path, (bytes, bytearray)):
+        pdf_path = io.BytesIO(pdf_path)
+    extractor = None
+    if images:
+        from .images import ImageExtractor
+        extractor = ImageExtractor(max_image_px)
+
+    try:
+        pdf_reader = PdfReader(pdf_path)
+        texts = []
+        page_images = []
+        kinds = []
+        for page_num, page in enumerate(pdf_reader.pages, 1):
+            # Seiten ohne Textoperatoren (Scans, leere Seiten) brauchen die teure Textextraktion nicht
+            kind = classify_page(page)
+            kinds.append(kind)
+            text = (page.extract_text() or "") if kind == PAGE_TEXT else ""
+            if page_ocr and kind != PAGE_EMPTY and not text.strip():
+                # Die Warnung zu leeren Seiten folgt erst, wenn auch die Erkennung nichts findet
+                page_ocr.submit(page_num, page)
+            elif not text and on_warning:
+                on_warning(f"Warnung: Seite {page_num} in {source_name} enthält keinen extrahierbaren Text.")
+            texts.append(text)
+            if extractor:
+                page_images.append(extractor.collect(page))
+            if on_page:
+                on_page(page_num)
+        created, modified = get_pdf_dates(pdf_reader, fallback_date)
+        ocr_texts = page_ocr.finish(on_warning, source_name) if page_ocr else {}
+        for page_num, text in ocr_texts.items():
+            texts[page_num - 1] = text
+        result = {
+            "texts": texts,
+            "pages": len(texts),
+            "text_chars": sum(len(text) for text in texts),
+            "producer": get_pdf_producer(pdf_reader),
+            "created": created,
+            "modified": modified,
+            "page_kinds": count_page_kinds(kinds),
+        }
+        if extractor:
+            result["images"] = page_images
+            result["image_data"] = extractor.finish(on_warning, source_name)
+        if page_ocr:
+            result["ocr_pages"] = sum(1 for text in ocr_texts.values() if text)
+        return result
+    except Exception as e:
+        if extractor:
+            extractor.cancel()
+        if page_ocr:
+            page_ocr.cancel()
+        raise ConversionError(f"Fehler beim Lesen der PDF-Datei: {str(e)}")
+
+
+def convert_pdf_to_docx(pdf_path: PdfSource, docx_path: DocxTarget,
+                        on_page: Optional[Callable[[int], None]] = None,
+                        on_warning: Optional[Callable[[str], None]] = None,
+                        images: bool = False, max_image_px: Optional[int] = None,
+                        ocr: bool = False, ocr_lang: Optional[str] = None) -> dict:
+    """
+    Konvertiert eine PDF-Datei in eine DOCX-Datei.
+
+    Ein- und Ausgabe können auch im Speicher liegen (Bytes bzw. Datei-Objekte),
+    z.B. für Datenbankinhalte oder Pipes, ohne Umweg über temporäre Dateien.
+
+    Args:
+        pdf_path (PdfSource): Pfad zur PDF-Datei, PDF-Bytes oder lesbares Datei-Objekt
+        docx_path (DocxTarget): Pfad der zu schreibenden DOCX-Datei oder beschreibbares Datei-Objekt
+        on_page (Optional[Callable[[int], None]]): Wird nach jeder Seite mit der Seitennummer aufgerufen
+        on_warning (Optional[Callable[[str], None]]): Empfängt Warnungen, z.B. zu Seiten ohne Text
+        images (bool): Bilder übernehmen; mehrfach genutzte Bilder (Logos, Briefköpfe) werden
+            nur einmal dekodiert und einmal in word/media abgelegt
+        max_image_px (Optional[int]): Größere Bilder auf diese Kantenlänge verkleinern
+        ocr (bool): Seiten ohne Textebene (Scans) per tesseract erkennen
+        ocr_lang (Optional[str]): tesseract-Sprachen, z.B. "deu+eng"
+
+    Returns:
+        dict: Kennzahlen der Konvertierung (pages, text_chars, producer)
+
+    Raises:
+        ConversionError: Wenn die Datei nicht konvertiert werden konnte
+    """
+    return convert_pdf(pdf_path, {"docx": docx_path}, on_page, on_warning, images=images,
+                       max_image_px=max_image_px, ocr=ocr, ocr_lang=ocr_lang)
+
+
+def convert_pdf(pdf_path: PdfSource, outputs: Dict[str, DocxTarget],
+                on_page: Optional[Callable[[int], None]] = None,
+                on_warning: Optional[Callable[[str], None]] = None,
+                skip_identical: bool = False, compression: str = "default",
+                images: bool = False, max_image_px: Optional[int] = None,
+                ocr: bool = False, ocr_lang: Optional[str] = None) -> dict:
+    """
+    Extrahiert eine PDF-Datei einmal und schreibt daraus alle gewünschten Formate.
+
+    Ohne "docx" in outputs wird python-docx gar nicht erst geladen.
+
+    Args:
+        pdf_path (PdfSource): Pfad zur PDF-Datei, PDF-Bytes oder lesbares Datei-Objekt
+        outputs (Dict[str, DocxTarget]): Format (docx, txt, md, html) -> Pfad oder Datei-Objekt
+        on_page (Optional[Callable[[int], None]]): Wird nach jeder Seite mit der Seitennummer aufgerufen
+        on_warning (Optional[Callable[[str], None]]): Empfängt Warnungen, z.B. zu Seiten ohne Text
+        skip_identical (bool): Vorhandene Dateien mit identischem Inhalt nicht ersetzen
+        compression (str): Kompressionsrichtlinie der DOCX-Datei (store, fast, default, max)
+        images (bool): Bilder in die DOCX-Datei übernehmen
+        max_image_px (Optional[int]): Größere Bilder auf diese Kantenlänge verkleinern
+        ocr (bool): Seiten ohne Textebene (Scans) per tesseract erkennen
+        ocr_lang (Optional[str]): tesseract-Sprachen, z.B. "deu+eng"
+
+    Returns:
+        dict: Kennzahlen der Konvertierung (pages, text_chars, producer, images, ocr_pages,
+            page_kinds) und unchanged
+            (Formate, deren vorhandene Datei unverändert geblieben ist)
+
+    Raises:
+        ConversionError: Wenn die Datei nicht konvertiert werden konnte
+    """
+    extracted = extract_pages(pdf_path, on_page, on_warning, images=images and "docx" in outputs,
+                              max_image_px=max_image_px, ocr=ocr, ocr_lang=ocr_lang)
+    unchanged = []
+    try:
+        for output_format, target in outputs.items():
+            if not get_writer(output_format, compression).save(extracted, target, skip_identical):
+                unchanged.append(output_format)
+    except Exception as e:
+        raise ConversionError(f"Fehler bei der Konvertierung: {str(e)}")
+    return {
+        "pages": extracted["pages"],
+        "text_chars": extracted["text_chars"],
+        "producer": extracted["producer"],
+        "images": len(extracted.get("image_data", {})),
+        "ocr_pages": extracted.get("ocr_pages", 0),
+        "page_kinds": extracted["page_kinds"],
+        "unchanged": unchanged,
+    }
+
+
+def convert_pdf_bytes(pdf_data: bytes,
+                      on_warning: Optional[Callable[[str], None]] = None) -> Tuple[bytes, dict]:
+    """
+    Konvertiert PDF-Bytes vollständig im Speicher.
+
+    Args:
+        pdf_data (bytes): Inhalt der PDF-Datei
+        on_warning (Optional[Callable[[str], None]]): Empfängt Warnungen
+
+    Returns:
+        Tuple[bytes, dict]: Inhalt der DOCX-Datei und Kennzahlen der Konvertierung
+    """
+    output = io.BytesIO()
+    stats = convert_pdf_to_docx(pdf_data, output, on_warning=on_warning)
+    return output.getvalue(), stats
+
+
+def convert_job(pdf_path: str, docx_path: Union[str, None, Dict[str, str]],
+                skip_identical: bool = False, compression: str = "default",
+                volume_pages: Optional[int] = None, volume_mb: Optional[float] = None,
+                images: bool = False, max_image_px: Optional[int] = None,
+                ocr: bool = False, ocr_lang: Optional[str] = None,
+                if_exists: str = "overwrite") -> dict:
+    """
+    Konvertiert eine einzelne Datei in einem Worker-Prozess.
+
+    Prüft die Eingabe, misst die Dauer und sammelt Warnungen, damit das
+    Ergebnis vollständig an den aufrufenden Prozess zurückgegeben werden kann.
+
+    Args:
+        pdf_path (str): Pfad zur PDF-Datei
+        docx_path (Union[str, None, Dict[str, str]]): Pfad der zu schreibenden DOCX-Datei;
+            None liefert die DOCX-Bytes unter "data" zurück, ohne eine Datei anzulegen;
+            ein dict (Format -> Pfad) schreibt mehrere Formate aus einer Extraktion;
+            bei Bänden die Namensvorlage (siehe volume_template)
+        skip_identical (bool): Vorhandene Dateien mit identischem Inhalt nicht ersetzen
+        compression (str): Kompressionsrichtlinie der DOCX-Datei (store, fast, default, max)
+        volume_pages (Optional[int]): DOCX in Bände zu höchstens so vielen Seiten aufteilen
+        volume_mb (Optional[float]): DOCX in Bände zu etwa so vielen MB aufteilen
+        images (bool): Bilder übernehmen (nicht bei Bänden)
+        max_image_px (Optional[int]): Größere Bilder auf diese Kantenlänge verkleinern
+        ocr (bool): Seiten ohne Textebene erkennen (nicht bei Bänden)
+        ocr_lang (Optional[str]): tesseract-Sprachen, z.B. "deu+eng"
+        if_exists (str): Verhalten bei vorhandenen Bänden bzw. Verzeichnis (rename, overwrite, skip)
+
+    Returns:
+        dict: Kennzahlen der Konvertierung inklusive duration und warnings;
+            bei Bänden zusätzlich index und outputs (siehe convert_pdf_to_volumes)
+    """
+    check_input_file(pdf_path)
+
+    warnings = []
+    start_time = time.monotonic()
+    if volume_pages or volume_mb:
+        from .volumes import convert_pdf_to_volumes
+
+        if not isinstance(docx_path, str):
+            raise ValueError("Bände können nur als DOCX-Dateien geschrieben werden")
+        stats = convert_pdf_to_volumes(pdf_path, docx_path, volume_pages, volume_mb, compression,
+                                       on_warning=warnings.append, skip_identical=skip_identical,
+                                       if_exists=if_exists)
+        stats["duration"] = time.monotonic() - start_time
+        stats["warnings"] = warnings
+        return stats
+
+    output = io.BytesIO() if docx_path is None else docx_path
+    outputs = output if isinstance(output, dict) else {"docx": output}
+    stats = convert_pdf(pdf_path, outputs, on_warning=warnings.append, skip_identical=skip_identical,
+                        compression=compression, images=images, max_image_px=max_image_px,
+                        ocr=ocr, ocr_lang=ocr_lang)
+    stats["duration"] = time.monotonic() - start_time
+    stats["warnings"] = warnings
+    if docx_path is None:
+        stats["data"] = output.getvalue()
+    return stats
+
+
+def check_input_file(pdf_path: str):
+    """Prüft, ob eine Eingabedatei existiert und lesbar ist."""
+    if not os.path.exists(pdf_path):
+        raise FileNotFoundError(f"Die Datei {pdf_path} existiert nicht.")
+    if not os.access(pdf_path, os.R_OK):
+        raise PermissionError(f"Keine Leserechte für {pdf_path}.")
+
+
+def extract_job(pdf_path: str) -> dict:
+    """
+    Extrahiert den Text einer Datei in einem Worker-Prozess.
+
+    Returns:
+        dict: Ergebnis von extract_pages inklusive duration und warnings
+    """
+    check_input_file(pdf_path)
+    warnings = []
+    start_time = time.monotonic()
+    result = extract_pages(pdf_path, on_warning=warnings.append)
+    result["duration"] = time.monotonic() - start_time
+    result["warnings"] = warnings
+    return result
+
+
+class ConversionEvent:
+    """Ereignis, das die ConversionEngine an ihre Listener meldet"""
+
+    STATUS = "status"  # message: Aktuelle Datei, Seite und Durchsatz
+    PROGRESS = "progress"  # percent: Prozent, gewichtet nach Seiten
+    LOG = "log"  # message: Protokollzeile
+    FAILED = "failed"  # file_path, message, full_message
+    FILE_DONE = "file_done"  # file_path, output_path, stats
+    PAUSED = "paused"  # message: Grund, warum der Lauf angehalten wurde
+    SUMMARY = "summary"  # successful, failed, total
+    FINISHED = "finished"
+
+    def __init__(self, kind: str, **data):
+        self.kind = kind
+        self.data = data
+
+    def __repr__(self) -> str:
+        return f"ConversionEvent({self.kind!r}, {self.data!r})"
+
+
+class ConversionEngine:
+    """
+    Qt-freie Engine für die PDF-zu-DOCX Konvertierung eines Batches.
+
+    Fortschritt, Protokoll und Fehler werden als ConversionEvent an die
+    registrierten Listener gemeldet; die GUI verbindet sich darüber mit einem
+    Qt-Adapter, Skripte und Dienste mit einfachen Callbacks.
+    """
+
+    def __init__(self, pdf_files: List[str], output_dir: str,
+                 listener: Optional[Callable[[ConversionEvent], None]] = None):
+        self.pdf_files = pdf_files
+        self.output_dir = output_dir
+        self.listeners: List[Callable[[ConversionEvent], None]] = [listener] if listener else []
+        self.batch_progress: Optional[BatchProgress] = None
+        self.time_model: Optional[ConversionTimeModel] = None
+        self.disk_reservation: Optional[DiskSpaceReservation] = None
+        self.path_allocator: Optional[OutputPathAllocator] = None
+        self.resume_event = threading.Event()
+        self.cancelled = False
+        self.setup_logging()
+
+    def setup_logging(self):
+        """Richtet das Logging für die Engine ein"""
+        self.logger = logging.getLogger('ConversionEngine')
+        self.logger.setLevel(logging.INFO)
+        if not self.logger.handlers:
+            handler = logging.FileHandler('conversion.log', delay=True)
+            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+            handler.setFormatter(formatter)
+            self.logger.addHandler(handler)
+
+    def subscribe(self, listener: Callable[[ConversionEvent], None]):
+        """Registriert einen weiteren Listener für Ereignisse der Engine"""
+        self.listeners.append(listener)
+
+    def emit(self, kind: str, **data):
+        """Meldet ein Ereignis an alle Listener"""
+        event = ConversionEvent(kind, **data)
+        for listener in self.listeners:
+            listener(event)
+
+    def run(self):
+        """Führt die Konvertierung für alle PDF-Dateien durch"""
+        total_files = len(self.pdf_files)
+        successful_conversions = 0
+        failed_conversions = 0
+
+        self.emit(ConversionEvent.STATUS, message="Analysiere Dateien...")
+        file_infos = self.scan_files()
+        self.time_model = get_time_model()
+        predictions = {
+            pdf_path: self.time_model.predict(info["size"], info["pages"], producer=info["producer"])
+            for pdf_path, info in file_infos.items()
+        }
+        # Kürzeste Aufträge zuerst, damit möglichst früh möglichst viele Dateien fertig sind
+        self.pdf_files = order_by_predicted_duration(self.pdf_files, predictions)
+        self.batch_progress = BatchProgress(sum(info["pages"] for info in file_infos.values()),
+                                            sum(info["size"] for info in file_infos.values()),
+                                            predictions=predictions)
+
+        # Speicherplatz für den ganzen Batch einmalig vorab prüfen und reservieren
+        self.disk_reservation = DiskSpaceReservation(self.output_dir)
+        for pdf_path, info in file_infos.items():
+            self.disk_reservation.reserve(pdf_path, estimate_output_size(
+                info["pages"], text_density=self.time_model.text_density))
+        error_msg = self.disk_reservation.check_batch()
+        if error_msg:
+            self.wait_for_disk_space(error_msg)
+
+        self.path_allocator = OutputPathAllocator(self.output_dir)
+
+        for pdf_path in self.pdf_files:
+            error_msg = self.disk_reservation.ensure_available(pdf_path)
+            while error_msg and not self.cancelled:
+                self.wait_for_disk_space(error_msg)
+                error_msg = self.disk_reservation.ensure_available(pdf_path)
+            if self.cancelled:
+                break
+
+            info = file_infos[pdf_path]
+            self.batch_progress.start_file(pdf_path, info["pages"], info["size"])
+            try:
+                if not os.path.exists(pdf_path):
+                    raise FileNotFoundError(f"Die Datei {pdf_path} existiert nicht.")
+
+                if not os.access(pdf_path, os.R_OK):
+                    raise PermissionError(f"Keine Leserechte für {pdf_path}.")
+
+                requested_path = self.get_output_path(pdf_path)
+                output_path = self.get_unique_filename(requested_path)
+                if output_path != requested_path:
+                    self.emit(ConversionEvent.LOG, message=f"Datei existiert bereits. "
+                              f"Verwende neuen Namen: {os.path.basename(output_path)}")
+
+                start_time = time.monotonic()
+                try:
+                    stats = self.convert_pdf_to_docx(pdf_path, output_path)
+                except BaseException:
+                    self.path_allocator.release(output_path)
+                    raise
+                self.time_model.observe(create_run_record(
+                    info["size"], stats["pages"], stats["text_chars"],
+                    stats["producer"], time.monotonic() - start_time))
+                self.disk_reservation.release(pdf_path, os.path.getsize(output_path))
+                successful_conversions += 1
+                self.emit(ConversionEvent.FILE_DONE, file_path=pdf_path, output_path=output_path, stats=stats)
+                self.emit(ConversionEvent.LOG, message=f"Erfolgreich konvertiert: {pdf_path} -> {output_path}")
+
+            except FileNotFoundError as e:
+                failed_conversions += 1
+                self.handle_error(str(e), pdf_path)
+            except PermissionError as e:
+                failed_conversions += 1
+                self.handle_error(str(e), pdf_path)
+            except ConversionError as e:
+                failed_conversions += 1
+                self.handle_error(str(e), pdf_path)
+            except Exception as e:
+                failed_conversions += 1
+                self.handle_error(f"Unerwarteter Fehler: {str(e)}", pdf_path)
+            finally:
+                self.disk_reservation.release(pdf_path)
+                if self.batch_progress.file_done():
+                    self.report_progress()
+
+        if self.cancelled:
+            skipped = total_files - successful_conversions - failed_conversions
+            self.emit(ConversionEvent.LOG,
+                      message=f"Konvertierung abgebrochen. {skipped} Datei(en) wurden nicht verarbeitet.")
+
+        self.emit(ConversionEvent.LOG,
+                  message=self.get_summary(successful_conversions, failed_conversions, total_files))
+        self.emit(ConversionEvent.SUMMARY, successful=successful_conversions,
+                  failed=failed_conversions, total=total_files)
+        self.emit(ConversionEvent.FINISHED)
+
+    def scan_files(self) -> dict:
+        """Ermittelt Seitenanzahl, Größe und Erzeuger aller Dateien für Fortschritt und Zeitschätzung"""
+        return {pdf_path: scan_pdf(pdf_path) for pdf_path in self.pdf_files}
+
+    def wait_for_disk_space(self, message: str):
+        """Hält den Lauf an, bis er über resume() fortgesetzt oder über cancel() abgebrochen wird"""
+        self.logger.warning(message)
+        self.resume_event.clear()
+        self.emit(ConversionEvent.PAUSED, message=message)
+        self.resume_event.wait()
+
+    def resume(self):
+        """Setzt einen angehaltenen Lauf fort"""
+        self.resume_event.set()
+
+    def cancel(self):
+        """Bricht den Lauf vor der nächsten Datei ab"""
+        self.cancelled = True
+        self.resume_event.set()
+
+    def report_progress(self):
+        """Sendet Fortschritt und Statustext des laufenden Batches"""
+        self.emit(ConversionEvent.PROGRESS, percent=self.batch_progress.percent)
+        self.emit(ConversionEvent.STATUS, message=self.batch_progress.status_text())
+
+    def handle_error(self, error_msg: str, file_path: str):
+        """Behandelt Fehler während der Konvertierung"""
+        full_error_msg = f"Fehler bei der Konvertierung von {file_path}: {error_msg}"
+        self.logger.error(full_error_msg)
+        self.emit(ConversionEvent.FAILED, file_path=file_path, message=error_msg,
+                  full_message=full_error_msg)
+
+    def convert_pdf_to_docx(self, pdf_path: str, docx_path: str) -> dict:
+        """Konvertiert eine PDF-Datei in eine DOCX-Datei und gibt Kennzahlen des Laufs zurück."""
+        return convert_pdf_to_docx(pdf_path, docx_path, on_page=self.report_page,
+                                   on_warning=lambda message: self.emit(ConversionEvent.LOG, message=message))
+
+    def report_page(self, page_num: int):
+        """Verbucht eine konvertierte Seite und meldet den Fortschritt gedrosselt"""
+        if self.batch_progress and self.batch_progress.page_done(page_num):
+            self.report_progress()
+
+    def get_output_path(self, pdf_path: str) -> str:
+        """Erstellt den Ausgabepfad für die DOCX-Datei."""
+        base_name = os.path.splitext(os.path.basename(pdf_path))[0]
+        return os.path.join(self.output_dir, f"{base_name}.docx")
+
+    def get_unique_filename(self, file_path: str) -> str:
+        """Belegt einen eindeutigen Dateinamen, falls die Datei bereits existiert."""
+        allocator = self.path_allocator or OutputPathAllocator(os.path.dirname(file_path))
+        return allocator.allocate(os.path.basename(file_path))
+
+    def get_summary(self, successful: int, failed: int, total: int) -> str:
+        """Erstellt eine Zusammenfassung der Konvertierung."""
+        return (f"Konvertierung abgeschlossen.\n"
+                f"Erfolgreich: {successful}\n"
+                f"Fehlgeschlagen: {failed}\n"
+                f"Gesamt: {total}")
@@ -0,0 +1,98 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# errors.py
+
+import csv
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+
+class ConversionError(Exception):
+    """Benutzerdefinierte Ausnahme für Konvertierungsfehler"""
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(self.message)
+
+
+class ErrorRecord:
+    """Ein einzelner Fehlereintrag aus einem Konvertierungslauf"""
+
+    def __init__(self, file_path: str, message: str, category: str = "Konvertierung",
+                 timestamp: Optional[datetime] = None):
+        self.file_path = file_path
+        self.message = message
+        self.category = category
+        self.timestamp = timestamp or datetime.now()
+
+    def matches(self, text: str) -> bool:
+        """Prüft, ob der Eintrag den Filtertext enthält (ohne Groß-/Kleinschreibung)."""
+        needle = text.lower()
+        return (needle in self.file_path.lower()
+                or needle in self.message.lower()
+                or needle in self.category.lower())
+
+    def __str__(self) -> str:
+        return (f"[{self.timestamp.strftime('%Y-%m-%d %H:%M:%S')}] "
+                f"{self.category} - {self.file_path}: {self.message}")
+
+
+class ErrorCollection:
+    """
+    Sammelt die Fehler eines Konvertierungslaufs, statt jeden Fehler
+    einzeln in einem Dialog anzuzeigen.
+    """
+
+    def __init__(self):
+        self.records: List[ErrorRecord] = []
+
+    def add(self, file_path: str, message: str, category: str = "Konvertierung") -> ErrorRecord:
+        """
+        Fügt einen neuen Fehlereintrag hinzu.
+
+        Args:
+            file_path: Betroffene Datei
+            message: Fehlermeldung
+            category: Fehlerkategorie
+
+        Returns:
+            ErrorRecord: Der angelegte Eintrag
+        """
+        record = ErrorRecord(file_path, message, category)
+        self.records.append(record)
+        return record
+
+    def clear(self):
+        """Entfernt alle Einträge."""
+        self.records.clear()
+
+    def filter(self, text: str) -> List[ErrorRecord]:
+        """Gibt alle Einträge zurück, die den Filtertext enthalten."""
+        if not text:
+            return list(self.records)
+        return [record for record in self.records if record.matches(text)]
+
+    def export_csv(self, output_path: str):
+        """
+        Exportiert die Einträge als CSV-Datei.
+
+        Args:
+            output_path: Pfad der CSV-Datei
+        """
+        with open(output_path, 'w', encoding='utf-8', newline='') as csv_file:
+            writer = csv.writer(csv_file, delimiter=';')
+            writer.writerow(["Zeitpunkt", "Kategorie", "Datei", "Meldung"])
+            for record in self.records:
+                writer.writerow([record.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+                                 record.category, record.file_path, record.message])
+
+    def summary(self) -> str:
+        """Erstellt eine kurze Zusammenfassung der gesammelten Fehler."""
+        file_count = len({record.file_path for record in self.records})
+        return f"{len(self.records)} Fehler in {file_count} Datei{'en' if file_count != 1 else ''}"
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[ErrorRecord]:
+        return iter(self.records)
@@ -0,0 +1,72 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# executors.py
+# Prozessweite Thread-Pools, die nach einem fork im Kindprozess neu angelegt werden
+
+import os
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class SharedThreadPool:
+    """
+    Gemeinsamer Thread-Pool eines Prozesses, der erst bei der ersten Nutzung
+    angelegt wird.
+
+    Ein per fork gestarteter Worker-Prozess (z.B. eines ProcessPoolExecutor)
+    erbt das Objekt, aber nicht die Threads des Pools; Aufträge an den
+    geerbten Pool würden nie ausgeführt. Deshalb wird der Pool im Kindprozess
+    verworfen und dort bei Bedarf neu angelegt.
+    """
+
+    def __init__(self, max_workers: int, thread_name_prefix: str):
+        """
+        Args:
+            max_workers: Anzahl der Threads
+            thread_name_prefix: Namensanfang der Threads, z.B. "deflate"
+        """
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+        self.lock = threading.Lock()
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.pid = os.getpid()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self.reset)
+
+    def reset(self):
+        """Vergisst den Pool (und eine evtl. beim fork gehaltene Sperre) im Kindprozess."""
+        self.lock = threading.Lock()
+        self.executor = None
+        self.pid = os.getpid()
+
+    def get(self) -> ThreadPoolExecutor:
+        """Liefert den Pool des aktuellen Prozesses und legt ihn bei Bedarf an."""
+        if self.pid != os.getpid():
+            # Fork ohne register_at_fork, z.B. über os.fork aus einer Erweiterung
+            self.reset()
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                   thread_name_prefix=self.thread_name_prefix)
+            return self.executor
+
+
+def discard_pending(executor: Executor, outputs: Dict[Future, Any], release: Callable[[Any], None]):
+    """
+    Räumt nach einem Abbruch auf: Wartende Aufträge werden verworfen, laufende
+    abgewartet, und die belegten Ausgaben aller Aufträge, die nicht erfolgreich
+    fertig wurden, werden freigegeben.
+
+    Args:
+        executor: Pool der Aufträge; wird beendet
+        outputs: Noch nicht ausgewertete Aufträge -> belegte Ausgabe
+        release: Gibt eine Ausgabe frei, z.B. OutputPathAllocator.release
+    """
+    for future in outputs:
+        future.cancel()
+    executor.shutdown(wait=True)
+    for future, output in outputs.items():
+        if future.cancelled() or future.exception() is not None:
+            release(output)
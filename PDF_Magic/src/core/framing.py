@@ -0,0 +1,78 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# framing.py
+# Längenpräfixierte Rahmen, um viele Dokumente über eine Pipe zu übertragen
+#
+# Anfrage: 8 Byte Länge (big-endian, ohne Vorzeichen) + PDF-Bytes
+# Antwort: 1 Byte Status + 8 Byte Länge + Nutzdaten
+#          (Status 0: DOCX-Bytes, Status 1: Fehlermeldung in UTF-8)
+# Das Ende der Eingabe an einer Rahmengrenze beendet den Datenstrom.
+
+import struct
+from typing import BinaryIO, Optional, Tuple
+
+FRAME_OK = 0
+FRAME_ERROR = 1
+
+LENGTH_HEADER = struct.Struct('!Q')
+RESPONSE_HEADER = struct.Struct('!BQ')
+
+
+def read_exact(stream: BinaryIO, size: int) -> bytes:
+    """Liest genau size Bytes; bei vorzeitigem Ende wird EOFError ausgelöst."""
+    chunks = []
+    remaining = size
+    while remaining > 0:
+        chunk = stream.read(remaining)
+        if not chunk:
+            raise EOFError(f"Datenstrom endet nach {size - remaining} von {size} Bytes")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def read_frame(stream: BinaryIO) -> Optional[bytes]:
+    """
+    Liest einen Anfrage-Rahmen.
+
+    Returns:
+        Optional[bytes]: Nutzdaten oder None am Ende des Datenstroms
+    """
+    header = stream.read(LENGTH_HEADER.size)
+    if not header:
+        return None
+    if len(header) < LENGTH_HEADER.size:
+        header += read_exact(stream, LENGTH_HEADER.size - len(header))
+    (length,) = LENGTH_HEADER.unpack(header)
+    return read_exact(stream, length)
+
+
+def write_frame(stream: BinaryIO, payload: bytes):
+    """Schreibt einen Anfrage-Rahmen."""
+    stream.write(LENGTH_HEADER.pack(len(payload)))
+    stream.write(payload)
+    stream.flush()
+
+
+def write_response(stream: BinaryIO, status: int, payload: bytes):
+    """Schreibt einen Antwort-Rahmen."""
+    stream.write(RESPONSE_HEADER.pack(status, len(payload)))
+    stream.write(payload)
+    stream.flush()
+
+
+def read_response(stream: BinaryIO) -> Optional[Tuple[int, bytes]]:
+    """
+    Liest einen Antwort-Rahmen.
+
+    Returns:
+        Optional[Tuple[int, bytes]]: (Status, Nutzdaten) oder None am Ende des Datenstroms
+    """
+    header = stream.read(RESPONSE_HEADER.size)
+    if not header:
+        return None
+    if len(header) < RESPONSE_HEADER.size:
+        header += read_exact(stream, RESPONSE_HEADER.size - len(header))
+    status, length = RESPONSE_HEADER.unpack(header)
+    return status, read_exact(stream, length)
@@ -0,0 +1,365 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# images.py
+# Bildextraktion aus PDF-Seiten mit Deduplizierung gemeinsam genutzter XObjects
+
+import io
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from .executors import SharedThreadPool
+from .prescan import MAX_FORM_DEPTH, PrescanError, content_bytes, drawn_xobjects
+
+# Farbräume -> Pillow-Modus; ICCBased wird über die Anzahl der Komponenten abgebildet
+COLOR_MODES = {"/DeviceRGB": "RGB", "/CalRGB": "RGB", "/DeviceGray": "L", "/CalGray": "L",
+               "/DeviceCMYK": "CMYK"}
+ICC_MODES = {1: "L", 3: "RGB", 4: "CMYK"}
+MODE_COMPONENTS = {"L": 1, "RGB": 3, "CMYK": 4, "P": 1}
+
+# Fertig dekodierte Bilder: Dateiendung und Inhalt
+RenderedImage = Tuple[str, bytes]
+
+_pool = SharedThreadPool(min(4, os.cpu_count() or 1), "image")
+
+
+def get_decode_executor() -> ThreadPoolExecutor:
+    """Gemeinsamer Thread-Pool für das Dekodieren (Pillow und zlib geben dabei den GIL frei)."""
+    return _pool.get()
+
+
+class ImageCache:
+    """
+    Größenbegrenzter LRU-Cache dekodierter Bilder, der über die Dokumente eines
+    Stapels hinweg bestehen bleibt (in jedem Worker-Prozess einer). Briefköpfe
+    und Logos werden so nur einmal je Prozess dekodiert.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries: "OrderedDict[str, RenderedImage]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[RenderedImage]:
+        with self.lock:
+            image = self.entries.get(key)
+            if image is not None:
+                self.entries.move_to_end(key)
+            return image
+
+    def put(self, key: str, image: RenderedImage):
+        if len(image[1]) > self.max_bytes // 4:
+            # Einzelne große Bilder (z.B. Scans) würden den Cache nur leeren
+            return
+        with self.lock:
+            if key in self.entries:
+                return
+            self.entries[key] = image
+            self.size += len(image[1])
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted[1])
+
+
+_image_cache = ImageCache()
+if hasattr(os, "register_at_fork"):
+    # Hielt ein Dekodier-Thread die Sperre beim fork, bliebe sie im Kindprozess belegt
+    os.register_at_fork(after_in_child=lambda: setattr(_image_cache, "lock", threading.Lock()))
+
+
+def get_image_cache() -> ImageCache:
+    """Liefert den Bild-Cache des aktuellen Prozesses."""
+    return _image_cache
+
+
+def normalized(obj: Any, depth: int = 0) -> Any:
+    """
+    Bildet ein PDF-Objekt auf einen vergleichbaren Python-Wert ab: indirekte
+    Verweise werden aufgelöst, Datenströme durch ihre Prüfsumme ersetzt. So
+    erhalten gleiche Bilder auch in verschiedenen Dokumenten denselben Schlüssel.
+    """
+    from PyPDF2.generic import ArrayObject, DictionaryObject, IndirectObject, StreamObject
+
+    if depth > 4:
+        return None
+    if isinstance(obj, IndirectObject):
+        obj = obj.get_object()
+    if isinstance(obj, StreamObject):
+        return hashlib.sha1(obj._data).hexdigest()
+    if isinstance(obj, DictionaryObject):
+        return tuple(sorted((str(key), normalized(value, depth + 1)) for key, value in obj.items()))
+    if isinstance(obj, ArrayObject):
+        return tuple(normalized(value, depth + 1) for value in obj)
+    return str(obj)
+
+
+def image_key(xobject: Any, max_px: Optional[int] = None) -> str:
+    """Schlüssel eines Bild-XObjects aus Rohdaten und allen für die Darstellung relevanten Angaben."""
+    parameters = tuple(normalized(xobject.get(name)) for name in
+                       ("/Filter", "/DecodeParms", "/Width", "/Height", "/BitsPerComponent",
+                        "/ColorSpace", "/Decode", "/SMask"))
+    digest = hashlib.sha256(xobject._data)
+    digest.update(repr((parameters, max_px)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def last_filter(xobject: Any) -> Optional[str]:
+    filters = xobject.get("/Filter")
+    if filters is None:
+        return None
+    filters = filters.get_object()
+    if isinstance(filters, list):
+        return str(filters[-1]) if filters else None
+    return str(filters)
+
+
+def describe_color_space(color_space: Any) -> Tuple[str, Optional[bytes], Optional[str]]:
+    """
+    Ermittelt Pillow-Modus und ggf. die Palette eines Farbraums.
+
+    Returns:
+        Tuple[str, Optional[bytes], Optional[str]]: Modus, Palette und Modus der Palette
+
+    Raises:
+        ValueError: Bei nicht unterstützten Farbräumen
+    """
+    color_space = color_space.get_object() if color_space is not None else None
+    if color_space is None:
+        return "L", None, None
+    if not isinstance(color_space, list):
+        if str(color_space) in COLOR_MODES:
+            return COLOR_MODES[str(color_space)], None, None
+        raise ValueError(f"Farbraum {color_space} wird nicht unterstützt")
+
+    family = str(color_space[0])
+    if family in COLOR_MODES:
+        return COLOR_MODES[family], None, None
+    if family == "/ICCBased":
+        components = int(color_space[1].get_object().get("/N", 3))
+        if components in ICC_MODES:
+            return ICC_MODES[components], None, None
+    elif family == "/Indexed":
+        base_mode, _, _ = describe_color_space(color_space[1])
+        lookup = color_space[3].get_object()
+        palette = lookup.get_data() if hasattr(lookup, "get_data") else bytes(lookup)
+        if isinstance(palette, str):
+            palette = palette.encode('latin-1')
+        return "P", palette, base_mode
+    raise ValueError(f"Farbraum {family} wird nicht unterstützt")
+
+
+def snapshot_image(xobject: Any) -> dict:
+    """
+    Liest alles, was zum Dekodieren eines Bildes nötig ist. Läuft im aufrufenden
+    Thread, da PdfReader nicht threadsicher ist; das Umrechnen und Kodieren
+    übernimmt danach render_image in einem Worker-Thread.
+    """
+    size = (int(xobject["/Width"]), int(xobject["/Height"]))
+    image_filter = last_filter(xobject)
+    if image_filter == "/DCTDecode":
+        return {"kind": "jpeg", "data": xobject.get_data(), "size": size}
+    if image_filter in ("/JPXDecode", "/CCITTFaxDecode"):
+        # PyPDF2 liefert JPEG 2000 unverändert und CCITT als TIFF, beides kann Pillow öffnen
+        return {"kind": "encoded", "data": xobject.get_data(), "size": size}
+
+    bits = int(xobject.get("/BitsPerComponent", 8))
+    mode, palette, palette_mode = describe_color_space(xobject.get("/ColorSpace"))
+    if bits not in (1, 2, 4, 8) or (bits != 8 and mode not in ("L", "P")):
+        raise ValueError(f"{bits} Bit je Farbkomponente im Modus {mode} werden nicht unterstützt")
+    data = xobject.get_data()
+    expected = (size[0] * bits * MODE_COMPONENTS[mode] + 7) // 8 * size[1]
+    if len(data) < expected:
+        raise ValueError("Bilddaten sind unvollständig")
+    decode = xobject.get("/Decode")
+    invert = decode is not None and [float(value) for value in decode.get_object()][:2] == [1.0, 0.0]
+    if mode == "L" and bits == 1:
+        mode, raw_mode = "1", "1"
+    elif bits == 8:
+        raw_mode = mode
+    else:
+        raw_mode = f"{mode};{bits}"
+    return {"kind": "raw", "data": data[:expected], "size": size, "mode": mode, "raw_mode": raw_mode,
+            "palette": palette, "palette_mode": palette_mode, "invert": invert}
+
+
+def palette_to_rgb(palette: bytes, palette_mode: str) -> bytes:
+    """Wandelt eine Palette aus Grau- oder CMYK-Werten in RGB um."""
+    if palette_mode == "L":
+        return b"".join(bytes((value,)) * 3 for value in palette)
+    if palette_mode == "CMYK":
+        rgb = bytearray()
+        for offset in range(0, len(palette) - 3, 4):
+            c, m, y, k = palette[offset:offset + 4]
+            rgb += bytes(255 - min(255, value + k) for value in (c, m, y))
+        return bytes(rgb)
+    return palette
+
+
+def render_image(job: dict, max_px: Optional[int] = None) -> RenderedImage:
+    """
+    Wandelt ein gelesenes Bild in JPEG oder PNG um und verkleinert es bei Bedarf.
+    JPEG-Bilder ohne Verkleinerung werden unverändert übernommen.
+
+    Raises:
+        ValueError: Wenn das Bild nicht dargestellt werden kann (z.B. ohne Pillow)
+    """
+    if job["kind"] == "jpeg" and (not max_px or max(job["size"]) <= max_px):
+        return ".jpg", job["data"]
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        raise ValueError("Für dieses Bildformat wird Pillow benötigt (pip install Pillow)")
+
+    if job["kind"] == "raw":
+        image = Image.frombytes(job["mode"], job["size"], job["data"], "raw", job["raw_mode"])
+        if job["palette"] is not None:
+            image.putpalette(palette_to_rgb(job["palette"], job["palette_mode"]), "RGB")
+        if job["invert"] and image.mode in ("1", "L"):
+            image = ImageOps.invert(image.convert("L"))
+    else:
+        image = Image.open(io.BytesIO(job["data"]))
+        image.load()
+
+    if image.mode not in ("1", "L", "RGB", "RGBA"):
+        image = image.convert("RGB")
+    if max_px and max(image.size) > max_px:
+        if image.mode == "1":
+            image = image.convert("L")
+        image.thumbnail((max_px, max_px))
+
+    output = io.BytesIO()
+    if job["kind"] == "jpeg":
+        image.save(output, format="JPEG", quality=85)
+        return ".jpg", output.getvalue()
+    image.save(output, format="PNG")
+    return ".png", output.getvalue()
+
+
+class ImageExtractor:
+    """
+    Sammelt die Bilder der Seiten eines Dokuments.
+
+    Berücksichtigt werden nur Bilder, die eine Seite tatsächlich zeichnet.
+    Ein Bild-XObject, das viele Seiten gemeinsam nutzen (Logo, Briefkopf),
+    wird über seinen indirekten Verweis erkannt und nur einmal gelesen;
+    inhaltsgleiche Bilder unter verschiedenen Verweisen fasst die Prüfsumme
+    zusammen, über Dokumente hinweg der ImageCache. Das Dekodieren läuft
+    parallel in einem Thread-Pool, während die Textextraktion weiterläuft.
+    """
+
+    def __init__(self, max_px: Optional[int] = None, cache: Optional[ImageCache] = None):
+        """
+        Args:
+            max_px: Bilder, deren längere Seite größer ist, werden auf diese Größe verkleinert
+            cache: Cache über Dokumente hinweg (Standard: Cache des Prozesses)
+        """
+        self.max_px = max_px
+        self.cache = cache if cache is not None else get_image_cache()
+        self.references: Dict[Tuple[int, int], List[str]] = {}
+        self.results: Dict[str, Union[Future, RenderedImage, Exception]] = {}
+
+    def collect(self, page: Any) -> List[str]:
+        """
+        Liefert die Schlüssel der Bilder, die eine Seite zeichnet (in
+        Zeichenreihenfolge), und stößt das Dekodieren neuer Bilder an.
+
+        Viele PDF-Dateien teilen ein /Resources-Verzeichnis zwischen allen
+        Seiten; maßgeblich sind daher die Do-Operatoren im Inhaltsstrom,
+        nicht die aufgeführten Ressourcen.
+        """
+        try:
+            data = content_bytes(page)
+        except Exception:
+            return []
+        keys = self.collect_drawn(data, page.get("/Resources"), 0)
+        return list(dict.fromkeys(keys))
+
+    def collect_drawn(self, data: bytes, resources: Any, depth: int) -> List[str]:
+        from PyPDF2.generic import IndirectObject
+
+        resources = resources.get_object() if resources is not None else None
+        xobjects = resources.get("/XObject") if resources else None
+        if xobjects is None:
+            return []
+        xobjects = xobjects.get_object()
+        try:
+            names = drawn_xobjects(data)
+        except PrescanError:
+            # Nicht zerlegbarer Inhaltsstrom: lieber alle Bilder als gar keine
+            names = list(xobjects)
+        keys = []
+        for name in names:
+            if name not in xobjects:
+                continue
+            reference = xobjects.raw_get(name)
+            ref_id = (reference.idnum, reference.generation) if isinstance(reference, IndirectObject) else None
+            if ref_id in self.references:
+                keys.extend(self.references[ref_id])
+                continue
+            xobject = reference.get_object()
+            subtype = xobject.get("/Subtype")
+            if subtype == "/Image":
+                found = self.add_image(xobject)
+            elif subtype == "/Form" and depth < MAX_FORM_DEPTH:
+                # Formulare ohne eigene Ressourcen erben die der Seite
+                found = self.collect_drawn(xobject.get_data(), xobject.get("/Resources") or resources,
+                                           depth + 1)
+            else:
+                found = []
+            if ref_id is not None:
+                self.references[ref_id] = found
+            keys.extend(found)
+        return keys
+
+    def add_image(self, xobject: Any) -> List[str]:
+        if xobject.get("/ImageMask"):
+            # Schablonenmasken haben keine eigenen Farben
+            return []
+        key = image_key(xobject, self.max_px)
+        if key not in self.results:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.results[key] = cached
+            else:
+                try:
+                    job = snapshot_image(xobject)
+                except Exception as e:
+                    self.results[key] = e
+                else:
+                    self.results[key] = get_decode_executor().submit(render_image, job, self.max_px)
+        return [key]
+
+    def finish(self, on_warning: Optional[Callable[[str], None]] = None,
+               source_name: str = "<Datenstrom>") -> Dict[str, dict]:
+        """
+        Wartet auf alle Bilder.
+
+        Returns:
+            Dict[str, dict]: Schlüssel -> {"ext", "data"}; nicht darstellbare Bilder fehlen
+        """
+        image_data = {}
+        for key, result in self.results.items():
+            if isinstance(result, Future):
+                try:
+                    result = result.result()
+                except Exception as e:
+                    result = e
+                else:
+                    self.cache.put(key, result)
+            if isinstance(result, Exception):
+                if on_warning:
+                    on_warning(f"Warnung: Ein Bild in {source_name} wurde nicht übernommen: {str(result)}")
+                continue
+            image_data[key] = {"ext": result[0], "data": result[1]}
+        return image_data
+
+    def cancel(self):
+        """Verwirft noch nicht begonnene Dekodierungen, z.B. nach einem Lesefehler."""
+        for result in self.results.values():
+            if isinstance(result, Future):
+                result.cancel()
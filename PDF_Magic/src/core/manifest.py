@@ -0,0 +1,175 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# manifest.py
+# Stapelaufträge aus CSV-/JSONL-Manifesten mit Ergebnisprotokoll und Fortsetzung
+
+import os
+import csv
+import json
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+from .batch import ConversionResult, STATUS_FAILED
+from .errors import ConversionError
+from .paths import IF_EXISTS_POLICIES, OutputPathAllocator, resolve_output_path
+
+MANIFEST_FIELDS = ("input", "output", "if_exists")
+
+
+def read_manifest(manifest_path: str) -> Iterator[Tuple[int, dict]]:
+    """
+    Liest ein Manifest zeilenweise, ohne es vollständig in den Speicher zu laden.
+
+    CSV-Dateien benötigen eine Kopfzeile mit mindestens der Spalte "input";
+    JSONL-Dateien (.jsonl, .ndjson) enthalten ein Objekt je Zeile. Optional
+    sind "output" (Zielpfad) und "if_exists" (rename, overwrite, skip).
+
+    Args:
+        manifest_path: Pfad des Manifests
+
+    Yields:
+        Tuple[int, dict]: Zeilennummer (ab 1, ohne Kopfzeile) und Eintrag
+
+    Raises:
+        ConversionError: Bei ungültigen Einträgen
+    """
+    is_jsonl = manifest_path.lower().endswith(('.jsonl', '.ndjson'))
+    with open(manifest_path, 'r', encoding='utf-8', newline='') as manifest_file:
+        if is_jsonl:
+            rows = (json.loads(line) for line in manifest_file if line.strip())
+        else:
+            rows = csv.DictReader(manifest_file)
+        for row_number, row in enumerate(rows, 1):
+            if not row.get("input"):
+                raise ConversionError(f"Manifest-Zeile {row_number}: Spalte 'input' fehlt")
+            if_exists = row.get("if_exists") or None
+            if if_exists and if_exists not in IF_EXISTS_POLICIES:
+                raise ConversionError(f"Manifest-Zeile {row_number}: unbekannte Option if_exists={if_exists}")
+            yield row_number, {"input": row["input"], "output": row.get("output") or None,
+                               "if_exists": if_exists}
+
+
+def load_completed_rows(results_path: str, retry_failed: bool = False) -> Tuple[int, Set[int], Set[int]]:
+    """
+    Ermittelt aus einem Ergebnisprotokoll die bereits erledigten Zeilen.
+
+    Da parallele Worker nicht in Zeilenreihenfolge fertig werden, wird die
+    höchste Zeile bestimmt, bis zu der alle Zeilen erledigt sind, sowie die
+    (wenigen) einzeln erledigten Zeilen dahinter. Fehlgeschlagene Zeilen
+    zählen dabei als erledigt und werden nur bei retry_failed getrennt
+    gemerkt, damit sie die lückenlose Folge nicht unterbrechen.
+
+    Args:
+        results_path: Pfad des Ergebnisprotokolls (JSONL)
+        retry_failed: Fehlgeschlagene Zeilen nicht als erledigt werten
+
+    Returns:
+        Tuple[int, Set[int], Set[int]]: Letzte lückenlos erledigte Zeile, erledigte
+            Zeilen danach und erneut zu konvertierende (fehlgeschlagene) Zeilen
+    """
+    completed_through = 0
+    completed_after: Set[int] = set()
+    failed: Set[int] = set()
+    if not os.path.exists(results_path):
+        return completed_through, completed_after, failed
+    with open(results_path, 'r', encoding='utf-8') as results_file:
+        for line in results_file:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Abgebrochene letzte Zeile nach einem Absturz
+                continue
+            row = record["row"]
+            if retry_failed:
+                # Das letzte Ergebnis einer Zeile zählt, z.B. nach einer früheren Wiederholung
+                if record.get("status") == STATUS_FAILED:
+                    failed.add(row)
+                else:
+                    failed.discard(row)
+            if row > completed_through:
+                completed_after.add(row)
+            while completed_through + 1 in completed_after:
+                completed_through += 1
+                completed_after.discard(completed_through)
+    return completed_through, completed_after, failed
+
+
+class ResultManifest:
+    """Schreibt das Ergebnis jeder Manifest-Zeile als JSON-Line"""
+
+    def __init__(self, results_path: str, append: bool = False):
+        """
+        Args:
+            results_path: Pfad des Ergebnisprotokolls
+            append: An ein vorhandenes Protokoll anhängen (Fortsetzung)
+        """
+        self.results_path = results_path
+        self.results_file = open(results_path, 'a' if append else 'w', encoding='utf-8')
+
+    def write(self, result: ConversionResult):
+        """Protokolliert das Ergebnis einer Zeile."""
+        record = {"row": result.index, "input": result.input_path, "status": result.status,
+                  "output": result.output_path, "pages": result.pages, "page_kinds": result.page_kinds,
+                  "duration": round(result.duration, 3), "warnings": result.warnings,
+                  "error": result.error}
+        self.results_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        # Sofort schreiben, damit eine Fortsetzung nach einem Absturz nichts doppelt konvertiert
+        self.results_file.flush()
+
+    def close(self):
+        self.results_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def iter_manifest_tasks(manifest_path: str, output_dir: str, allocator: OutputPathAllocator,
+                        if_exists: str = "rename",
+                        completed: Optional[Tuple[int, Set[int], Set[int]]] = None
+                        ) -> Iterator[Tuple[int, str, Optional[str]]]:
+    """
+    Erzeugt Konvertierungsaufträge aus einem Manifest für convert_tasks.
+
+    Eigene Zielpfade ("output") werden wie die übrigen Ausgaben über einen
+    OutputPathAllocator je Zielordner belegt, so dass auch mehrere Zeilen mit
+    demselben, noch nicht vorhandenen Zielpfad nie dieselbe Datei schreiben.
+
+    Args:
+        manifest_path: Pfad des Manifests
+        output_dir: Ausgabeverzeichnis für Zeilen ohne "output"
+        allocator: Vergibt Namen im Ausgabeverzeichnis
+        if_exists: Standard für Zeilen ohne eigene Option
+        completed: Ergebnis von load_completed_rows; diese Zeilen werden übersprungen
+
+    Yields:
+        Tuple[int, str, Optional[str]]: (Zeilennummer, PDF-Pfad, Ausgabepfad oder None)
+    """
+    completed_through, completed_after, failed = completed or (0, set(), set())
+    # Zielordner werden erst bei der ersten Zeile eingelesen, die dorthin schreibt
+    allocators: Dict[str, OutputPathAllocator] = {directory_key(output_dir): allocator}
+    for row_number, row in read_manifest(manifest_path):
+        if (row_number <= completed_through or row_number in completed_after) and row_number not in failed:
+            continue
+        policy = row["if_exists"] or if_exists
+        output_path = row["output"]
+        if output_path is None:
+            output_path = resolve_output_path(row["input"], output_dir, policy, allocator)
+        elif policy == "skip" and os.path.exists(output_path):
+            output_path = None
+        else:
+            target_dir = os.path.dirname(output_path) or "."
+            os.makedirs(target_dir, exist_ok=True)
+            if policy != "overwrite":
+                key = directory_key(target_dir)
+                if key not in allocators:
+                    allocators[key] = OutputPathAllocator(target_dir)
+                output_path = allocators[key].allocate(os.path.basename(output_path))
+        yield row_number, row["input"], output_path
+
+
+def directory_key(directory: str) -> str:
+    """Vergleichsschlüssel eines Ordners, unabhängig von relativer Schreibweise."""
+    return os.path.normcase(os.path.abspath(directory))
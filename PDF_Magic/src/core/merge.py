@@ -0,0 +1,213 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# merge.py
+# Führt viele PDF-Dateien in einem Durchgang zu einer DOCX-Datei zusammen
+
+import os
+import re
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional, Tuple, Union
+from xml.sax.saxutils import escape
+
+from .engine import DocxTarget, extract_job
+from .errors import ConversionError
+from .paths import atomic_write
+from .writers import ZIP_EPOCH, docx_entries
+from .zipwriter import ZipWriter
+
+DOCUMENT_PART = "word/document.xml"
+CORE_PART = "docProps/core.xml"
+
+# In XML nicht erlaubte Steuerzeichen (Tabulator und Zeilenumbrüche bleiben erhalten)
+INVALID_XML_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def paragraph_xml(text: str, style: Optional[str] = None) -> str:
+    """Erzeugt einen WordprocessingML-Absatz; Zeilenumbrüche werden wie bei python-docx zu <w:br/>."""
+    properties = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ''
+    lines = INVALID_XML_CHARS.sub('', text).split('\n')
+    runs = '<w:br/>'.join(f'<w:t xml:space="preserve">{escape(line)}</w:t>' for line in lines)
+    return f'<w:p>{properties}<w:r>{runs}</w:r></w:p>'
+
+
+class StreamingDocxWriter:
+    """
+    Schreibt eine DOCX-Datei, deren Hauptteil (word/document.xml) fortlaufend
+    in das ZIP-Archiv geschrieben wird. Anders als bei python-docx liegt das
+    Dokument so nie vollständig im Speicher.
+
+    Formatvorlagen und übrige Teile stammen aus der Standardvorlage von
+    python-docx, so dass das Ergebnis wie eine normale Konvertierung aussieht.
+    Alle Einträge tragen einen festen Zeitstempel; die Dokumenteigenschaften
+    (docProps/core.xml) werden zuletzt mit dem jüngsten Datum der Quellen
+    geschrieben, damit gleiche Quellen eine byte-identische Datei ergeben.
+    """
+
+    def __init__(self, stream: BinaryIO, compression: str = "default"):
+        """
+        Args:
+            stream: Beschreibbarer Datenstrom für die DOCX-Datei
+            compression: Kompressionsrichtlinie (store, fast, default, max)
+        """
+        from docx import Document
+
+        self.template = Document()
+        self.template.core_properties.author = "PDF Magic"
+        self.source_date: Optional[datetime] = None
+        template_parts = dict(docx_entries(self.template))
+
+        self.zip_file = ZipWriter(stream, compression)
+        self.zip_file.write_all((name, data) for name, data in template_parts.items()
+                                if name not in (DOCUMENT_PART, CORE_PART))
+        document_xml = template_parts[DOCUMENT_PART].decode('utf-8')
+
+        body_start = document_xml.index('<w:body>') + len('<w:body>')
+        sect_start = document_xml.rindex('<w:sectPr')
+        self.tail = document_xml[sect_start:]
+        # Seiteneinstellungen des Dokuments für die Abschnittswechsel übernehmen
+        section_xml = self.tail[:self.tail.index('</w:sectPr>')]
+        self.section_properties = section_xml[section_xml.index('>') + 1:]
+
+        self.part = self.zip_file.open(DOCUMENT_PART)
+        self.part.write(document_xml[:body_start].encode('utf-8'))
+
+    @property
+    def size(self) -> int:
+        """Bisher in den Datenstrom geschriebene Bytes (ohne noch im Kompressor gepufferte Daten)."""
+        return self.zip_file.offset
+
+    def write_xml(self, xml: str):
+        self.part.write(xml.encode('utf-8'))
+
+    def add_heading(self, text: str, level: int = 1):
+        self.write_xml(paragraph_xml(text, f"Heading{level}"))
+
+    def add_paragraph(self, text: str):
+        self.write_xml(paragraph_xml(text))
+
+    def add_source_date(self, timestamp: Optional[datetime]):
+        """Berücksichtigt das Datum einer Quelle für Erstellungs- und Änderungsdatum."""
+        if timestamp and (self.source_date is None or timestamp > self.source_date):
+            self.source_date = timestamp
+
+    def add_section_break(self):
+        """Beendet den aktuellen Abschnitt; der nächste beginnt auf einer neuen Seite."""
+        self.write_xml(f'<w:p><w:pPr><w:sectPr>{self.section_properties}</w:sectPr></w:pPr></w:p>')
+
+    def close(self):
+        from docx.opc.oxml import serialize_part_xml
+
+        self.write_xml(self.tail)
+        self.part.close()
+        core_properties = self.template.core_properties
+        core_properties.created = self.source_date or ZIP_EPOCH
+        core_properties.modified = core_properties.created
+        self.zip_file.write(CORE_PART, serialize_part_xml(core_properties._element))
+        self.zip_file.close()
+
+    def abort(self):
+        """Bricht nach einem Fehler ab; das unvollständige Ergebnis wird verworfen."""
+        self.part = None
+
+
+def iter_extracted(pdf_paths: Iterable[str], jobs: int = 1) -> Iterator[Tuple[str, Union[dict, Exception]]]:
+    """
+    Extrahiert die Dateien (parallel, falls jobs > 1) und liefert sie in Eingabereihenfolge.
+    Es sind höchstens 2 * jobs Dateien gleichzeitig in Arbeit.
+
+    Yields:
+        Tuple[str, Union[dict, Exception]]: Pfad und Ergebnis von extract_job bzw. der Fehler
+    """
+    if jobs <= 1:
+        for pdf_path in pdf_paths:
+            try:
+                yield pdf_path, extract_job(pdf_path)
+            except Exception as e:
+                yield pdf_path, e
+        return
+
+    executor = ProcessPoolExecutor(max_workers=jobs)
+    window = deque()
+
+    def next_result():
+        pdf_path, future = window.popleft()
+        error = future.exception()
+        return pdf_path, error if error is not None else future.result()
+
+    try:
+        for pdf_path in pdf_paths:
+            window.append((pdf_path, executor.submit(extract_job, pdf_path)))
+            if len(window) >= jobs * 2:
+                yield next_result()
+        while window:
+            yield next_result()
+    finally:
+        for _, future in window:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+def merge_pdfs_to_docx(pdf_paths: Iterable[str], docx_path: DocxTarget, jobs: int = 1,
+                       skip_errors: bool = False, compression: str = "default",
+                       on_source: Optional[Callable[[str, Optional[dict], Optional[str]], None]] = None) -> dict:
+    """
+    Führt PDF-Dateien in der angegebenen Reihenfolge zu einer DOCX-Datei zusammen.
+    Jede Quelle beginnt in einem eigenen Abschnitt mit ihrem Dateinamen als Überschrift.
+
+    Args:
+        pdf_paths: PDF-Pfade in der gewünschten Reihenfolge
+        docx_path: Pfad der DOCX-Datei oder beschreibbares Datei-Objekt
+        jobs: Anzahl paralleler Extraktionsprozesse
+        skip_errors: Fehlerhafte Quellen auslassen statt abzubrechen
+        compression: Kompressionsrichtlinie der DOCX-Datei (store, fast, default, max)
+        on_source: Wird je Quelle mit (Pfad, Ergebnis, Fehlermeldung) aufgerufen
+
+    Returns:
+        dict: sources, failed, pages, text_chars
+
+    Raises:
+        ConversionError: Wenn eine Quelle fehlschlägt und skip_errors nicht gesetzt ist
+    """
+    stats = {"sources": 0, "failed": 0, "pages": 0, "text_chars": 0}
+
+    def write(stream: BinaryIO):
+        writer = StreamingDocxWriter(stream, compression)
+        try:
+            for pdf_path, result in iter_extracted(pdf_paths, jobs):
+                if isinstance(result, Exception):
+                    if not skip_errors:
+                        raise ConversionError(f"{pdf_path}: {str(result)}")
+                    stats["failed"] += 1
+                    if on_source:
+                        on_source(pdf_path, None, str(result))
+                    continue
+
+                if stats["sources"]:
+                    writer.add_section_break()
+                writer.add_heading(os.path.splitext(os.path.basename(pdf_path))[0], level=1)
+                writer.add_source_date(result.get("modified"))
+                for page_num, text in enumerate(result["texts"], 1):
+                    if text:
+                        writer.add_heading(f'Seite {page_num}', level=2)
+                        writer.add_paragraph(text)
+                stats["sources"] += 1
+                stats["pages"] += result["pages"]
+                stats["text_chars"] += result["text_chars"]
+                if on_source:
+                    on_source(pdf_path, result, None)
+        except BaseException:
+            writer.abort()
+            raise
+        writer.close()
+
+    if isinstance(docx_path, str):
+        def write_file(temp_path: str):
+            with open(temp_path, 'wb') as docx_file:
+                write(docx_file)
+        atomic_write(docx_path, write_file)
+    else:
+        write(docx_path)
+    return stats
@@ -0,0 +1,334 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# metrics.py
+
+import os
+import json
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional
+
+from .paths import atomic_write
+
+# Standardwerte, solange noch nicht genügend Laufdaten vorliegen
+DEFAULT_BASE_TIME = 2.0  # Basiszeit in Sekunden
+DEFAULT_TIME_PER_MB = 0.5  # Zusätzliche Zeit pro MB
+DEFAULT_TEXT_DENSITY = 2000.0  # Zeichen pro Seite
+
+DEFAULT_HISTORY_PATH = os.path.join(os.path.expanduser('~'), '.pdf_magic', 'run_history.jsonl')
+# Die Verlaufsdatei wird nur angehängt; ab dieser Größe wird sie auf die jüngsten Einträge gekürzt
+DEFAULT_HISTORY_MAX_BYTES = 4 * 1024 * 1024
+# Nach so vielen angehängten Einträgen wird die Größe der Verlaufsdatei erneut geprüft
+COMPACT_CHECK_INTERVAL = 1000
+
+
+def read_tail_lines(path: str, count: int, block_size: int = 64 * 1024) -> List[bytes]:
+    """Liest die letzten count Zeilen einer Datei, ohne die ganze Datei zu lesen."""
+    with open(path, 'rb') as tail_file:
+        tail_file.seek(0, os.SEEK_END)
+        position = tail_file.tell()
+        data = b""
+        while position > 0 and data.count(b"\n") <= count:
+            read_size = min(block_size, position)
+            position -= read_size
+            tail_file.seek(position)
+            data = tail_file.read(read_size) + data
+    lines = data.splitlines()
+    if position > 0:
+        # Die erste Zeile ist nur ein Bruchstück
+        lines = lines[1:]
+    return lines[-count:] if count else []
+
+
+class RunHistory:
+    """Speichert die Messwerte jeder konvertierten Datei als JSON-Lines-Datei"""
+
+    def __init__(self, path: str = DEFAULT_HISTORY_PATH, max_records: int = 5000,
+                 max_bytes: int = DEFAULT_HISTORY_MAX_BYTES):
+        """
+        Args:
+            path: Pfad der Verlaufsdatei
+            max_records: Anzahl der jüngsten Einträge, die beim Laden berücksichtigt werden
+            max_bytes: Größe, ab der die Datei auf die jüngsten max_records Einträge gekürzt wird
+        """
+        self.path = path
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.appended = 0
+        self.logger = logging.getLogger('RunHistory')
+
+    def append(self, record: dict):
+        """Hängt einen Messwert an die Verlaufsdatei an."""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as history_file:
+                history_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as e:
+            self.logger.warning(f"Laufdaten konnten nicht gespeichert werden: {str(e)}")
+            return
+        self.appended += 1
+        if self.appended % COMPACT_CHECK_INTERVAL == 0:
+            self.compact()
+
+    def compact(self):
+        """Kürzt die Verlaufsdatei auf die jüngsten Einträge, sobald sie max_bytes überschreitet."""
+        try:
+            if os.path.getsize(self.path) <= self.max_bytes:
+                return
+            lines = read_tail_lines(self.path, self.max_records)
+
+            def write_file(temp_path: str):
+                with open(temp_path, 'wb') as history_file:
+                    history_file.writelines(line + b"\n" for line in lines)
+            atomic_write(self.path, write_file)
+        except OSError as e:
+            self.logger.warning(f"Laufdaten konnten nicht gekürzt werden: {str(e)}")
+
+    def load(self) -> List[dict]:
+        """Lädt die jüngsten Messwerte aus der Verlaufsdatei (liest nur das Ende der Datei)."""
+        try:
+            lines = read_tail_lines(self.path, self.max_records)
+        except FileNotFoundError:
+            return []
+        except OSError as e:
+            self.logger.warning(f"Laufdaten konnten nicht gelesen werden: {str(e)}")
+            return []
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+        self.compact()
+        return records
+
+
+def create_run_record(file_size: int, page_count: int, text_chars: int,
+                      producer: Optional[str], duration: float) -> dict:
+    """
+    Erstellt einen Messwert für den Verlauf.
+
+    Args:
+        file_size: Dateigröße in Bytes
+        page_count: Anzahl der Seiten
+        text_chars: Anzahl der extrahierten Zeichen
+        producer: Erzeuger der PDF-Datei laut Metadaten
+        duration: Konvertierungsdauer in Sekunden
+
+    Returns:
+        dict: Der Messwert
+    """
+    return {
+        "timestamp": datetime.now().isoformat(timespec='seconds'),
+        "size": file_size,
+        "pages": page_count,
+        "text_chars": text_chars,
+        "text_density": text_chars / page_count if page_count else 0.0,
+        "producer": producer or "",
+        "duration": duration,
+    }
+
+
+def base_features(record: dict) -> List[float]:
+    """Merkmale eines Messwerts ohne Erzeuger: Achsenabschnitt, Seiten, MB, 1000 Zeichen."""
+    return [1.0, float(record["pages"]), record["size"] / (1024 * 1024), record["text_chars"] / 1000.0]
+
+
+class ConversionTimeModel:
+    """
+    Lineares Regressionsmodell für die Konvertierungsdauer, das mit NumPy auf
+    den bisherigen Laufdaten angepasst und bei neuen Daten erneut trainiert wird.
+
+    Merkmale: Seiten, Größe in MB, Textmenge in 1000 Zeichen sowie ein
+    Achsenabschnitt je häufigem PDF-Erzeuger.
+
+    Gelernt wird aus einem gleitenden Fenster der jüngsten Messwerte. Für die
+    Normalgleichungen werden je Erzeuger die Summen XᵀX und Xᵀy mitgeführt und
+    bei jedem Messwert in O(1) aktualisiert, so dass observe und fit unabhängig
+    von der Länge eines Stapels gleich viel kosten.
+    """
+
+    MIN_SAMPLES = 8
+    MIN_PRODUCER_SAMPLES = 5
+    BASE_FEATURES = 4
+
+    def __init__(self, history: Optional[RunHistory] = None, refit_interval: int = 20,
+                 max_records: Optional[int] = None):
+        """
+        Args:
+            history: Verlauf, aus dem gelernt und in den geschrieben wird
+            refit_interval: Anzahl neuer Messwerte, nach denen neu angepasst wird
+            max_records: Größe des Fensters (Standard: max_records des Verlaufs bzw. 5000)
+        """
+        self.history = history
+        self.refit_interval = refit_interval
+        max_records = max_records or (history.max_records if history else 5000)
+        self.records: Deque[dict] = deque(maxlen=max_records)
+        # Textdichte je Messwert im Fenster (NaN ohne Seiten) für den Median
+        self.densities: Deque[float] = deque(maxlen=max_records)
+        # Erzeuger -> n, Summe z·zᵀ und Summe z·y über die Messwerte im Fenster
+        self.sums: Dict[str, dict] = {}
+        self.evicted = 0
+        self.new_records = 0
+        self.coefficients = None
+        self.producers: List[str] = []
+        self.text_density = DEFAULT_TEXT_DENSITY
+        self.logger = logging.getLogger('ConversionTimeModel')
+        for record in (history.load() if history else []):
+            self.add_record(record)
+        self.fit()
+
+    @property
+    def is_fitted(self) -> bool:
+        return self.coefficients is not None
+
+    def features(self, file_size: int, page_count: int, text_chars: float,
+                 producer: Optional[str]) -> List[float]:
+        """Erstellt den Merkmalsvektor für eine Datei."""
+        row = [1.0, float(page_count), file_size / (1024 * 1024), text_chars / 1000.0]
+        row.extend(1.0 if producer == known else 0.0 for known in self.producers)
+        return row
+
+    def accumulate(self, record: dict, sign: float):
+        producer = record.get("producer") or ""
+        group = self.sums.get(producer)
+        if group is None:
+            size = self.BASE_FEATURES
+            group = self.sums[producer] = {"n": 0, "xx": [[0.0] * size for _ in range(size)],
+                                           "xy": [0.0] * size}
+        z = base_features(record)
+        y = record["duration"]
+        group["n"] += int(sign)
+        for i, zi in enumerate(z):
+            group["xy"][i] += sign * zi * y
+            row = group["xx"][i]
+            for j, zj in enumerate(z):
+                row[j] += sign * zi * zj
+        if group["n"] == 0:
+            del self.sums[producer]
+
+    def add_record(self, record: dict):
+        """Nimmt einen Messwert ins Fenster auf und verdrängt ggf. den ältesten."""
+        if not record.get("duration", 0) > 0:
+            return
+        if len(self.records) == self.records.maxlen:
+            self.accumulate(self.records[0], -1.0)
+            self.evicted += 1
+        self.records.append(record)
+        self.densities.append(record["text_density"] if record.get("pages") else float("nan"))
+        self.accumulate(record, 1.0)
+        if self.evicted >= self.records.maxlen:
+            # Rundungsfehler des Abziehens gelegentlich durch Neuberechnung verwerfen
+            self.sums = {}
+            self.evicted = 0
+            for kept in self.records:
+                self.accumulate(kept, 1.0)
+
+    def fit(self) -> bool:
+        """
+        Passt das Modell an die Messwerte im Fenster an.
+
+        Returns:
+            bool: True, wenn ein Modell angepasst werden konnte
+        """
+        if len(self.records) < self.MIN_SAMPLES:
+            return False
+        try:
+            import numpy as np
+        except ImportError:
+            self.logger.info("NumPy nicht verfügbar, verwende Standardschätzung.")
+            return False
+
+        densities = np.fromiter(self.densities, dtype=float, count=len(self.densities))
+        if not np.isnan(densities).all():
+            self.text_density = float(np.nanmedian(densities))
+
+        self.producers = sorted(p for p, group in self.sums.items()
+                                if p and group["n"] >= self.MIN_PRODUCER_SAMPLES)
+
+        # XᵀX und Xᵀy aus den Summen zusammensetzen; eine Erzeuger-Spalte ist 1 genau für dessen Messwerte
+        base = self.BASE_FEATURES
+        size = base + len(self.producers)
+        xtx = np.zeros((size, size))
+        xty = np.zeros(size)
+        for group in self.sums.values():
+            xtx[:base, :base] += group["xx"]
+            xty[:base] += group["xy"]
+        for column, producer in enumerate(self.producers, base):
+            group = self.sums[producer]
+            xtx[:base, column] = xtx[column, :base] = group["xx"][0]
+            xtx[column, column] = group["n"]
+            xty[column] = group["xy"][0]
+        # Leichte Ridge-Regularisierung hält das Modell bei wenigen Daten stabil
+        ridge = 1e-3 * np.eye(size)
+        ridge[0, 0] = 0.0
+        self.coefficients = np.linalg.solve(xtx + ridge, xty)
+        self.new_records = 0
+        return True
+
+    def observe(self, record: dict):
+        """
+        Nimmt einen neuen Messwert auf, speichert ihn im Verlauf und passt das
+        Modell nach refit_interval neuen Werten erneut an.
+        """
+        self.add_record(record)
+        if self.history:
+            self.history.append(record)
+        self.new_records += 1
+        if not self.is_fitted or self.new_records >= self.refit_interval:
+            self.fit()
+
+    def predict(self, file_size: int, page_count: Optional[int] = None,
+                text_chars: Optional[float] = None, producer: Optional[str] = None) -> float:
+        """
+        Schätzt die Konvertierungsdauer einer Datei.
+
+        Args:
+            file_size: Dateigröße in Bytes
+            page_count: Anzahl der Seiten, falls bekannt
+            text_chars: Textmenge in Zeichen, falls bekannt
+            producer: Erzeuger der PDF-Datei, falls bekannt
+
+        Returns:
+            float: Geschätzte Dauer in Sekunden
+        """
+        if not self.is_fitted or page_count is None:
+            return DEFAULT_BASE_TIME + (file_size / (1024 * 1024)) * DEFAULT_TIME_PER_MB
+        if text_chars is None:
+            text_chars = page_count * self.text_density
+        row = self.features(file_size, page_count, text_chars, producer)
+        estimate = sum(c * v for c, v in zip(self.coefficients, row))
+        return max(float(estimate), 0.01)
+
+
+def order_by_predicted_duration(file_paths: List[str], predictions: Dict[str, float],
+                                longest_first: bool = False) -> List[str]:
+    """
+    Ordnet Aufträge nach ihrer geschätzten Dauer.
+
+    Für einen einzelnen Worker liefert "kürzeste zuerst" die meisten fertigen
+    Dateien in kürzester Zeit, für mehrere parallele Worker verkürzt
+    "längste zuerst" die Gesamtdauer.
+
+    Args:
+        file_paths: Zu ordnende Dateien
+        predictions: Geschätzte Dauer je Datei in Sekunden
+        longest_first: True für absteigende Reihenfolge
+
+    Returns:
+        List[str]: Geordnete Dateien
+    """
+    return sorted(file_paths, key=lambda path: predictions.get(path, 0.0), reverse=longest_first)
+
+
+_default_model: Optional[ConversionTimeModel] = None
+
+
+def get_time_model() -> ConversionTimeModel:
+    """Gibt das gemeinsam genutzte, aus dem Standardverlauf gelernte Modell zurück."""
+    global _default_model
+    if _default_model is None:
+        _default_model = ConversionTimeModel(RunHistory())
+    return _default_model
@@ -0,0 +1,300 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# ocr.py
+# Texterkennung (tesseract) für Seiten ohne Textebene, z.B. eingescannte PDF-Dateien
+
+import os
+import shutil
+import hashlib
+import threading
+import subprocess
+import multiprocessing
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Union
+
+from .errors import ConversionError
+from .executors import SharedThreadPool
+from .images import image_key, render_image, snapshot_image
+from .paths import atomic_write
+from .prescan import PrescanError, content_bytes, drawn_xobjects
+
+DEFAULT_OCR_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.pdf_magic', 'ocr_cache')
+# Auflösung beim Rastern ganzer Seiten; tesseract erkennt ab etwa 300 dpi zuverlässig
+OCR_DPI = 300
+# Höchstdauer je Seite für Rastern bzw. Texterkennung in Sekunden
+OCR_TIMEOUT = 300
+
+_pool = SharedThreadPool(os.cpu_count() or 1, "ocr")
+_budget_lock = threading.Lock()
+_budget: Optional[Any] = None
+
+
+def find_tesseract() -> str:
+    """
+    Sucht das tesseract-Programm.
+
+    Raises:
+        ConversionError: Wenn tesseract nicht installiert ist
+    """
+    path = shutil.which("tesseract")
+    if path is None:
+        raise ConversionError("Für die Texterkennung wird tesseract benötigt "
+                              "(z.B. apt install tesseract-ocr tesseract-ocr-deu)")
+    return path
+
+
+def default_ocr_cpus(jobs: int = 1) -> int:
+    """CPU-Budget für OCR neben jobs Konvertierungsprozessen (mindestens 1)."""
+    return max(1, (os.cpu_count() or 1) - max(1, jobs))
+
+
+def create_ocr_budget(cpus: int) -> Any:
+    """
+    Erzeugt das CPU-Budget eines Stapels: höchstens cpus Seiten werden
+    gleichzeitig gerastert bzw. erkannt, über alle Worker-Prozesse hinweg.
+    Das Budget wird mit set_ocr_budget (z.B. als initializer des
+    ProcessPoolExecutor) an die Prozesse weitergegeben.
+    """
+    return multiprocessing.BoundedSemaphore(max(1, cpus))
+
+
+def set_ocr_budget(budget: Any):
+    """Setzt das CPU-Budget des aktuellen Prozesses."""
+    global _budget
+    _budget = budget
+
+
+def get_ocr_budget() -> Any:
+    """Liefert das CPU-Budget des aktuellen Prozesses (ohne Stapel: alle CPUs bis auf eine)."""
+    global _budget
+    with _budget_lock:
+        if _budget is None:
+            _budget = threading.BoundedSemaphore(default_ocr_cpus())
+        return _budget
+
+
+def get_ocr_executor() -> ThreadPoolExecutor:
+    """
+    Thread-Pool, der die OCR-Prozesse startet und auf sie wartet. Die eigentliche
+    Arbeit leisten pdftoppm und tesseract als eigene Prozesse; wie viele davon
+    gleichzeitig laufen, begrenzt das CPU-Budget, nicht die Anzahl der Threads.
+    """
+    return _pool.get()
+
+
+def ocr_key(image_digest: str, lang: Optional[str]) -> str:
+    """Cache-Schlüssel aus der Prüfsumme des Seitenbildes und den Erkennungsparametern."""
+    return hashlib.sha256(f"{image_digest}|{lang or ''}".encode('utf-8')).hexdigest()
+
+
+class OcrCache:
+    """
+    Erkannte Texte als Dateien, abgelegt nach der Prüfsumme des Seitenbildes.
+    Die Dateien werden atomar geschrieben, so dass alle Worker-Prozesse (und
+    spätere Läufe) den Cache gemeinsam nutzen können. Der Ordner darf
+    jederzeit gelöscht werden.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Args:
+            directory: Ordner des Caches (Standard: ~/.pdf_magic/ocr_cache)
+        """
+        self.directory = directory or DEFAULT_OCR_CACHE_DIR
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".txt")
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            with open(self.path(key), 'r', encoding='utf-8') as cache_file:
+                return cache_file.read()
+        except OSError:
+            return None
+
+    def put(self, key: str, text: str):
+        path = self.path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+            def write_file(temp_path: str):
+                with open(temp_path, 'w', encoding='utf-8') as cache_file:
+                    cache_file.write(text)
+            atomic_write(path, write_file)
+        except OSError:
+            # Ein nicht beschreibbarer Cache kostet nur Zeit
+            pass
+
+
+def run_tesseract(tesseract: str, image: bytes, lang: Optional[str] = None) -> str:
+    """
+    Erkennt den Text eines Bildes (PNG, JPEG, TIFF, ...).
+
+    Raises:
+        ValueError: Wenn tesseract mit einem Fehler endet
+    """
+    command = [tesseract, "stdin", "stdout"]
+    if lang:
+        command += ["-l", lang]
+    # Ein Thread je tesseract-Prozess, sonst belegt jede Seite alle Kerne und das Budget greift nicht
+    env = dict(os.environ, OMP_THREAD_LIMIT="1")
+    process = subprocess.run(command, input=image, capture_output=True, env=env, timeout=OCR_TIMEOUT)
+    if process.returncode != 0:
+        message = process.stderr.decode('utf-8', 'replace').strip().splitlines()
+        raise ValueError(message[-1] if message else f"tesseract endete mit Code {process.returncode}")
+    # Seitenvorschub am Ende und andere Steuerzeichen sind in DOCX nicht erlaubt
+    text = process.stdout.decode('utf-8', 'replace')
+    return "".join(char for char in text if char in "\n\t" or char >= " ").strip()
+
+
+def rasterize_page(pdftoppm: str, pdf_path: str, page_num: int, dpi: int = OCR_DPI) -> bytes:
+    """
+    Rastert eine Seite als Graustufen-PNG.
+
+    Raises:
+        ValueError: Wenn pdftoppm mit einem Fehler endet
+    """
+    process = subprocess.run([pdftoppm, "-f", str(page_num), "-l", str(page_num), "-r", str(dpi),
+                              "-gray", "-png", pdf_path],
+                             capture_output=True, timeout=OCR_TIMEOUT)
+    if process.returncode != 0 or not process.stdout:
+        message = process.stderr.decode('utf-8', 'replace').strip().splitlines()
+        raise ValueError(message[-1] if message else f"pdftoppm endete mit Code {process.returncode}")
+    return process.stdout
+
+
+def largest_image(page: Any) -> Optional[Any]:
+    """Das flächenmäßig größte Bild, das eine Seite zeichnet, bei Scans die Seite selbst."""
+    resources = page.get("/Resources")
+    resources = resources.get_object() if resources is not None else None
+    xobjects = resources.get("/XObject") if resources else None
+    if xobjects is None:
+        return None
+    xobjects = xobjects.get_object()
+    try:
+        # Bei gemeinsamen Ressourcen aller Seiten zählen nur die gezeichneten Bilder
+        names = drawn_xobjects(content_bytes(page))
+    except PrescanError:
+        names = list(xobjects)
+    best, best_area = None, 0
+    for name in names:
+        if name not in xobjects:
+            continue
+        xobject = xobjects[name].get_object()
+        if xobject.get("/Subtype") != "/Image" or xobject.get("/ImageMask"):
+            continue
+        area = int(xobject.get("/Width", 0)) * int(xobject.get("/Height", 0))
+        if area > best_area:
+            best, best_area = xobject, area
+    return best
+
+
+class PageOcr:
+    """
+    Texterkennung für die Seiten eines Dokuments, die keinen extrahierbaren
+    Text enthalten.
+
+    Ist pdftoppm (poppler-utils) installiert, wird die ganze Seite gerastert,
+    sonst das größte eingebettete Bild der Seite erkannt, was bei Scans
+    dasselbe ist. Rastern und Erkennen laufen als eigene Prozesse parallel zur
+    Textextraktion; das CPU-Budget des Stapels begrenzt, wie viele davon
+    gleichzeitig laufen. Ergebnisse werden nach der Prüfsumme des Seitenbildes
+    im OcrCache abgelegt, so dass erneut konvertierte Scans nicht noch einmal
+    erkannt werden.
+    """
+
+    def __init__(self, pdf_path: Optional[str] = None, lang: Optional[str] = None,
+                 dpi: int = OCR_DPI, cache: Optional[OcrCache] = None):
+        """
+        Args:
+            pdf_path: Pfad der PDF-Datei; ohne Pfad (Bytes, Datenströme) werden nur eingebettete Bilder erkannt
+            lang: tesseract-Sprachen, z.B. "deu" oder "deu+eng" (Standard: Vorgabe von tesseract)
+            dpi: Auflösung beim Rastern
+            cache: Cache der erkannten Texte (Standard: ~/.pdf_magic/ocr_cache)
+
+        Raises:
+            ConversionError: Wenn tesseract nicht installiert ist
+        """
+        self.tesseract = find_tesseract()
+        self.pdftoppm = shutil.which("pdftoppm") if pdf_path else None
+        self.pdf_path = pdf_path
+        self.lang = lang
+        self.dpi = dpi
+        self.cache = cache if cache is not None else OcrCache()
+        self.results: Dict[int, Union[Future, str, Exception]] = {}
+        self.by_key: Dict[str, Future] = {}  # gleiche Seitenbilder im Dokument nur einmal erkennen
+
+    def submit(self, page_num: int, page: Any):
+        """Stößt die Erkennung einer Seite an; Bilddaten werden dabei im aufrufenden Thread gelesen."""
+        if self.pdftoppm:
+            self.results[page_num] = get_ocr_executor().submit(self.recognize_page, page_num)
+            return
+        try:
+            xobject = largest_image(page)
+            if xobject is None:
+                # Wirklich leere Seite, nichts zu erkennen
+                self.results[page_num] = ""
+                return
+            key = ocr_key(image_key(xobject), self.lang)
+            if key in self.by_key:
+                self.results[page_num] = self.by_key[key]
+                return
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.results[page_num] = cached
+                return
+            job = snapshot_image(xobject)
+        except Exception as e:
+            self.results[page_num] = e
+            return
+        self.results[page_num] = self.by_key[key] = get_ocr_executor().submit(self.recognize_image, key, job)
+
+    def recognize_page(self, page_num: int) -> str:
+        with get_ocr_budget():
+            image = rasterize_page(self.pdftoppm, self.pdf_path, page_num, self.dpi)
+            key = ocr_key(hashlib.sha256(image).hexdigest(), self.lang)
+            text = self.cache.get(key)
+            if text is not None:
+                return text
+            text = run_tesseract(self.tesseract, image, self.lang)
+        self.cache.put(key, text)
+        return text
+
+    def recognize_image(self, key: str, job: dict) -> str:
+        with get_ocr_budget():
+            _, image = render_image(job)
+            text = run_tesseract(self.tesseract, image, self.lang)
+        self.cache.put(key, text)
+        return text
+
+    def finish(self, on_warning: Optional[Callable[[str], None]] = None,
+               source_name: str = "<Datenstrom>") -> Dict[int, str]:
+        """
+        Wartet auf alle Seiten.
+
+        Returns:
+            Dict[int, str]: Seitennummer -> erkannter Text (auch leer)
+        """
+        texts = {}
+        for page_num, result in sorted(self.results.items()):
+            if isinstance(result, Future):
+                try:
+                    result = result.result()
+                except Exception as e:
+                    result = e
+            if isinstance(result, Exception):
+                if on_warning:
+                    on_warning(f"Warnung: Texterkennung für Seite {page_num} in {source_name} "
+                               f"fehlgeschlagen: {str(result)}")
+                result = ""
+            elif not result and on_warning:
+                on_warning(f"Warnung: Seite {page_num} in {source_name} enthält keinen extrahierbaren Text.")
+            texts[page_num] = result
+        return texts
+
+    def cancel(self):
+        """Verwirft noch nicht begonnene Erkennungen, z.B. nach einem Lesefehler."""
+        for result in self.results.values():
+            if isinstance(result, Future):
+                result.cancel()
@@ -0,0 +1,232 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# paths.py
+
+import os
+import stat
+import hashlib
+import tempfile
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Set, Union
+
+TEMP_PREFIX = "temp_"  # Wird von cleanup_temp_files erkannt
+
+IF_EXISTS_POLICIES = ("rename", "overwrite", "skip")
+
+
+class OutputPathAllocator:
+    """
+    Vergibt kollisionsfreie Ausgabepfade in einem Verzeichnis.
+
+    Das Verzeichnis wird einmalig eingelesen; danach werden Namen aus einem
+    Index im Speicher vergeben und über O_EXCL auf dem Datenträger belegt, so
+    dass auch parallele Worker oder andere Prozesse nie denselben Namen erhalten.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: Ausgabeverzeichnis
+        """
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.taken: Set[str] = set()
+        self.next_suffix: Dict[str, int] = {}
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    self.taken.add(os.path.normcase(entry.name))
+        except FileNotFoundError:
+            pass
+
+    def allocate(self, file_name: str, extension: Optional[str] = None) -> str:
+        """
+        Belegt einen freien Dateinamen, bei Bedarf mit Zähler (_1, _2, ...).
+
+        Args:
+            file_name: Gewünschter Dateiname
+            extension: Mehrteilige Endung, vor die der Zähler gesetzt wird
+                (z.B. ".volumes.json"); sonst die letzte Endung
+
+        Returns:
+            str: Pfad der belegten (leeren) Ausgabedatei
+        """
+        if extension and file_name.endswith(extension):
+            base, ext = file_name[:-len(extension)], extension
+        else:
+            base, ext = os.path.splitext(file_name)
+        return self.allocate_group(base, [ext])[ext]
+
+    def allocate_group(self, base: str, extensions: Sequence[str]) -> Dict[str, str]:
+        """
+        Belegt für mehrere Endungen denselben freien Namensstamm, z.B.
+        bericht_1.docx und bericht_1.txt statt bericht_1.docx und bericht.txt.
+
+        Args:
+            base: Gewünschter Name ohne Endung
+            extensions: Endungen mit Punkt, z.B. [".docx", ".txt"]
+
+        Returns:
+            Dict[str, str]: Endung -> Pfad der belegten (leeren) Ausgabedatei
+        """
+        key = os.path.normcase(base + "|".join(extensions))
+        with self.lock:
+            counter = self.next_suffix.get(key, 1)
+            stem = base
+            while True:
+                names = {ext: f"{stem}{ext}" for ext in extensions}
+                if not any(os.path.normcase(name) in self.taken for name in names.values()):
+                    paths = self.claim(names)
+                    if paths is not None:
+                        self.next_suffix[key] = counter
+                        return paths
+                stem = f"{base}_{counter}"
+                counter += 1
+
+    def claim(self, names: Dict[str, str]) -> Optional[Dict[str, str]]:
+        """Legt alle Namen per O_EXCL an; schlägt einer fehl, werden die übrigen zurückgegeben."""
+        paths = {}
+        for ext, name in names.items():
+            path = os.path.join(self.directory, name)
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+                os.close(fd)
+            except FileExistsError:
+                # Von außerhalb angelegt, seit das Verzeichnis eingelesen wurde
+                self.taken.add(os.path.normcase(name))
+                for claimed in paths.values():
+                    os.remove(claimed)
+                return None
+            paths[ext] = path
+        self.taken.update(os.path.normcase(name) for name in names.values())
+        return paths
+
+    def release(self, path: Union[str, Dict[str, str]]):
+        """
+        Gibt einen belegten Pfad wieder frei, falls die Ausgabe nicht geschrieben wurde.
+
+        Args:
+            path: Von allocate() vergebener Pfad (oder dict Format -> Pfad)
+        """
+        with self.lock:
+            for file_path in output_files(path):
+                try:
+                    if os.path.getsize(file_path) == 0:
+                        os.remove(file_path)
+                        self.taken.discard(os.path.normcase(os.path.basename(file_path)))
+                except OSError:
+                    pass
+
+
+def output_files(output: Union[str, Dict[str, str], None]) -> List[str]:
+    """Liefert die Dateipfade eines Ausgabeziels (Pfad oder dict Format -> Pfad)."""
+    if output is None:
+        return []
+    if isinstance(output, dict):
+        return list(output.values())
+    return [output]
+
+
+def resolve_output_path(pdf_path: str, output_dir: str, if_exists: str,
+                        allocator: OutputPathAllocator, extension: str = ".docx") -> Optional[str]:
+    """
+    Bestimmt den Ausgabepfad gemäß der gewählten Richtlinie.
+
+    Returns:
+        Optional[str]: Ausgabepfad oder None, wenn die Datei übersprungen wird
+    """
+    base_name = os.path.splitext(os.path.basename(pdf_path))[0]
+    file_name = f"{base_name}{extension}"
+    target = os.path.join(output_dir, file_name)
+    if if_exists == "overwrite":
+        return target
+    if if_exists == "skip" and os.path.exists(target):
+        return None
+    return allocator.allocate(file_name, extension)
+
+
+
+def resolve_output_targets(pdf_path: str, output_dir: str, if_exists: str,
+                           allocator: OutputPathAllocator,
+                           formats: Sequence[str] = ("docx",)) -> Union[str, Dict[str, str], None]:
+    """
+    Bestimmt die Ausgabepfade für ein oder mehrere Formate.
+
+    Returns:
+        Union[str, Dict[str, str], None]: Nur DOCX: Pfad wie resolve_output_path;
+            sonst dict Format -> Pfad ohne übersprungene Formate, bei rename mit demselben
+            Namensstamm für alle Formate; None, wenn alles übersprungen wird
+    """
+    if list(formats) == ["docx"]:
+        return resolve_output_path(pdf_path, output_dir, if_exists, allocator)
+    base_name = os.path.splitext(os.path.basename(pdf_path))[0]
+    if if_exists == "overwrite":
+        return {output_format: os.path.join(output_dir, f"{base_name}.{output_format}")
+                for output_format in formats}
+    if if_exists == "skip":
+        formats = [output_format for output_format in formats
+                   if not os.path.exists(os.path.join(output_dir, f"{base_name}.{output_format}"))]
+        if not formats:
+            return None
+    # Ein gemeinsamer Namensstamm, damit alle Formate einer Eingabe zusammengehören
+    paths = allocator.allocate_group(base_name, [f".{output_format}" for output_format in formats])
+    return {output_format: paths[f".{output_format}"] for output_format in formats}
+
+
+def file_digest(path: str) -> str:
+    """Berechnet die SHA-256-Prüfsumme einer Datei, ohne sie vollständig zu laden."""
+    sha = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def files_identical(first_path: str, second_path: str) -> bool:
+    """Vergleicht zwei Dateien über Größe und SHA-256-Prüfsumme."""
+    try:
+        if os.path.getsize(first_path) != os.path.getsize(second_path):
+            return False
+    except FileNotFoundError:
+        return False
+    return file_digest(first_path) == file_digest(second_path)
+
+
+def atomic_write(target_path: str, write_func: Callable[[str], None], skip_identical: bool = False) -> bool:
+    """
+    Schreibt eine Datei über eine temporäre Datei im Zielverzeichnis und
+    benennt sie anschließend atomar um, so dass nie halb geschriebene
+    Ausgaben entstehen.
+
+    Args:
+        target_path: Endgültiger Pfad der Datei
+        write_func: Funktion, die den Inhalt in den übergebenen Pfad schreibt (z.B. doc.save)
+        skip_identical: Vorhandene Datei unverändert lassen (inkl. Änderungszeit),
+            wenn der neue Inhalt identisch ist
+
+    Returns:
+        bool: False, wenn die vorhandene Datei wegen identischen Inhalts nicht ersetzt wurde
+    """
+    directory = os.path.dirname(target_path) or "."
+    fd, temp_path = tempfile.mkstemp(prefix=TEMP_PREFIX, suffix=".tmp", dir=directory)
+    os.close(fd)
+    try:
+        write_func(temp_path)
+        if skip_identical and files_identical(temp_path, target_path):
+            os.remove(temp_path)
+            return False
+        # mkstemp legt die Datei mit 0600 an, Rechte des belegten Ziels übernehmen
+        try:
+            mode = stat.S_IMODE(os.stat(target_path).st_mode)
+        except FileNotFoundError:
+            mode = 0o644
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, target_path)
+        return True
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,200 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# prescan.py
+# Schnelle Vorprüfung der Seiten anhand der Operatoren im Inhaltsstrom, ohne Glyphen zu dekodieren
+
+import re
+from typing import Any, Dict, Iterator, List
+
+PAGE_TEXT = "text"    # Enthält Textoperatoren (ggf. zusätzlich Bilder)
+PAGE_IMAGE = "image"  # Nur Bilder, z.B. eingescannte Seiten
+PAGE_EMPTY = "empty"  # Weder Text noch Bilder (leere Seiten, reine Vektorgrafik)
+PAGE_KINDS = (PAGE_TEXT, PAGE_IMAGE, PAGE_EMPTY)
+
+TEXT_OPERATORS = {b"Tj", b"TJ", b"'", b'"'}
+
+# Formulare (Form-XObjects) werden bis zu dieser Tiefe durchsucht
+MAX_FORM_DEPTH = 3
+
+# Beginn von Zeichenketten, Hex-Zeichenketten, Namen, Operatoren und Kommentaren;
+# Zahlen und Klammern von Arrays werden übersprungen
+TOKEN_PATTERN = re.compile(rb"\("
+                           rb"|<[0-9A-Fa-f\s]*>"
+                           rb"|/[^\s/\[\]()<>{}%]*"
+                           rb"|[A-Za-z'\"][A-Za-z0-9*'\"]*"
+                           rb"|%[^\r\n]*")
+STRING_SPECIAL = re.compile(rb"[\\()]")
+# Ende eingebetteter Bilddaten (BI ... ID <Daten> EI)
+INLINE_IMAGE_END = re.compile(rb"\sEI(?=[\s/\[<(]|$)")
+
+
+class PrescanError(Exception):
+    """Der Inhalt einer Seite konnte nicht vorab geprüft werden"""
+
+
+def content_bytes(page: Any) -> bytes:
+    """Dekomprimierter Inhaltsstrom einer Seite (auch aus mehreren Teilen)."""
+    contents = page.get("/Contents")
+    if contents is None:
+        return b""
+    contents = contents.get_object()
+    if isinstance(contents, list):
+        return b"\n".join(part.get_object().get_data() for part in contents)
+    return contents.get_data()
+
+
+def string_end(data: bytes, start: int) -> int:
+    """
+    Position hinter einer Zeichenkette (...), die bei start beginnt; Klammern
+    dürfen beliebig tief verschachtelt sein, solange sie paarig sind.
+
+    Raises:
+        PrescanError: Wenn die Zeichenkette nicht endet
+    """
+    depth = 0
+    position = start
+    while True:
+        match = STRING_SPECIAL.search(data, position)
+        if match is None:
+            raise PrescanError("Zeichenkette ohne Ende")
+        position = match.end()
+        char = match.group()
+        if char == b"\\":
+            position += 1
+        elif char == b"(":
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return position
+
+
+def iter_tokens(data: bytes) -> Iterator[bytes]:
+    """
+    Zerlegt einen Inhaltsstrom in Zeichenketten, Namen, Operatoren und
+    Kommentare. Die Binärdaten eingebetteter Bilder werden übersprungen;
+    für sie erscheint nur der Operator ID.
+
+    Raises:
+        PrescanError: Bei einer Zeichenkette ohne Ende
+    """
+    position = 0
+    while True:
+        match = TOKEN_PATTERN.search(data, position)
+        if match is None:
+            return
+        if match.group() == b"(":
+            position = string_end(data, match.start())
+            yield data[match.start():position]
+            continue
+        position = match.end()
+        yield match.group()
+        if match.group() == b"ID":
+            end = INLINE_IMAGE_END.search(data, position)
+            position = end.end() if end else len(data)
+
+
+def drawn_xobjects(data: bytes) -> List[str]:
+    """
+    Namen der XObjects, die ein Inhaltsstrom mit Do zeichnet, in
+    Zeichenreihenfolge (ohne Wiederholungen).
+
+    Raises:
+        PrescanError: Wenn der Inhaltsstrom nicht zerlegt werden kann
+    """
+    names = []
+    last_name = None
+    for token in iter_tokens(data):
+        if token[:1] == b"/":
+            last_name = token
+            continue
+        if token == b"Do" and last_name is not None:
+            names.append(last_name.decode('latin-1'))
+        if token[:1] != b"%":
+            last_name = None
+    return list(dict.fromkeys(names))
+
+
+def scan_content(data: bytes, resources: Any, depth: int = 0) -> str:
+    """
+    Ordnet einen Inhaltsstrom ein. Der Strom wird nur in Token zerlegt; bei
+    Textseiten endet die Prüfung schon beim ersten Textoperator mit nicht
+    leerer Zeichenkette. Formulare (Form-XObjects) werden mitgeprüft.
+
+    Raises:
+        PrescanError: Bei unvollständigen Zeichenketten oder zu tief verschachtelten Formularen
+    """
+    resources = resources.get_object() if resources is not None else None
+    xobjects = resources.get("/XObject") if resources else None
+    xobjects = xobjects.get_object() if xobjects is not None else {}
+    has_images = False
+    last_name = None
+    has_string = False
+    for token in iter_tokens(data):
+        first = token[:1]
+        if first == b"(":
+            has_string = has_string or len(token) > 2
+        elif first == b"<":
+            has_string = has_string or len(token.strip(b"<> \t\r\n")) > 0
+        elif first == b"/":
+            last_name = token
+        elif first == b"%":
+            continue
+        else:
+            if token in TEXT_OPERATORS:
+                if has_string:
+                    return PAGE_TEXT
+            elif token == b"Do" and last_name is not None:
+                xobject = xobjects.get(last_name.decode('latin-1'))
+                xobject = xobject.get_object() if xobject is not None else None
+                subtype = xobject.get("/Subtype") if xobject is not None else None
+                if subtype == "/Image":
+                    has_images = True
+                elif subtype == "/Form":
+                    if depth >= MAX_FORM_DEPTH:
+                        raise PrescanError("Formulare sind zu tief verschachtelt")
+                    nested = scan_content(xobject.get_data(), xobject.get("/Resources") or resources,
+                                          depth + 1)
+                    if nested == PAGE_TEXT:
+                        return PAGE_TEXT
+                    has_images = has_images or nested == PAGE_IMAGE
+            elif token == b"ID":
+                has_images = True
+            has_string = False
+            last_name = None
+    return PAGE_IMAGE if has_images else PAGE_EMPTY
+
+
+def classify_page(page: Any) -> str:
+    """
+    Ordnet eine Seite anhand ihres Inhaltsstroms als PAGE_TEXT, PAGE_IMAGE
+    oder PAGE_EMPTY ein, ohne Schriften zu laden oder Glyphen zu dekodieren.
+    Im Zweifel (unlesbarer Inhalt, Zeichenkette ohne Ende) gilt die Seite als
+    Textseite, damit die vollständige Extraktion sie prüft.
+    """
+    try:
+        return scan_content(content_bytes(page), page.get("/Resources"))
+    except Exception:
+        return PAGE_TEXT
+
+
+def count_page_kinds(kinds: List[str]) -> Dict[str, int]:
+    """Anzahl der Seiten je Art, z.B. für Ergebnisse und den Archiv-Index."""
+    return {kind: kinds.count(kind) for kind in PAGE_KINDS}
+
+
+def prescan_pdf(pdf_path: str) -> dict:
+    """
+    Prüft alle Seiten einer PDF-Datei vorab, ohne den Text zu extrahieren.
+
+    Args:
+        pdf_path (str): Pfad zur PDF-Datei
+
+    Returns:
+        dict: kinds (Art je Seite) und page_kinds (Anzahl je Art)
+    """
+    from PyPDF2 import PdfReader
+
+    kinds = [classify_page(page) for page in PdfReader(pdf_path).pages]
+    return {"kinds": kinds, "page_kinds": count_page_kinds(kinds)}
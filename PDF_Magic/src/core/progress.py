@@ -0,0 +1,155 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# progress.py
+
+import os
+import time
+from typing import Dict, Optional
+
+
+def format_duration(seconds: float) -> str:
+    """
+    Formatiert eine Dauer in Sekunden als HH:MM:SS bzw. MM:SS.
+
+    Args:
+        seconds (float): Dauer in Sekunden
+
+    Returns:
+        str: Formatierte Dauer
+    """
+    seconds = max(0, int(round(seconds)))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours:d}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+class BatchProgress:
+    """
+    Verfolgt den Fortschritt eines Konvertierungslaufs auf Seitenebene und
+    berechnet Durchsatz (Seiten/s, Bytes/s) sowie die Restzeit.
+    """
+
+    def __init__(self, total_pages: int, total_bytes: int, min_interval: float = 0.25,
+                 predictions: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            total_pages: Seitenanzahl aller Dateien des Laufs
+            total_bytes: Gesamtgröße aller Dateien des Laufs in Bytes
+            min_interval: Minimaler Abstand zwischen zwei Meldungen in Sekunden
+            predictions: Vom Zeitmodell geschätzte Dauer je Datei in Sekunden
+        """
+        self.total_pages = max(total_pages, 1)
+        self.total_bytes = max(total_bytes, 1)
+        self.min_interval = min_interval
+        self.pages_done = 0
+        self.bytes_done = 0
+        self.start_time = time.monotonic()
+        self.last_report = 0.0
+        self.current_file: Optional[str] = None
+        self.current_file_pages = 0
+        self.current_file_size = 0
+        self.current_page = 0
+        self.predictions = predictions or {}
+        self.remaining_predicted = sum(self.predictions.values())
+        self.done_predicted = 0.0
+
+    def start_file(self, file_path: str, page_count: int, file_size: int):
+        """Markiert den Beginn der Verarbeitung einer Datei."""
+        self.current_file = file_path
+        self.current_file_pages = page_count
+        self.current_file_size = file_size
+        self.current_page = 0
+
+    def page_done(self, page_num: int) -> bool:
+        """
+        Verbucht eine verarbeitete Seite der aktuellen Datei.
+
+        Args:
+            page_num: Nummer der zuletzt verarbeiteten Seite (ab 1)
+
+        Returns:
+            bool: True, wenn eine Fortschrittsmeldung fällig ist
+        """
+        self.pages_done += page_num - self.current_page
+        self.current_page = page_num
+        return self.should_report()
+
+    def file_done(self) -> bool:
+        """
+        Schließt die aktuelle Datei ab, auch wenn nicht alle Seiten verarbeitet wurden.
+
+        Returns:
+            bool: True, wenn eine Fortschrittsmeldung fällig ist
+        """
+        self.pages_done += self.current_file_pages - self.current_page
+        self.current_page = self.current_file_pages
+        self.bytes_done += self.current_file_size
+        predicted = self.predictions.get(self.current_file, 0.0)
+        self.remaining_predicted -= predicted
+        self.done_predicted += predicted
+        return self.should_report(force=True)
+
+    def should_report(self, force: bool = False) -> bool:
+        """Drosselt die Meldungen auf höchstens eine pro min_interval."""
+        now = time.monotonic()
+        if force or now - self.last_report >= self.min_interval:
+            self.last_report = now
+            return True
+        return False
+
+    @property
+    def elapsed(self) -> float:
+        return max(time.monotonic() - self.start_time, 1e-6)
+
+    @property
+    def percent(self) -> int:
+        return min(100, int(self.pages_done * 100 / self.total_pages))
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages_done / self.elapsed
+
+    @property
+    def bytes_per_second(self) -> float:
+        # Anteil der aktuellen Datei nach verarbeiteten Seiten mitzählen
+        partial = 0
+        if self.current_file_pages:
+            partial = self.current_file_size * self.current_page / self.current_file_pages
+        return (self.bytes_done + partial) / self.elapsed
+
+    def eta_seconds(self) -> Optional[float]:
+        """
+        Schätzt die Restzeit aus dem gemessenen Durchsatz.
+
+        Returns:
+            Optional[float]: Restzeit in Sekunden oder None, solange noch kein Durchsatz messbar ist
+        """
+        estimates = []
+        if self.predictions:
+            # Modellschätzung, kalibriert am bisherigen Verhältnis von Ist- zu Sollzeit
+            fraction = self.current_page / self.current_file_pages if self.current_file_pages else 0.0
+            current = self.predictions.get(self.current_file, 0.0)
+            remaining = self.remaining_predicted - current * fraction
+            calibration = self.elapsed / self.done_predicted if self.done_predicted > 0 else 1.0
+            estimates.append(max(remaining, 0.0) * calibration)
+        if self.pages_done and self.pages_per_second > 0:
+            estimates.append((self.total_pages - self.pages_done) / self.pages_per_second)
+        if self.bytes_per_second > 0:
+            remaining_bytes = self.total_bytes - self.bytes_per_second * self.elapsed
+            estimates.append(max(remaining_bytes, 0) / self.bytes_per_second)
+        if not estimates:
+            return None
+        return sum(estimates) / len(estimates)
+
+    def status_text(self) -> str:
+        """Erstellt den Statustext mit aktueller Datei, Seite und Durchsatz."""
+        name = os.path.basename(self.current_file) if self.current_file else "-"
+        eta = self.eta_seconds()
+        eta_text = format_duration(eta) if eta is not None else "--:--"
+        return (f"{name} - Seite {self.current_page}/{self.current_file_pages} - "
+                f"{self.pages_per_second:.1f} Seiten/s, "
+                f"{self.bytes_per_second / (1024 * 1024):.2f} MB/s - "
+                f"Restzeit ca. {eta_text}")
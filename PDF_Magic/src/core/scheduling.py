@@ -0,0 +1,160 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# scheduling.py
+# Gewichtete, faire Verteilung der Aufträge mehrerer Clients auf die Worker
+
+from collections import deque
+from typing import Deque, Dict, Optional
+
+PRIORITY_CLASSES = ("high", "normal", "low")
+DEFAULT_PRIORITY = "normal"
+
+
+class ClientState:
+    """Warteschlangen und Kennzahlen eines Clients"""
+
+    def __init__(self, client_id: str, weight: float, max_running: int):
+        self.client_id = client_id
+        self.weight = weight
+        self.max_running = max_running
+        self.queues: Dict[str, Deque] = {priority: deque() for priority in PRIORITY_CLASSES}
+        self.running = 0
+        self.virtual_time = 0.0
+        self.started = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self.queues.values())
+
+    def record_wait(self, wait_seconds: float):
+        self.started += 1
+        self.total_wait += wait_seconds
+        self.max_wait = max(self.max_wait, wait_seconds)
+
+    def stats(self) -> dict:
+        return {"queued": self.queued, "running": self.running, "weight": self.weight,
+                "started": self.started,
+                "avg_wait": round(self.total_wait / self.started, 3) if self.started else 0.0,
+                "max_wait": round(self.max_wait, 3)}
+
+
+class FairScheduler:
+    """
+    Hält je Client eine eigene Warteschlange und wählt den nächsten Auftrag
+    nach gewichteter fairer Verteilung (Stride Scheduling): Jeder gestartete
+    Auftrag erhöht die virtuelle Zeit des Clients um 1/Gewicht, gestartet
+    wird immer beim Client mit der kleinsten virtuellen Zeit. So kann ein
+    Client mit 20.000 Dateien die anderen nicht verdrängen.
+
+    Prioritätsklassen werden strikt nacheinander bedient ("high" vor
+    "normal" vor "low"); innerhalb einer Klasse gilt die faire Verteilung.
+    Zusätzlich ist die Anzahl gleichzeitig laufender Aufträge je Client begrenzt.
+
+    Clients ohne wartende oder laufende Aufträge werden vergessen, damit
+    beliebig viele Client-IDs weder Speicher binden noch pop() verlangsamen.
+    Kehrt ein Client zurück, beginnt er bei der aktuellen virtuellen Zeit.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None,
+                 max_running_per_client: Optional[int] = None, default_weight: float = 1.0):
+        """
+        Args:
+            weights: Gewicht je Client-ID (Standard: default_weight)
+            max_running_per_client: Maximale Anzahl gleichzeitig laufender Aufträge je Client
+            default_weight: Gewicht nicht konfigurierter Clients
+        """
+        self.weights = weights or {}
+        self.max_running_per_client = max_running_per_client
+        self.default_weight = default_weight
+        self.clients: Dict[str, ClientState] = {}
+        self.virtual_clock = 0.0
+        self.total_queued = 0
+
+    def client(self, client_id: str) -> ClientState:
+        state = self.clients.get(client_id)
+        if state is None:
+            state = ClientState(client_id, self.weights.get(client_id, self.default_weight),
+                                self.max_running_per_client or 0)
+            self.clients[client_id] = state
+        return state
+
+    def forget_if_idle(self, state: ClientState):
+        """Entfernt einen Client ohne wartende und laufende Aufträge."""
+        if state.queued == 0 and state.running == 0:
+            del self.clients[state.client_id]
+
+    def push(self, job):
+        """Stellt einen Auftrag (mit client_id und priority) in die Warteschlange seines Clients."""
+        state = self.client(job.client_id)
+        if state.queued == 0 and state.running == 0:
+            # Ein wieder aktiver Client erhält kein angespartes Guthaben aus Leerlaufzeiten
+            state.virtual_time = max(state.virtual_time, self.virtual_clock)
+        state.queues[job.priority].append(job)
+        self.total_queued += 1
+
+    def pop(self, now: float):
+        """
+        Entnimmt den nächsten startbereiten Auftrag.
+
+        Args:
+            now: Aktuelle Zeit (time.monotonic()) für die Wartezeit-Statistik
+
+        Returns:
+            Der Auftrag oder None, wenn kein Client starten darf
+        """
+        for priority in PRIORITY_CLASSES:
+            eligible = [state for state in self.clients.values()
+                        if state.queues[priority]
+                        and (not state.max_running or state.running < state.max_running)]
+            if not eligible:
+                continue
+            state = min(eligible, key=lambda s: s.virtual_time)
+            job = state.queues[priority].popleft()
+            self.total_queued -= 1
+            self.virtual_clock = state.virtual_time
+            state.virtual_time += 1.0 / state.weight
+            state.running += 1
+            state.record_wait(now - job.submitted_at)
+            return job
+        return None
+
+    def remove(self, job) -> bool:
+        """Entfernt einen wartenden Auftrag; gibt False zurück, wenn er nicht (mehr) wartet."""
+        state = self.clients.get(job.client_id)
+        if state is None:
+            return False
+        try:
+            state.queues[job.priority].remove(job)
+        except ValueError:
+            return False
+        self.total_queued -= 1
+        self.forget_if_idle(state)
+        return True
+
+    def finished(self, job):
+        """Meldet das Ende eines zuvor mit pop() gestarteten Auftrags."""
+        state = self.clients[job.client_id]
+        state.running -= 1
+        self.forget_if_idle(state)
+
+    def queued_for(self, client_id: str) -> int:
+        state = self.clients.get(client_id)
+        return state.queued if state else 0
+
+    def drain(self):
+        """Entfernt alle wartenden Aufträge und liefert sie zurück."""
+        for state in list(self.clients.values()):
+            for queue in state.queues.values():
+                while queue:
+                    self.total_queued -= 1
+                    yield queue.popleft()
+            self.forget_if_idle(state)
+
+    def stats(self) -> Dict[str, dict]:
+        return {client_id: state.stats() for client_id, state in self.clients.items()}
+
+    def __len__(self) -> int:
+        return self.total_queued
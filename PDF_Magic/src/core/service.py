@@ -0,0 +1,237 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# service.py
+# Auftragswarteschlange mit begrenztem Prozess-Pool für den Konvertierungsdienst
+
+import os
+import time
+import signal
+import logging
+import threading
+from functools import partial
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
+
+from .engine import convert_job
+from .scheduling import DEFAULT_PRIORITY, FairScheduler
+
+
+class ServiceOverloaded(Exception):
+    """Die Warteschlange ist voll; der Auftrag wurde nicht angenommen"""
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(self.message)
+
+
+class JobTimeout(BaseException):
+    """
+    Die Konvertierung hat ihr Zeitlimit überschritten und wurde im Worker
+    abgebrochen. Wie KeyboardInterrupt keine Exception, damit sie nicht von
+    Fehlerbehandlungen einzelner Seiten abgefangen wird.
+    """
+
+
+def convert_with_time_limit(pdf_path: str, docx_path: str, time_limit: Optional[float] = None) -> dict:
+    """
+    Führt convert_job im Worker-Prozess mit Zeitlimit aus. Nach Ablauf wird
+    die Konvertierung per SIGALRM abgebrochen, so dass der Worker sofort für
+    den nächsten Auftrag frei ist. Ohne SIGALRM (Windows) gilt kein Limit.
+
+    Raises:
+        JobTimeout: Wenn das Zeitlimit überschritten wurde
+    """
+    if time_limit is None or not hasattr(signal, "setitimer"):
+        return convert_job(pdf_path, docx_path)
+
+    def expire(signum, frame):
+        raise JobTimeout(f"Zeitlimit von {time_limit:.0f} s überschritten")
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, max(time_limit, 0.001))
+    try:
+        return convert_job(pdf_path, docx_path)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+class ConversionJob:
+    """Ein angenommener Konvertierungsauftrag"""
+
+    def __init__(self, pdf_path: str, docx_path: str, client_id: str = "default",
+                 priority: str = DEFAULT_PRIORITY):
+        self.pdf_path = pdf_path
+        self.docx_path = docx_path
+        self.client_id = client_id
+        self.priority = priority
+        self.future: Future = Future()
+        self.submitted_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.abandoned = False
+
+    @property
+    def wait_seconds(self) -> float:
+        """Zeit in der Warteschlange bis zum Start (bzw. bis jetzt)."""
+        return (self.started_at or time.monotonic()) - self.submitted_at
+
+
+class ConversionService:
+    """
+    Nimmt Aufträge an, hält sie in begrenzten Warteschlangen je Client und
+    gibt immer nur so viele an den Prozess-Pool weiter, wie Worker frei sind.
+    Die Reihenfolge bestimmt der FairScheduler. Ist die Warteschlange voll,
+    wird ServiceOverloaded ausgelöst, statt unbegrenzt Aufträge anzunehmen.
+    """
+
+    def __init__(self, jobs: int = 2, max_queue: int = 32, max_queue_per_client: Optional[int] = None,
+                 max_running_per_client: Optional[int] = None,
+                 client_weights: Optional[Dict[str, float]] = None,
+                 time_limit: Optional[float] = None):
+        """
+        Args:
+            jobs: Anzahl paralleler Konvertierungsprozesse
+            max_queue: Maximale Anzahl wartender Aufträge insgesamt
+            max_queue_per_client: Maximale Anzahl wartender Aufträge je Client (Standard: max_queue)
+            max_running_per_client: Maximale Anzahl gleichzeitig laufender Aufträge je Client
+            client_weights: Gewichte für die faire Verteilung je Client-ID
+            time_limit: Höchstdauer eines Auftrags ab Annahme in Sekunden; danach
+                wird die Konvertierung im Worker abgebrochen (nicht unter Windows)
+        """
+        self.jobs = max(jobs, 1)
+        self.max_queue = max_queue
+        self.max_queue_per_client = max_queue_per_client or max_queue
+        self.time_limit = time_limit
+        self.executor = ProcessPoolExecutor(max_workers=self.jobs)
+        # Reentrant, da Done-Callbacks auch direkt in dispatch() laufen können
+        self.lock = threading.RLock()
+        self.scheduler = FairScheduler(client_weights, max_running_per_client)
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.logger = logging.getLogger('ConversionService')
+
+    def check_capacity(self, client_id: str) -> Optional[str]:
+        """
+        Prüft, ob ein neuer Auftrag des Clients derzeit abgelehnt würde.
+
+        Returns:
+            Optional[str]: Fehlermeldung oder None, wenn Platz ist
+        """
+        with self.lock:
+            if len(self.scheduler) >= self.max_queue:
+                return f"Warteschlange voll ({self.max_queue} Aufträge)"
+            if self.scheduler.queued_for(client_id) >= self.max_queue_per_client:
+                return f"Warteschlange für {client_id} voll ({self.max_queue_per_client} Aufträge)"
+            return None
+
+    def submit(self, pdf_path: str, docx_path: str, client_id: str = "default",
+               priority: str = DEFAULT_PRIORITY) -> ConversionJob:
+        """
+        Stellt einen Auftrag in die Warteschlange des Clients.
+
+        Raises:
+            ServiceOverloaded: Wenn die Warteschlange voll ist
+        """
+        job = ConversionJob(pdf_path, docx_path, client_id, priority)
+        with self.lock:
+            error_msg = self.check_capacity(client_id)
+            if error_msg:
+                raise ServiceOverloaded(error_msg)
+            self.scheduler.push(job)
+        self.dispatch()
+        return job
+
+    def dispatch(self):
+        """Gibt wartende Aufträge an freie Worker weiter."""
+        with self.lock:
+            while self.running < self.jobs:
+                now = time.monotonic()
+                job = self.scheduler.pop(now)
+                if job is None:
+                    break
+                job.started_at = now
+                if not job.future.set_running_or_notify_cancel():
+                    self.scheduler.finished(job)
+                    continue
+                time_limit = None
+                if self.time_limit is not None:
+                    # Die Wartezeit zählt mit, der Client wartet insgesamt nur time_limit
+                    time_limit = self.time_limit - job.wait_seconds
+                try:
+                    pool_future = self.submit_to_pool(job, time_limit)
+                except Exception as e:
+                    self.scheduler.finished(job)
+                    self.failed += 1
+                    job.future.set_exception(e)
+                    continue
+                # Erst nach erfolgreicher Übergabe belegt der Auftrag einen Worker
+                self.running += 1
+                pool_future.add_done_callback(partial(self.job_done, job, self.executor))
+
+    def submit_to_pool(self, job: ConversionJob, time_limit: Optional[float]) -> Future:
+        """Übergibt einen Auftrag an den Pool; ein defekter Pool wird einmal ersetzt."""
+        try:
+            return self.executor.submit(convert_with_time_limit, job.pdf_path, job.docx_path, time_limit)
+        except BrokenProcessPool:
+            self.replace_pool(self.executor)
+            return self.executor.submit(convert_with_time_limit, job.pdf_path, job.docx_path, time_limit)
+
+    def replace_pool(self, broken: ProcessPoolExecutor):
+        """
+        Ersetzt einen defekten Prozess-Pool (z.B. nach einem abgestürzten
+        Worker) durch einen neuen, sofern das nicht schon geschehen ist.
+        """
+        with self.lock:
+            if self.executor is not broken:
+                return
+            self.logger.warning("Prozess-Pool defekt, Worker werden neu gestartet")
+            self.executor = ProcessPoolExecutor(max_workers=self.jobs)
+        broken.shutdown(wait=False)
+
+    def job_done(self, job: ConversionJob, executor: ProcessPoolExecutor, pool_future: Future):
+        """Überträgt das Ergebnis aus dem Pool und startet den nächsten Auftrag."""
+        with self.lock:
+            self.running -= 1
+            self.scheduler.finished(job)
+        error = pool_future.exception()
+        if isinstance(error, BrokenProcessPool):
+            self.replace_pool(executor)
+        if error is None:
+            self.completed += 1
+            job.future.set_result(pool_future.result())
+        else:
+            self.failed += 1
+            job.future.set_exception(error)
+        if job.abandoned:
+            # Der Client wartet nicht mehr, die Ausgabe wird nicht mehr gebraucht
+            try:
+                os.remove(job.docx_path)
+            except OSError:
+                pass
+        self.dispatch()
+
+    def abandon(self, job: ConversionJob):
+        """
+        Gibt einen Auftrag auf, z.B. nach einer Zeitüberschreitung.
+        Wartende Aufträge werden entfernt; laufende bricht der Worker mit
+        time_limit selbst ab, sonst dürfen sie zu Ende laufen.
+        """
+        with self.lock:
+            job.abandoned = True
+            if self.scheduler.remove(job):
+                job.future.cancel()
+
+    def stats(self) -> dict:
+        """Liefert den aktuellen Zustand der Warteschlange."""
+        with self.lock:
+            return {"queued": len(self.scheduler), "running": self.running, "jobs": self.jobs,
+                    "max_queue": self.max_queue, "completed": self.completed, "failed": self.failed,
+                    "clients": self.scheduler.stats()}
+
+    def shutdown(self):
+        """Verwirft wartende Aufträge und beendet den Prozess-Pool."""
+        with self.lock:
+            for job in list(self.scheduler.drain()):
+                job.future.cancel()
+        self.executor.shutdown(wait=True)
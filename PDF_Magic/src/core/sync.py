@@ -0,0 +1,238 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# sync.py
+# Inkrementeller Abgleich eines Eingabebaums mit einem gespiegelten Ausgabebaum
+
+import os
+import json
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .batch import convert_tasks
+from .paths import atomic_write, file_digest
+from .watcher import is_candidate
+from .writers import get_writer
+
+SYNC_STATE_NAME = ".pdf_magic_sync.jsonl"
+
+
+class SyncState:
+    """
+    Sidecar-Manifest des Abgleichs: je Quelle (Pfad relativ zum Eingabebaum)
+    Größe, Änderungszeit, optional die Prüfsumme und die erzeugten Ausgaben.
+
+    Änderungen werden während des Laufs als JSON-Lines angehängt, so dass ein
+    abgebrochener Lauf beim nächsten Mal nichts doppelt konvertiert; compact()
+    schreibt die Datei zum Schluss mit nur einer Zeile je Quelle neu.
+    """
+
+    def __init__(self, state_path: str):
+        """
+        Args:
+            state_path: Pfad des Manifests
+        """
+        self.state_path = state_path
+        self.entries: Dict[str, dict] = {}
+        self.load()
+        self.log_file = open(state_path, 'a', encoding='utf-8')
+
+    def load(self):
+        if not os.path.exists(self.state_path):
+            return
+        with open(self.state_path, 'r', encoding='utf-8') as state_file:
+            for line in state_file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Abgebrochene letzte Zeile nach einem Absturz
+                    continue
+                if record.get("removed"):
+                    self.entries.pop(record["source"], None)
+                else:
+                    self.entries[record["source"]] = record
+
+    def write_line(self, record: dict):
+        self.log_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.log_file.flush()
+
+    def record(self, entry: dict):
+        """Vermerkt den aktuellen Stand einer Quelle."""
+        self.entries[entry["source"]] = entry
+        self.write_line(entry)
+
+    def remove(self, source: str):
+        """Vergisst eine gelöschte Quelle."""
+        self.entries.pop(source, None)
+        self.write_line({"source": source, "removed": True})
+
+    def compact(self):
+        """Schreibt das Manifest mit genau einer Zeile je Quelle neu."""
+        self.log_file.close()
+
+        def write_file(temp_path: str):
+            with open(temp_path, 'w', encoding='utf-8') as state_file:
+                for source in sorted(self.entries):
+                    state_file.write(json.dumps(self.entries[source], ensure_ascii=False) + "\n")
+        atomic_write(self.state_path, write_file)
+        self.log_file = open(self.state_path, 'a', encoding='utf-8')
+
+    def close(self):
+        self.log_file.close()
+
+
+def scan_tree(input_dir: str, exclude_dir: Optional[str] = None) -> Iterator[Tuple[str, str, os.stat_result]]:
+    """
+    Durchsucht einen Verzeichnisbaum nach PDF-Dateien (sortiert, ohne versteckte Dateien).
+
+    Args:
+        input_dir: Wurzel des Eingabebaums
+        exclude_dir: Nicht zu durchsuchendes Verzeichnis, z.B. ein im Eingabebaum liegender Ausgabebaum
+
+    Yields:
+        Tuple[str, str, os.stat_result]: Relativer Pfad (mit "/"), voller Pfad und stat-Ergebnis
+    """
+    exclude = os.path.realpath(exclude_dir) if exclude_dir else None
+    stack = [("", input_dir)]
+    while stack:
+        relative_dir, directory = stack.pop()
+        if exclude and os.path.realpath(directory) == exclude:
+            continue
+        with os.scandir(directory) as entries:
+            entries = sorted(entries, key=lambda e: e.name)
+        subdirs = []
+        for entry in entries:
+            relative = f"{relative_dir}{entry.name}"
+            if entry.is_dir(follow_symlinks=False):
+                if not entry.name.startswith('.'):
+                    subdirs.append((relative + "/", entry.path))
+            elif entry.is_file() and is_candidate(entry.name):
+                yield relative, entry.path, entry.stat()
+        # Umgekehrt auf den Stapel, damit Unterordner in alphabetischer Reihenfolge folgen
+        stack.extend(reversed(subdirs))
+
+
+def mirrored_outputs(source: str, formats: Sequence[str]) -> List[str]:
+    """Relative Ausgabepfade einer Quelle im gespiegelten Baum, z.B. a/b.pdf -> a/b.docx."""
+    base = os.path.splitext(source)[0]
+    return [base + get_writer(output_format).extension for output_format in formats]
+
+
+def remove_output(output_dir: str, relative: str):
+    """Löscht eine Ausgabe und anschließend leer gewordene Unterordner des Ausgabebaums."""
+    path = os.path.join(output_dir, relative)
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    directory = os.path.dirname(path)
+    root = os.path.abspath(output_dir)
+    while os.path.abspath(directory) != root:
+        try:
+            os.rmdir(directory)
+        except OSError:
+            break
+        directory = os.path.dirname(directory)
+
+
+def sync_tree(input_dir: str, output_dir: str, jobs: int = 1, formats: Sequence[str] = ("docx",),
+              use_hash: bool = False, delete: bool = False, state_path: Optional[str] = None,
+              compression: str = "default", on_event: Optional[Callable[..., None]] = None) -> dict:
+    """
+    Spiegelt einen Eingabebaum in einen Ausgabebaum und konvertiert dabei nur
+    neue oder geänderte Dateien (wie make). Maßgeblich ist der im Sidecar-Manifest
+    vermerkte Stand: Größe und Änderungszeit, mit use_hash zusätzlich die
+    SHA-256-Prüfsumme, so dass nur berührte, aber inhaltlich gleiche Dateien
+    nicht erneut konvertiert werden.
+
+    Args:
+        input_dir: Wurzel des Eingabebaums
+        output_dir: Wurzel des Ausgabebaums
+        jobs: Anzahl paralleler Konvertierungsprozesse
+        formats: Ausgabeformate (docx, txt, md, html)
+        use_hash: Bei geänderter Änderungszeit den Inhalt per Prüfsumme vergleichen
+        delete: Ausgaben gelöschter Quellen ebenfalls löschen
+        state_path: Pfad des Manifests (Standard: <output_dir>/.pdf_magic_sync.jsonl)
+        compression: Kompressionsrichtlinie der DOCX-Dateien (store, fast, default, max)
+        on_event: Wird mit (event, **felder) für jedes Ereignis aufgerufen
+
+    Returns:
+        dict: scanned, converted, up_to_date, failed, removed
+
+    Raises:
+        FileNotFoundError: Wenn der Eingabebaum nicht existiert (schützt vor dem Löschen
+            aller Ausgaben, z.B. bei einem nicht eingehängten Laufwerk)
+    """
+    if not os.path.isdir(input_dir):
+        raise FileNotFoundError(f"Das Eingabeverzeichnis {input_dir} existiert nicht.")
+    on_event = on_event or (lambda event, **fields: None)
+    os.makedirs(output_dir, exist_ok=True)
+    state = SyncState(state_path or os.path.join(output_dir, SYNC_STATE_NAME))
+    stats = {"scanned": 0, "converted": 0, "up_to_date": 0, "failed": 0, "removed": 0}
+    seen: Set[str] = set()
+    in_progress: Dict[int, dict] = {}  # Auftragsnummer -> neuer Eintrag im Manifest
+    created_dirs: Set[str] = set()
+
+    def iter_tasks():
+        for source, path, stat_result in scan_tree(input_dir, exclude_dir=output_dir):
+            stats["scanned"] += 1
+            seen.add(source)
+            outputs = mirrored_outputs(source, formats)
+            entry = {"source": source, "size": stat_result.st_size, "mtime_ns": stat_result.st_mtime_ns,
+                     "outputs": outputs}
+            previous = state.entries.get(source)
+            if (previous and previous["outputs"] == outputs
+                    and all(os.path.exists(os.path.join(output_dir, output)) for output in outputs)):
+                if previous["size"] == entry["size"] and previous["mtime_ns"] == entry["mtime_ns"]:
+                    stats["up_to_date"] += 1
+                    continue
+                if use_hash and previous.get("sha256") and previous["size"] == entry["size"]:
+                    entry["sha256"] = file_digest(path)
+                    if entry["sha256"] == previous["sha256"]:
+                        # Nur berührt: neuen Zeitstempel merken, damit nicht erneut gehasht wird
+                        state.record(entry)
+                        stats["up_to_date"] += 1
+                        continue
+            if use_hash and "sha256" not in entry:
+                entry["sha256"] = file_digest(path)
+
+            targets = {output_format: os.path.join(output_dir, output)
+                       for output_format, output in zip(formats, outputs)}
+            target_dir = os.path.dirname(targets[formats[0]])
+            if target_dir not in created_dirs:
+                os.makedirs(target_dir, exist_ok=True)
+                created_dirs.add(target_dir)
+            index = stats["scanned"]
+            in_progress[index] = entry
+            yield index, path, targets[formats[0]] if list(formats) == ["docx"] else targets
+
+    try:
+        on_event("start", input_dir=input_dir, output_dir=output_dir, known=len(state.entries))
+        # Unveränderte Ausgaben nicht ersetzen, damit Backups und Synchronisierungen sie nicht erneut erfassen
+        for result in convert_tasks(iter_tasks(), jobs, skip_identical=True, compression=compression):
+            entry = in_progress.pop(result.index)
+            if not result.ok:
+                # Alter Eintrag bleibt bestehen, die Datei wird beim nächsten Lauf erneut versucht
+                stats["failed"] += 1
+                on_event("error", input=result.input_path, message=result.error)
+                continue
+            previous = state.entries.get(entry["source"])
+            if delete and previous:
+                for stale in set(previous["outputs"]) - set(entry["outputs"]):
+                    remove_output(output_dir, stale)
+            state.record(entry)
+            stats["converted"] += 1
+            on_event("done", input=result.input_path, output=result.output_path, pages=result.pages,
+                     duration=round(result.duration, 3), warnings=result.warnings,
+                     unchanged=result.unchanged)
+
+        if delete:
+            for source in sorted(set(state.entries) - seen):
+                for output in state.entries[source]["outputs"]:
+                    remove_output(output_dir, output)
+                state.remove(source)
+                stats["removed"] += 1
+                on_event("removed", input=source)
+        state.compact()
+    finally:
+        state.close()
+    return stats
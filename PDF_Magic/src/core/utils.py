@@ -6,150 +6,13 @@
 import os
 import logging
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Union
 import shutil
 
-from PyPDF2 import PdfReader
-from docx import Document
-from PyQt5.QtWidgets import QTextEdit, QProgressBar, QMessageBox
-from PyQt5.QtCore import QObject, pyqtSignal
-
-class ConversionError(Exception):
-    """Benutzerdefinierte Ausnahme für Konvertierungsfehler"""
-    pass
-
-class ConversionWorker(QObject):
-    """Worker-Klasse für die PDF-zu-DOCX Konvertierung"""
-    finished = pyqtSignal()
-    progress = pyqtSignal(int)
-    log = pyqtSignal(str)
-    error = pyqtSignal(str)
-
-    def __init__(self, pdf_files: List[str], output_dir: str):
-        super().__init__()
-        self.pdf_files = pdf_files
-        self.output_dir = output_dir
-        self.setup_logging()
-
-    def setup_logging(self):
-        """Richtet das Logging für den Worker ein"""
-        self.logger = logging.getLogger('ConversionWorker')
-        self.logger.setLevel(logging.INFO)
-        handler = logging.FileHandler('conversion.log')
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        self.logger.addHandler(handler)
-
-    def run(self):
-        """Führt die Konvertierung für alle PDF-Dateien durch"""
-        total_files = len(self.pdf_files)
-        successful_conversions = 0
-        failed_conversions = 0
-
-        for i, pdf_path in enumerate(self.pdf_files):
-            try:
-                if not os.path.exists(pdf_path):
-                    raise FileNotFoundError(f"Die Datei {pdf_path} existiert nicht.")
-
-                if not os.access(pdf_path, os.R_OK):
-                    raise PermissionError(f"Keine Leserechte für {pdf_path}.")
-
-                output_path = self.get_output_path(pdf_path)
-                
-                if os.path.exists(output_path):
-                    new_path = self.get_unique_filename(output_path)
-                    self.log.emit(f"Datei existiert bereits. Verwende neuen Namen: {os.path.basename(new_path)}")
-                    output_path = new_path
-
-                self.convert_pdf_to_docx(pdf_path, output_path)
-                successful_conversions += 1
-
-                progress = int(((i + 1) / total_files) * 100)
-                self.progress.emit(progress)
-                self.log.emit(f"Erfolgreich konvertiert: {pdf_path} -> {output_path}")
-
-            except FileNotFoundError as e:
-                failed_conversions += 1
-                self.handle_error(str(e), pdf_path)
-            except PermissionError as e:
-                failed_conversions += 1
-                self.handle_error(str(e), pdf_path)
-            except ConversionError as e:
-                failed_conversions += 1
-                self.handle_error(str(e), pdf_path)
-            except Exception as e:
-                failed_conversions += 1
-                self.handle_error(f"Unerwarteter Fehler: {str(e)}", pdf_path)
-
-        self.log.emit(self.get_summary(successful_conversions, failed_conversions, total_files))
-        self.finished.emit()
-
-    def handle_error(self, error_msg: str, file_path: str):
-        """Behandelt Fehler während der Konvertierung"""
-        full_error_msg = f"Fehler bei der Konvertierung von {file_path}: {error_msg}"
-        self.logger.error(full_error_msg)
-        self.error.emit(full_error_msg)
-
-    def convert_pdf_to_docx(self, pdf_path: str, docx_path: str):
-        """Konvertiert eine PDF-Datei in eine DOCX-Datei."""
-        try:
-            pdf_reader = PdfReader(pdf_path)
-            doc = Document()
-
-            doc.core_properties.author = "PDF Magic"
-            doc.core_properties.created = datetime.now()
-
-            for page_num, page in enumerate(pdf_reader.pages, 1):
-                text = page.extract_text()
-                if text:
-                    doc.add_heading(f'Seite {page_num}', level=1)
-                    doc.add_paragraph(text)
-                else:
-                    self.log.emit(f"Warnung: Seite {page_num} in {pdf_path} enthält keinen extrahierbaren Text.")
-
-            doc.save(docx_path)
-
-        except Exception as e:
-            raise ConversionError(f"Fehler bei der Konvertierung: {str(e)}")
-
-    def get_output_path(self, pdf_path: str) -> str:
-        """Erstellt den Ausgabepfad für die DOCX-Datei."""
-        base_name = os.path.splitext(os.path.basename(pdf_path))[0]
-        return os.path.join(self.output_dir, f"{base_name}.docx")
-
-    def get_unique_filename(self, file_path: str) -> str:
-        """Erstellt einen eindeutigen Dateinamen wenn die Datei bereits existiert."""
-        base, ext = os.path.splitext(file_path)
-        counter = 1
-        while os.path.exists(file_path):
-            file_path = f"{base}_{counter}{ext}"
-            counter += 1
-        return file_path
-
-    def get_summary(self, successful: int, failed: int, total: int) -> str:
-        """Erstellt eine Zusammenfassung der Konvertierung."""
-        return (f"Konvertierung abgeschlossen.\n"
-                f"Erfolgreich: {successful}\n"
-                f"Fehlgeschlagen: {failed}\n"
-                f"Gesamt: {total}")
-
-def update_log(log_window: QTextEdit, message: str):
-    """Aktualisiert das Log-Fenster mit einer neuen Nachricht."""
-    log_window.append(message)
-    log_window.verticalScrollBar().setValue(log_window.verticalScrollBar().maximum())
-
-def update_progress_bar(progress_bar: QProgressBar, value: int):
-    """Aktualisiert den Fortschrittsbalken."""
-    progress_bar.setValue(value)
-
-def show_error_message(message: str):
-    """Zeigt eine Fehlermeldung in einem Dialogfenster an."""
-    error_box = QMessageBox()
-    error_box.setIcon(QMessageBox.Critical)
-    error_box.setText("Ein Fehler ist aufgetreten")
-    error_box.setInformativeText(message)
-    error_box.setWindowTitle("Fehler")
-    error_box.exec_()
+# PyPDF2 und python-docx werden erst in den Funktionen importiert (schnellerer Start)
+from .errors import ConversionError, ErrorCollection
+from .metrics import ConversionTimeModel, get_time_model
+from .diskspace import estimate_output_size
 
 def validate_pdf_file(file_path: str) -> Optional[str]:
     """
@@ -161,6 +24,8 @@ def validate_pdf_file(file_path: str) -> Optional[str]:
     Returns:
         Optional[str]: Fehlermeldung wenn die Datei ungültig ist, sonst None
     """
+    from PyPDF2 import PdfReader
+
     try:
         if not os.path.exists(file_path):
             return f"Die Datei {file_path} existiert nicht."
@@ -307,6 +172,8 @@ class FileProcessor:
         Returns:
             bool: True wenn erfolgreich, False bei Fehler
         """
+        from PyPDF2 import PdfReader
+
         try:
             # Validiere Eingabedatei
             error_msg = validate_pdf_file(file_path)
@@ -320,9 +187,9 @@ class FileProcessor:
                 self.logger.error(error_msg)
                 return False
                 
-            # Überprüfe Speicherplatz
-            file_size = os.path.getsize(file_path)
-            error_msg = check_disk_space(output_dir, file_size * 2)  # Schätze doppelte Größe
+            # Überprüfe Speicherplatz anhand der geschätzten Ausgabegröße
+            page_count = len(PdfReader(file_path).pages)
+            error_msg = check_disk_space(output_dir, estimate_output_size(page_count))
             if error_msg:
                 self.logger.error(error_msg)
                 return False
@@ -398,6 +265,8 @@ def is_pdf_encrypted(file_path: str) -> bool:
     Returns:
         bool: True, wenn die PDF verschlüsselt ist, sonst False
     """
+    from PyPDF2 import PdfReader
+
     try:
         with open(file_path, 'rb') as file:
             pdf_reader = PdfReader(file)
@@ -406,35 +275,41 @@ def is_pdf_encrypted(file_path: str) -> bool:
         logging.error(f"Fehler beim Überprüfen der PDF-Verschlüsselung für {file_path}: {str(e)}")
         return False
 
-def estimate_conversion_time(file_size: int) -> float:
+def estimate_conversion_time(file_size: int, page_count: Optional[int] = None,
+                             producer: Optional[str] = None,
+                             model: Optional[ConversionTimeModel] = None) -> float:
     """
-    Schätzt die Konvertierungszeit basierend auf der Dateigröße.
+    Schätzt die Konvertierungszeit mit dem aus bisherigen Läufen gelernten Zeitmodell.
 
     Args:
         file_size (int): Größe der Datei in Bytes
+        page_count (Optional[int]): Anzahl der Seiten, falls bekannt
+        producer (Optional[str]): Erzeuger der PDF-Datei, falls bekannt
+        model (Optional[ConversionTimeModel]): Zu verwendendes Modell, sonst das gemeinsame Modell
 
     Returns:
         float: Geschätzte Konvertierungszeit in Sekunden
     """
-    # Diese Formel sollte an Ihre spezifischen Leistungsmerkmale angepasst werden
-    base_time = 2  # Basiszeit in Sekunden
-    time_per_mb = 0.5  # Zusätzliche Zeit pro MB
-    estimated_time = base_time + (file_size / (1024 * 1024)) * time_per_mb
-    return estimated_time
+    model = model or get_time_model()
+    return model.predict(file_size, page_count, producer=producer)
 
-def create_error_report(error_log: List[str], output_path: str):
+def create_error_report(error_log: Union[ErrorCollection, List[str]], output_path: str):
     """
     Erstellt einen Fehlerbericht basierend auf den gesammelten Fehlerprotokollen.
 
     Args:
-        error_log (List[str]): Liste der Fehlerprotokolle
+        error_log (Union[ErrorCollection, List[str]]): Gesammelte Fehler des Laufs
+            oder eine Liste der Fehlerprotokolle
         output_path (str): Pfad, an dem der Fehlerbericht gespeichert werden soll
     """
     try:
         with open(output_path, 'w', encoding='utf-8') as report_file:
             report_file.write("PDF Magic - Fehlerbericht\n")
             report_file.write("=" * 30 + "\n\n")
-            report_file.write(f"Erstellungszeitpunkt: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+            report_file.write(f"Erstellungszeitpunkt: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            if isinstance(error_log, ErrorCollection):
+                report_file.write(f"Zusammenfassung: {error_log.summary()}\n")
+            report_file.write("\n")
             for error in error_log:
                 report_file.write(f"{error}\n")
         logging.info(f"Fehlerbericht erstellt: {output_path}")
@@ -452,6 +327,9 @@ def verify_conversion(pdf_path: str, docx_path: str) -> bool:
     Returns:
         bool: True, wenn die Konvertierung als erfolgreich verifiziert wurde, sonst False
     """
+    from PyPDF2 import PdfReader
+    from docx import Document
+
     try:
         # Überprüfe, ob die DOCX-Datei existiert und nicht leer ist
         if not os.path.exists(docx_path) or os.path.getsize(docx_path) == 0:
@@ -0,0 +1,172 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# volumes.py
+# Teilt sehr große PDF-Dateien auf mehrere nummerierte DOCX-Dateien (Bände) auf
+
+import os
+import json
+from typing import BinaryIO, Callable, List, Optional
+
+from .engine import PdfSource, fallback_source_date, get_pdf_dates, get_pdf_producer
+from .errors import ConversionError
+from .merge import StreamingDocxWriter
+from .paths import OutputPathAllocator, atomic_write
+from .prescan import PAGE_TEXT, classify_page, count_page_kinds
+
+VOLUME_INDEX_SUFFIX = ".volumes.json"
+
+
+def volume_path(docx_path: str, number: int) -> str:
+    """Pfad eines Bandes, z.B. bericht.docx -> bericht_001.docx."""
+    return f"{os.path.splitext(docx_path)[0]}_{number:03d}.docx"
+
+
+def volume_index_path(docx_path: str) -> str:
+    """Pfad des Verzeichnisses der Bände, z.B. bericht.docx -> bericht.volumes.json."""
+    return os.path.splitext(docx_path)[0] + VOLUME_INDEX_SUFFIX
+
+
+def volume_template(index_path: str) -> str:
+    """Namensvorlage der Bände zu einem Verzeichnis, z.B. bericht_1.volumes.json -> bericht_1.docx."""
+    return index_path[:-len(VOLUME_INDEX_SUFFIX)] + ".docx"
+
+
+def convert_pdf_to_volumes(pdf_path: PdfSource, docx_path: str, max_pages: Optional[int] = None,
+                           max_mb: Optional[float] = None, compression: str = "default",
+                           on_page: Optional[Callable[[int], None]] = None,
+                           on_warning: Optional[Callable[[str], None]] = None,
+                           skip_identical: bool = False, if_exists: str = "overwrite") -> dict:
+    """
+    Konvertiert eine PDF-Datei in nummerierte DOCX-Bände, die alle max_pages
+    Seiten bzw. ab max_mb Megabyte gewechselt werden.
+
+    Seiten werden einzeln extrahiert und direkt in den aktuellen Band
+    geschrieben; ein voller Band wird sofort abgeschlossen und freigegeben,
+    so dass nie das ganze Dokument im Speicher liegt. Zum Schluss entsteht
+    neben den Bänden ein kleines JSON-Verzeichnis (<name>.volumes.json) mit
+    Seitenbereich und Größe jedes Bandes.
+
+    Außer bei if_exists="overwrite" werden die Namen der Bände wie alle
+    Ausgaben über einen OutputPathAllocator belegt, so dass z.B. Band 1 von
+    b.pdf nicht die Ausgabe von b_001.pdf überschreibt. Den Namen des
+    Verzeichnisses belegt der Aufrufer (siehe volume_template).
+
+    Args:
+        pdf_path (PdfSource): Pfad zur PDF-Datei, PDF-Bytes oder lesbares Datei-Objekt
+        docx_path (str): Namensvorlage, z.B. bericht.docx -> bericht_001.docx, bericht_002.docx, ...
+        max_pages (Optional[int]): Höchstzahl Seiten je Band
+        max_mb (Optional[float]): Größe in MB, ab der ein neuer Band beginnt
+        compression (str): Kompressionsrichtlinie (store, fast, default, max)
+        on_page (Optional[Callable[[int], None]]): Wird nach jeder Seite mit der Seitennummer aufgerufen
+        on_warning (Optional[Callable[[str], None]]): Empfängt Warnungen, z.B. zu Seiten ohne Text
+        skip_identical (bool): Vorhandene Bände mit identischem Inhalt nicht ersetzen
+        if_exists (str): overwrite ersetzt vorhandene Bände; sonst erhalten Bände bei
+            Kollisionen einen Zähler (bericht_001_1.docx)
+
+    Returns:
+        dict: pages, text_chars, producer, page_kinds, index (Pfad des Verzeichnisses),
+            outputs (alle geschriebenen Dateien) und unchanged
+
+    Raises:
+        ValueError: Wenn weder max_pages noch max_mb angegeben ist
+        ConversionError: Wenn die Datei nicht konvertiert werden konnte
+    """
+    from PyPDF2 import PdfReader
+
+    if not max_pages and not max_mb:
+        raise ValueError("Für Bände muss max_pages oder max_mb angegeben werden")
+    max_bytes = int(max_mb * 1024 * 1024) if max_mb else None
+    source_name = pdf_path if isinstance(pdf_path, str) else "<Datenstrom>"
+
+    try:
+        pdf_reader = PdfReader(pdf_path)
+        page_count = len(pdf_reader.pages)
+    except Exception as e:
+        raise ConversionError(f"Fehler beim Lesen der PDF-Datei: {str(e)}")
+    created, _ = get_pdf_dates(pdf_reader, fallback_source_date())
+
+    progress = {"page": 0, "text_chars": 0}
+    kinds: List[str] = []
+    volumes: List[dict] = []
+    unchanged = []
+
+    def write_volume(stream: BinaryIO):
+        writer = StreamingDocxWriter(stream, compression)
+        writer.add_source_date(created)
+        first_page = progress["page"]
+        try:
+            while progress["page"] < page_count:
+                page_num = progress["page"] + 1
+                try:
+                    page = pdf_reader.pages[page_num - 1]
+                    kind = classify_page(page)
+                    text = (page.extract_text() or "") if kind == PAGE_TEXT else ""
+                except Exception as e:
+                    raise ConversionError(f"Fehler beim Lesen der PDF-Datei: {str(e)}")
+                if text:
+                    writer.add_heading(f'Seite {page_num}', level=1)
+                    writer.add_paragraph(text)
+                elif on_warning:
+                    on_warning(f"Warnung: Seite {page_num} in {source_name} enthält keinen extrahierbaren Text.")
+                progress["page"] = page_num
+                progress["text_chars"] += len(text)
+                kinds.append(kind)
+                if on_page:
+                    on_page(page_num)
+                if max_pages and page_num - first_page >= max_pages:
+                    break
+                if max_bytes and writer.size >= max_bytes:
+                    break
+        except BaseException:
+            writer.abort()
+            raise
+        writer.close()
+
+    directory = os.path.dirname(docx_path)
+    allocator = OutputPathAllocator(directory or ".") if if_exists != "overwrite" else None
+
+    def claim(path: str) -> str:
+        return allocator.allocate(os.path.basename(path)) if allocator else path
+
+    path = None
+    try:
+        # Auch eine PDF ohne Seiten ergibt einen (leeren) Band
+        while progress["page"] < page_count or not volumes:
+            path = claim(volume_path(docx_path, len(volumes) + 1))
+            first_page = progress["page"] + 1
+
+            def write_file(temp_path: str):
+                with open(temp_path, 'wb') as docx_file:
+                    write_volume(docx_file)
+            if not atomic_write(path, write_file, skip_identical):
+                unchanged.append(os.path.basename(path))
+            volumes.append({"file": os.path.basename(path), "first_page": first_page,
+                            "last_page": progress["page"], "size": os.path.getsize(path)})
+            path = None
+    except BaseException as e:
+        if allocator and path:
+            # Belegten, aber nicht geschriebenen Band freigeben
+            allocator.release(path)
+        if isinstance(e, Exception) and not isinstance(e, ConversionError):
+            raise ConversionError(f"Fehler bei der Konvertierung: {str(e)}")
+        raise
+
+    index_path = volume_index_path(docx_path)
+    index = {"source": os.path.basename(source_name), "pages": page_count, "volumes": volumes}
+
+    def write_index(temp_path: str):
+        with open(temp_path, 'w', encoding='utf-8') as index_file:
+            json.dump(index, index_file, ensure_ascii=False, indent=2)
+            index_file.write("\n")
+    atomic_write(index_path, write_index, skip_identical)
+
+    return {
+        "pages": page_count,
+        "text_chars": progress["text_chars"],
+        "producer": get_pdf_producer(pdf_reader),
+        "page_kinds": count_page_kinds(kinds),
+        "index": index_path,
+        "outputs": [os.path.join(directory, volume["file"]) for volume in volumes] + [index_path],
+        "unchanged": unchanged,
+    }
@@ -0,0 +1,379 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# watcher.py
+# Überwachte Eingangsordner ("Hot Folder"), deren PDF-Dateien automatisch konvertiert werden
+
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import logging
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from .engine import convert_job
+from .executors import discard_pending
+from .paths import OutputPathAllocator, TEMP_PREFIX
+
+Signature = Tuple[int, int]  # Größe, mtime in Nanosekunden
+
+# So oft wird eine Datei nach einem abgestürzten Worker erneut versucht, bevor sie als fehlerhaft gilt
+MAX_CRASH_RETRIES = 1
+
+
+def file_signature(path: str) -> Optional[Signature]:
+    """Größe und Änderungszeit einer Datei oder None, wenn sie nicht (mehr) existiert."""
+    try:
+        stat_info = os.stat(path)
+    except OSError:
+        return None
+    return stat_info.st_size, stat_info.st_mtime_ns
+
+
+def is_candidate(name: str) -> bool:
+    """Prüft, ob ein Dateiname eine zu verarbeitende PDF-Datei bezeichnet."""
+    return (name.lower().endswith('.pdf')
+            and not name.startswith('.')
+            and not name.startswith(TEMP_PREFIX))
+
+
+class ScandirSource:
+    """Findet Dateien durch regelmäßiges Einlesen der Verzeichnisse mit os.scandir"""
+
+    def __init__(self, directories: List[str]):
+        self.directories = directories
+
+    def poll(self, timeout: float) -> Dict[str, Optional[Signature]]:
+        """
+        Wartet timeout Sekunden und liefert alle PDF-Dateien mit ihrer Signatur.
+
+        Returns:
+            Dict[str, Optional[Signature]]: Pfad -> (Größe, mtime)
+        """
+        time.sleep(timeout)
+        return self.scan()
+
+    def scan(self) -> Dict[str, Optional[Signature]]:
+        """Liest alle Eingangsordner einmal ein."""
+        found = {}
+        for directory in self.directories:
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if is_candidate(entry.name) and entry.is_file():
+                            stat_info = entry.stat()
+                            found[entry.path] = (stat_info.st_size, stat_info.st_mtime_ns)
+            except OSError as e:
+                logging.getLogger('FolderWatcher').warning(f"Ordner nicht lesbar: {directory}: {str(e)}")
+        return found
+
+    def close(self):
+        pass
+
+
+class InotifySource(ScandirSource):
+    """
+    Findet Dateien über inotify (Linux), so dass große Eingangsordner nicht
+    ständig vollständig eingelesen werden müssen.
+    """
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, directories: List[str]):
+        super().__init__(directories)
+        libc_name = ctypes.util.find_library('c')
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 fehlgeschlagen")
+        self.watches: Dict[int, str] = {}
+        mask = self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+        for directory in directories:
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), mask)
+            if wd < 0:
+                self.close()
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch fehlgeschlagen: {directory}")
+            self.watches[wd] = directory
+
+    def poll(self, timeout: float) -> Dict[str, Optional[Signature]]:
+        """
+        Wartet bis zu timeout Sekunden auf Ereignisse.
+
+        Returns:
+            Dict[str, Optional[Signature]]: Geänderte Pfade; die Signatur wird später ermittelt
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return {}
+        changed: Dict[str, Optional[Signature]] = {}
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except OSError as e:
+                if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    break
+                raise
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+                offset += self.EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+                offset += length
+                if mask & self.IN_Q_OVERFLOW:
+                    # Ereignisse verloren: einmal vollständig einlesen
+                    changed.update(self.scan())
+                elif wd in self.watches and is_candidate(name):
+                    changed[os.path.join(self.watches[wd], name)] = None
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def create_source(directories: List[str], force_polling: bool = False) -> ScandirSource:
+    """Wählt inotify unter Linux, sonst das Einlesen per scandir."""
+    if not force_polling and sys.platform.startswith('linux'):
+        try:
+            return InotifySource(directories)
+        except (OSError, AttributeError) as e:
+            logging.getLogger('FolderWatcher').info(f"inotify nicht verfügbar, verwende Polling: {str(e)}")
+    return ScandirSource(directories)
+
+
+class StabilityTracker:
+    """
+    Merkt sich Größe und Änderungszeit eingehender Dateien und meldet sie
+    erst, wenn sich beides für stable_seconds nicht mehr geändert hat.
+    """
+
+    def __init__(self, stable_seconds: float):
+        self.stable_seconds = stable_seconds
+        self.pending: Dict[str, Tuple[Optional[Signature], float]] = {}
+
+    def observe(self, path: str, signature: Optional[Signature] = None):
+        """Nimmt eine (möglicherweise noch wachsende) Datei in die Beobachtung auf."""
+        previous = self.pending.get(path)
+        if previous is None or signature is None or previous[0] != signature:
+            self.pending[path] = (signature, time.monotonic())
+
+    def pop_stable(self) -> List[str]:
+        """
+        Prüft alle beobachteten Dateien und entfernt die stabilen.
+
+        Returns:
+            List[str]: Dateien, die seit stable_seconds unverändert sind
+        """
+        now = time.monotonic()
+        stable = []
+        for path, (signature, since) in list(self.pending.items()):
+            try:
+                stat_info = os.stat(path)
+            except FileNotFoundError:
+                del self.pending[path]
+                continue
+            current = (stat_info.st_size, stat_info.st_mtime_ns)
+            if current != signature:
+                self.pending[path] = (current, now)
+            elif now - since >= self.stable_seconds and stat_info.st_size > 0:
+                del self.pending[path]
+                stable.append(path)
+        return stable
+
+
+class FolderWatcher:
+    """
+    Überwacht Eingangsordner, wartet auf stabile PDF-Dateien, konvertiert sie
+    in einem Prozess-Pool und verschiebt sie danach in einen Erledigt- bzw.
+    Fehler-Ordner.
+    """
+
+    def __init__(self, inbox_dirs: List[str], output_dir: str,
+                 done_dir: Optional[str] = None, failed_dir: Optional[str] = None,
+                 jobs: int = 1, stable_seconds: float = 2.0, poll_interval: float = 1.0,
+                 force_polling: bool = False,
+                 on_event: Optional[Callable[..., None]] = None):
+        """
+        Args:
+            inbox_dirs: Zu überwachende Eingangsordner
+            output_dir: Ausgabeverzeichnis für die DOCX-Dateien
+            done_dir: Ziel für erfolgreich konvertierte PDFs (Standard: <inbox>/done)
+            failed_dir: Ziel für fehlgeschlagene PDFs (Standard: <inbox>/failed)
+            jobs: Anzahl paralleler Konvertierungsprozesse
+            stable_seconds: Zeit ohne Änderung, bevor eine Datei als vollständig gilt
+            poll_interval: Maximale Wartezeit je Durchlauf in Sekunden
+            force_polling: scandir-Polling auch dort verwenden, wo inotify verfügbar ist
+            on_event: Wird mit (event, **felder) für jedes Ereignis aufgerufen
+        """
+        self.inbox_dirs = inbox_dirs
+        self.output_dir = output_dir
+        self.done_dir = done_dir or os.path.join(inbox_dirs[0], 'done')
+        self.failed_dir = failed_dir or os.path.join(inbox_dirs[0], 'failed')
+        self.jobs = max(jobs, 1)
+        self.poll_interval = poll_interval
+        self.force_polling = force_polling
+        self.on_event = on_event or (lambda event, **fields: None)
+        self.tracker = StabilityTracker(stable_seconds)
+        self.ready: Deque[str] = deque()
+        self.queued = set()
+        # Dateien, die nicht aus dem Eingangsordner verschoben werden konnten, mit ihrer
+        # Signatur; sie werden erst wieder verarbeitet, wenn sich die Datei ändert
+        self.stuck: Dict[str, Signature] = {}
+        self.crashes: Dict[str, int] = {}
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.running = False
+        self.logger = logging.getLogger('FolderWatcher')
+
+    def stop(self):
+        """Beendet die Überwachung nach dem aktuellen Durchlauf."""
+        self.running = False
+
+    def run(self):
+        """Überwacht die Eingangsordner, bis stop() aufgerufen oder der Prozess unterbrochen wird."""
+        for directory in (self.output_dir, self.done_dir, self.failed_dir):
+            os.makedirs(directory, exist_ok=True)
+        output_allocator = OutputPathAllocator(self.output_dir)
+        done_allocator = OutputPathAllocator(self.done_dir)
+        failed_allocator = OutputPathAllocator(self.failed_dir)
+        source = create_source(self.inbox_dirs, self.force_polling)
+        self.on_event("watching", directories=self.inbox_dirs, mode=type(source).__name__)
+
+        # Bereits vorhandene Dateien ebenfalls verarbeiten
+        for path, signature in source.scan().items():
+            self.tracker.observe(path, signature)
+
+        self.running = True
+        pending = {}
+        self.executor = ProcessPoolExecutor(max_workers=self.jobs)
+        try:
+            while self.running:
+                timeout = self.poll_interval if not pending else min(self.poll_interval, 0.2)
+                for path, signature in source.poll(timeout).items():
+                    if path not in self.queued and not self.is_stuck(path, signature):
+                        self.tracker.observe(path, signature)
+
+                for path in self.tracker.pop_stable():
+                    self.queued.add(path)
+                    self.ready.append(path)
+                    self.on_event("queued", input=path)
+
+                # Nur begrenzt viele Aufträge gleichzeitig an den Pool geben
+                while self.ready and len(pending) < self.jobs * 2:
+                    path = self.ready.popleft()
+                    base_name = os.path.splitext(os.path.basename(path))[0]
+                    output_path = output_allocator.allocate(f"{base_name}.docx")
+                    try:
+                        future = self.submit(path, output_path)
+                    except BaseException:
+                        output_allocator.release(output_path)
+                        raise
+                    pending[future] = (path, output_path, self.executor)
+
+                if pending:
+                    done, _ = wait(pending, timeout=0, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        path, output_path, executor = pending.pop(future)
+                        if isinstance(future.exception(), BrokenProcessPool):
+                            self.replace_pool(executor)
+                            if self.retry_after_crash(path, output_path, output_allocator):
+                                continue
+                        self.finish(future, path, output_path, output_allocator,
+                                    done_allocator, failed_allocator)
+        finally:
+            # Nicht mehr ausgewertete Aufträge: Eingaben bleiben liegen, leere Platzhalter nicht
+            discard_pending(self.executor, {future: task[1] for future, task in pending.items()},
+                            output_allocator.release)
+            source.close()
+
+    def submit(self, path: str, output_path: str) -> Future:
+        """Gibt einen Auftrag an den Pool und ersetzt einen bereits defekten Pool einmal."""
+        try:
+            return self.executor.submit(convert_job, path, output_path)
+        except BrokenProcessPool:
+            self.replace_pool(self.executor)
+            return self.executor.submit(convert_job, path, output_path)
+
+    def replace_pool(self, broken: ProcessPoolExecutor):
+        """Ersetzt einen Prozess-Pool, dessen Worker abgestürzt ist, sofern das nicht schon geschehen ist."""
+        if self.executor is not broken:
+            return
+        self.logger.warning("Prozess-Pool defekt, Worker werden neu gestartet")
+        self.executor = ProcessPoolExecutor(max_workers=self.jobs)
+        broken.shutdown(wait=False)
+
+    def retry_after_crash(self, path: str, output_path: str, output_allocator: OutputPathAllocator) -> bool:
+        """
+        Stellt eine Datei nach einem Absturz des Pools erneut ein. Mit dem Absturz
+        scheitern alle laufenden Aufträge, nicht nur der verursachende.
+
+        Returns:
+            bool: False, wenn die Datei schon zu oft beteiligt war und als fehlerhaft gilt
+        """
+        self.crashes[path] = self.crashes.get(path, 0) + 1
+        if self.crashes[path] > MAX_CRASH_RETRIES:
+            del self.crashes[path]
+            return False
+        output_allocator.release(output_path)
+        self.ready.append(path)
+        return True
+
+    def is_stuck(self, path: str, signature: Optional[Signature]) -> bool:
+        """Prüft, ob eine Datei unverändert im Eingangsordner liegt, obwohl sie schon verarbeitet wurde."""
+        stuck_signature = self.stuck.get(path)
+        if stuck_signature is None:
+            return False
+        if (signature or file_signature(path)) == stuck_signature:
+            return True
+        # Die Datei wurde ersetzt oder entfernt und wird wie eine neue behandelt
+        del self.stuck[path]
+        return False
+
+    def finish(self, future, path: str, output_path: str, output_allocator: OutputPathAllocator,
+               done_allocator: OutputPathAllocator, failed_allocator: OutputPathAllocator):
+        """Verschiebt die Eingabedatei nach der Konvertierung und meldet das Ergebnis."""
+        self.crashes.pop(path, None)
+        try:
+            stats = future.result()
+        except Exception as e:
+            output_allocator.release(output_path)
+            target = self.move_input(path, failed_allocator)
+            self.on_event("error", input=path, moved_to=target, message=str(e))
+        else:
+            target = self.move_input(path, done_allocator)
+            self.on_event("done", input=path, output=output_path, moved_to=target,
+                          pages=stats["pages"], duration=round(stats["duration"], 3))
+        finally:
+            self.queued.discard(path)
+
+    def move_input(self, path: str, allocator: OutputPathAllocator) -> Optional[str]:
+        """
+        Verschiebt eine Eingabedatei kollisionsfrei in den Zielordner. Schlägt das
+        fehl, wird die Datei gemerkt und nicht erneut konvertiert, solange sie sich
+        nicht ändert; gemeldet wird das einmal als Ereignis "error".
+        """
+        target = allocator.allocate(os.path.basename(path))
+        try:
+            os.replace(path, target)
+            return target
+        except OSError as e:
+            allocator.release(target)
+            signature = file_signature(path)
+            if signature is not None:
+                self.stuck[path] = signature
+            message = f"Datei konnte nicht verschoben werden und wird nicht erneut konvertiert: {str(e)}"
+            self.logger.error(f"{path}: {message}")
+            self.on_event("error", input=path, moved_to=None, message=message)
+            return None
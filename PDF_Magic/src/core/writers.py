@@ -0,0 +1,271 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# writers.py
+# Ausgabeformate, die aus einer einzigen Textextraktion (extract_pages) gespeist werden
+
+import io
+import html
+import inspect
+import zipfile
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import BinaryIO, Dict, List, Optional, Tuple, Type, Union
+
+from .paths import atomic_write
+from .zipwriter import ZipWriter
+
+OutputTarget = Union[str, BinaryIO]
+
+# Frühester in ZIP-Archiven darstellbarer Zeitpunkt
+ZIP_EPOCH = datetime(1980, 1, 1)
+
+
+def zip_date_time(timestamp: Optional[datetime]) -> Tuple[int, int, int, int, int, int]:
+    """Wandelt einen Zeitpunkt in das date_time-Tupel eines ZIP-Eintrags (frühestens 1980)."""
+    if timestamp is None or timestamp < ZIP_EPOCH:
+        timestamp = ZIP_EPOCH
+    return timestamp.timetuple()[:6]
+
+
+def stable_zip_info(name: str, date_time: Tuple[int, int, int, int, int, int],
+                    compress_type: int = zipfile.ZIP_DEFLATED) -> zipfile.ZipInfo:
+    """ZIP-Eintrag mit festem Zeitstempel und plattformunabhängigen Attributen."""
+    info = zipfile.ZipInfo(name, date_time)
+    info.compress_type = compress_type
+    info.create_system = 3  # Unix, unabhängig vom erzeugenden Betriebssystem
+    info.external_attr = 0o644 << 16
+    return info
+
+
+class PackageEntries:
+    """Nimmt die Teile eines python-docx-Pakets anstelle von PhysPkgWriter entgegen"""
+
+    def __init__(self):
+        self.entries: List[Tuple[str, bytes]] = []
+
+    def write(self, pack_uri, blob: bytes):
+        self.entries.append((pack_uri.membername, blob))
+
+
+def docx_entries(doc) -> List[Tuple[str, bytes]]:
+    """
+    Liefert die Teile eines python-docx-Dokuments (Name, Inhalt) in der
+    Reihenfolge, in der doc.save() sie schreiben würde, aber unkomprimiert.
+    So komprimiert ZipWriter jeden Teil genau einmal nach der gewählten
+    Richtlinie, statt ein von python-docx gepacktes Archiv neu zu packen.
+    """
+    from docx.opc.pkgwriter import PackageWriter
+
+    package = doc.part.package
+    parts = package.parts
+    for part in parts:
+        part.before_marshal()
+    collector = PackageEntries()
+    PackageWriter._write_content_types_stream(collector, parts)
+    PackageWriter._write_pkg_rels(collector, package.rels)
+    PackageWriter._write_parts(collector, parts)
+    return collector.entries
+
+
+def write_docx(doc, stream: BinaryIO, date_time: Tuple[int, int, int, int, int, int],
+               compression: str = "default"):
+    """
+    Schreibt ein python-docx-Dokument reproduzierbar: gleiche Reihenfolge der
+    Einträge, einheitlicher Zeitstempel und feste Dateiattribute, so dass
+    gleicher Inhalt immer byte-identische Dateien ergibt.
+
+    Args:
+        doc: python-docx Document
+        stream: Beschreibbarer Datenstrom
+        date_time: Zeitstempel aller Einträge
+        compression: Kompressionsrichtlinie (store, fast, default, max)
+    """
+    target = ZipWriter(stream, compression, date_time)
+    target.write_all(docx_entries(doc))
+    target.close()
+
+
+class OutputWriter(ABC):
+    """
+    Basisklasse der Ausgabeformate. Unterklassen implementieren write_stream;
+    save() schreibt wahlweise atomar in eine Datei oder in ein Datei-Objekt.
+    """
+
+    extension = ""
+
+    def __init__(self, compression: str = "default"):
+        """
+        Args:
+            compression: Kompressionsrichtlinie für ZIP-basierte Formate (store, fast, default, max)
+        """
+        self.compression = compression
+
+    def save(self, extracted: dict, target: OutputTarget, skip_identical: bool = False) -> bool:
+        """
+        Schreibt das Ergebnis einer Extraktion.
+
+        Args:
+            extracted: Ergebnis von extract_pages (texts, pages, ...)
+            target: Pfad der Ausgabedatei oder beschreibbares Datei-Objekt
+            skip_identical: Eine vorhandene Datei mit identischem Inhalt nicht ersetzen
+
+        Returns:
+            bool: False, wenn die vorhandene Datei unverändert geblieben ist
+        """
+        if isinstance(target, str):
+            def write_file(temp_path: str):
+                with open(temp_path, 'wb') as output_file:
+                    self.write_stream(extracted, output_file)
+            return atomic_write(target, write_file, skip_identical)
+        self.write_stream(extracted, target)
+        return True
+
+    @abstractmethod
+    def write_stream(self, extracted: dict, stream: BinaryIO):
+        """Schreibt das Ergebnis einer Extraktion in einen Datenstrom."""
+
+
+class PictureEmbedder:
+    """
+    Fügt Bilder in ein python-docx-Dokument ein. Jedes Bild wird nur einmal als
+    Teil in word/media abgelegt; weitere Verwendungen verweisen auf denselben Teil.
+    """
+
+    def __init__(self, doc, image_data: Dict[str, dict]):
+        """
+        Args:
+            doc: python-docx Document
+            image_data: Bildschlüssel -> {"ext", "data"} (aus extract_pages)
+        """
+        self.doc = doc
+        self.image_data = image_data
+        self.parts: Dict[str, tuple] = {}
+        section = doc.sections[-1]
+        self.max_width = section.page_width - section.left_margin - section.right_margin
+        # python-docx ermittelt die nächste ID bei jedem Bild durch Suche im ganzen Dokument,
+        # bei tausenden Verweisen wäre das quadratisch; daher einmal ermitteln und selbst zählen
+        self.next_shape_id = doc.part.next_id
+
+    def add(self, key: str):
+        """Fügt das Bild als eigenen Absatz an; unbekannte (nicht dekodierbare) Bilder werden ignoriert."""
+        from docx.oxml.shape import CT_Inline
+
+        if key not in self.parts:
+            image = self.image_data.get(key)
+            if image is None:
+                return
+            self.parts[key] = self.doc.part.get_or_add_image(io.BytesIO(image["data"]))
+        r_id, image = self.parts[key]
+        cx, cy = image.scaled_dimensions(min(image.width, self.max_width), None)
+        inline = CT_Inline.new_pic_inline(self.next_shape_id, r_id, image.filename, cx, cy)
+        self.next_shape_id += 1
+        self.doc.add_paragraph().add_run()._r.add_drawing(inline)
+
+
+class DocxWriter(OutputWriter):
+    """
+    DOCX über python-docx: je Seite eine Überschrift und der Seitentext.
+
+    Erstellungs- und Änderungsdatum stammen aus der Quelle, nicht aus der
+    Uhrzeit der Konvertierung; dieselbe PDF-Datei ergibt so immer dieselbe DOCX-Datei.
+    """
+
+    extension = ".docx"
+
+    def write_stream(self, extracted: dict, stream: BinaryIO):
+        from docx import Document
+
+        created = extracted.get("created") or ZIP_EPOCH
+        doc = Document()
+        doc.core_properties.author = "PDF Magic"
+        doc.core_properties.created = created
+        doc.core_properties.modified = extracted.get("modified") or created
+        page_images = extracted.get("images")
+        pictures = PictureEmbedder(doc, extracted["image_data"]) if page_images else None
+        for page_num, text in enumerate(extracted["texts"], 1):
+            images = page_images[page_num - 1] if page_images else []
+            if text or images:
+                doc.add_heading(f'Seite {page_num}', level=1)
+            if text:
+                doc.add_paragraph(text)
+            for key in images:
+                pictures.add(key)
+
+        write_docx(doc, stream, zip_date_time(created), self.compression)
+
+
+class TextWriter(OutputWriter):
+    """Reiner Text ohne python-docx, z.B. für Suchindizes; Seiten getrennt durch Seitenvorschub"""
+
+    extension = ".txt"
+
+    def write_stream(self, extracted: dict, stream: BinaryIO):
+        for page_num, text in enumerate(extracted["texts"]):
+            if page_num:
+                stream.write(b"\f")
+            stream.write(text.encode('utf-8'))
+
+
+class MarkdownWriter(OutputWriter):
+    """Markdown mit einer Überschrift je Seite"""
+
+    extension = ".md"
+
+    def write_stream(self, extracted: dict, stream: BinaryIO):
+        for page_num, text in enumerate(extracted["texts"], 1):
+            if text:
+                stream.write(f"## Seite {page_num}\n\n{text.strip()}\n\n".encode('utf-8'))
+
+
+class HtmlWriter(OutputWriter):
+    """Einfaches HTML-Dokument mit einer Überschrift je Seite"""
+
+    extension = ".html"
+
+    def write_stream(self, extracted: dict, stream: BinaryIO):
+        stream.write(b'<!DOCTYPE html>\n<html><head><meta charset="utf-8"></head><body>\n')
+        for page_num, text in enumerate(extracted["texts"], 1):
+            if text:
+                body = html.escape(text.strip()).replace("\n", "<br>\n")
+                stream.write(f"<h1>Seite {page_num}</h1>\n<p>{body}</p>\n".encode('utf-8'))
+        stream.write(b"</body></html>\n")
+
+
+WRITERS: Dict[str, Type[OutputWriter]] = {
+    "docx": DocxWriter,
+    "txt": TextWriter,
+    "md": MarkdownWriter,
+    "html": HtmlWriter,
+}
+
+
+def register_writer(output_format: str, writer_class: Type[OutputWriter]):
+    """
+    Registriert ein zusätzliches Ausgabeformat.
+
+    Raises:
+        TypeError: Wenn die Klasse nicht alle abstrakten Methoden implementiert
+    """
+    if inspect.isabstract(writer_class):
+        missing = ", ".join(sorted(writer_class.__abstractmethods__))
+        raise TypeError(f"Writer {writer_class.__name__} implementiert nicht: {missing}")
+    WRITERS[output_format] = writer_class
+
+
+def get_writer(output_format: str, compression: str = "default") -> OutputWriter:
+    """
+    Liefert den Writer für ein Ausgabeformat.
+
+    Args:
+        output_format: Format (docx, txt, md, html, ...)
+        compression: Kompressionsrichtlinie für ZIP-basierte Formate
+
+    Raises:
+        ValueError: Wenn das Format unbekannt ist
+    """
+    try:
+        writer_class = WRITERS[output_format]
+    except KeyError:
+        raise ValueError(f"Unbekanntes Ausgabeformat: {output_format}")
+    return writer_class(compression)
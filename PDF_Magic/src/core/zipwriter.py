@@ -0,0 +1,216 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# zipwriter.py
+# Reproduzierbarer ZIP-Writer mit Kompressionsstufen und paralleler Kompression großer Teile
+
+import os
+import zlib
+import struct
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO, Iterable, List, Tuple, Union
+
+from .executors import SharedThreadPool
+
+# store: unkomprimiert (z.B. Zwischenergebnisse für Indexer), max: für die Archivierung
+COMPRESSION_POLICIES = ("store", "fast", "default", "max")
+COMPRESSION_LEVELS = {"fast": 1, "default": 6, "max": 9}
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+# Teile ab dieser Größe werden in Blöcken parallel komprimiert; zlib gibt dabei den GIL frei
+CHUNK_SIZE = 1024 * 1024
+# Jeder Block erhält die letzten 32 KB des vorherigen als Wörterbuch (wie pigz)
+DEFLATE_WINDOW = 32 * 1024
+PARALLEL_MIN_SIZE = 64 * 1024
+
+DateTime = Tuple[int, int, int, int, int, int]
+
+_pool = SharedThreadPool(min(4, os.cpu_count() or 1), "deflate")
+
+
+def get_compression_executor() -> ThreadPoolExecutor:
+    """Gemeinsamer Thread-Pool für die Kompression (höchstens 4 Threads je Prozess)."""
+    return _pool.get()
+
+
+def compression_method(policy: str) -> Tuple[int, int]:
+    """
+    Liefert Kompressionsverfahren und zlib-Stufe einer Kompressionsrichtlinie.
+
+    Raises:
+        ValueError: Wenn die Richtlinie unbekannt ist
+    """
+    if policy == "store":
+        return ZIP_STORED, 0
+    try:
+        return ZIP_DEFLATED, COMPRESSION_LEVELS[policy]
+    except KeyError:
+        raise ValueError(f"Unbekannte Kompressionsstufe: {policy}")
+
+
+def deflate_chunk(data: memoryview, start: int, end: int, level: int) -> bytes:
+    """
+    Komprimiert einen Block als Teil eines fortlaufenden Deflate-Datenstroms.
+
+    Alle Blöcke außer dem letzten enden mit Z_SYNC_FLUSH auf einer Bytegrenze,
+    so dass die Ergebnisse einfach aneinandergehängt werden können.
+    """
+    zdict = data[max(0, start - DEFLATE_WINDOW):start]
+    if len(zdict):
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15, zdict=zdict)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    last = end >= len(data)
+    return compressor.compress(data[start:end]) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+def dos_date_time(date_time: DateTime) -> Tuple[int, int]:
+    year, month, day, hour, minute, second = date_time
+    return ((year - 1980) << 9) | (month << 5) | day, (hour << 11) | (minute << 5) | (second // 2)
+
+
+class ZipStreamEntry:
+    """Eintrag, dessen Inhalt stückweise geschrieben wird (Größen folgen im Datendeskriptor)"""
+
+    def __init__(self, writer: "ZipWriter", name: str):
+        self.writer = writer
+        self.name = name
+        self.crc = 0
+        self.size = 0
+        self.compressed_size = 0
+        self.compressor = (zlib.compressobj(writer.level, zlib.DEFLATED, -15)
+                           if writer.method == ZIP_DEFLATED else None)
+        self.offset = writer.write_local_header(name, 0, 0, 0, streamed=True)
+
+    def write(self, data: bytes):
+        self.crc = zlib.crc32(data, self.crc)
+        self.size += len(data)
+        if self.compressor is not None:
+            data = self.compressor.compress(data)
+        self.compressed_size += len(data)
+        self.writer.write_raw(data)
+
+    def close(self):
+        if self.compressor is not None:
+            tail = self.compressor.flush()
+            self.compressed_size += len(tail)
+            self.writer.write_raw(tail)
+            self.compressor = None
+        self.writer.write_raw(struct.pack('<4I', 0x08074b50, self.crc, self.compressed_size, self.size))
+        self.writer.add_central_record(self.name, self.crc, self.compressed_size, self.size,
+                                       self.offset, streamed=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+
+
+class ZipWriter:
+    """
+    Schreibt ZIP-Archive (z.B. DOCX) byte-genau reproduzierbar: feste Reihenfolge,
+    einheitlicher Zeitstempel und feste Attribute. Der Datenstrom muss nicht
+    durchsuchbar sein.
+
+    Große Teile werden blockweise in Threads komprimiert. Die Blockgrenzen
+    hängen nur von der Größe des Teils ab, das Ergebnis also nicht von der
+    Anzahl der Threads. Teile ab PARALLEL_MIN_SIZE unterscheiden sich dadurch
+    byte-weise von einer Kompression in einem Stück (z.B. durch zipfile),
+    kleinere Teile nicht.
+    """
+
+    def __init__(self, stream: BinaryIO, compression: str = "default",
+                 date_time: DateTime = (1980, 1, 1, 0, 0, 0)):
+        """
+        Args:
+            stream: Beschreibbarer Datenstrom
+            compression: Kompressionsrichtlinie (store, fast, default, max)
+            date_time: Zeitstempel aller Einträge
+        """
+        self.stream = stream
+        self.method, self.level = compression_method(compression)
+        self.dos_date, self.dos_time = dos_date_time(date_time)
+        self.offset = 0
+        self.central_directory: List[bytes] = []
+
+    def write_raw(self, data: bytes):
+        self.stream.write(data)
+        self.offset += len(data)
+
+    @staticmethod
+    def encode_name(name: str) -> Tuple[bytes, int]:
+        try:
+            return name.encode('ascii'), 0
+        except UnicodeEncodeError:
+            return name.encode('utf-8'), 0x800
+
+    def write_local_header(self, name: str, crc: int, compressed_size: int, size: int,
+                           streamed: bool = False) -> int:
+        if max(compressed_size, size, self.offset) >= 0xFFFFFFFF:
+            raise ValueError(f"{name}: ZIP64 wird nicht unterstützt")
+        encoded, flags = self.encode_name(name)
+        if streamed:
+            flags |= 0x08
+        offset = self.offset
+        self.write_raw(struct.pack('<IHHHHHIIIHH', 0x04034b50, 20, flags, self.method, self.dos_time,
+                                   self.dos_date, crc, compressed_size, size, len(encoded), 0) + encoded)
+        return offset
+
+    def add_central_record(self, name: str, crc: int, compressed_size: int, size: int, offset: int,
+                           streamed: bool = False):
+        encoded, flags = self.encode_name(name)
+        if streamed:
+            flags |= 0x08
+        # Erstellt unter Unix (3), Version 2.0, Rechte 0644
+        self.central_directory.append(struct.pack(
+            '<IHHHHHHIIIHHHHHII', 0x02014b50, (3 << 8) | 20, 20, flags, self.method, self.dos_time,
+            self.dos_date, crc, compressed_size, size, len(encoded), 0, 0, 0, 0, 0o644 << 16, offset) + encoded)
+
+    def compress(self, data: bytes) -> Union[bytes, List[Future]]:
+        """Komprimiert kleine Teile sofort und verteilt große blockweise auf den Thread-Pool."""
+        if self.method == ZIP_STORED:
+            return data
+        if len(data) < PARALLEL_MIN_SIZE:
+            return deflate_chunk(memoryview(data), 0, len(data), self.level)
+        view = memoryview(data)
+        executor = get_compression_executor()
+        return [executor.submit(deflate_chunk, view, start, min(start + CHUNK_SIZE, len(data)), self.level)
+                for start in range(0, len(data), CHUNK_SIZE)]
+
+    def write_entry(self, name: str, data: bytes, compressed: Union[bytes, List[Future]]):
+        if isinstance(compressed, list):
+            compressed = b"".join(future.result() for future in compressed)
+        crc = zlib.crc32(data)
+        offset = self.write_local_header(name, crc, len(compressed), len(data))
+        self.write_raw(compressed)
+        self.add_central_record(name, crc, len(compressed), len(data), offset)
+
+    def write(self, name: str, data: bytes):
+        """Schreibt einen Eintrag."""
+        self.write_entry(name, data, self.compress(data))
+
+    def write_all(self, entries: Iterable[Tuple[str, bytes]]):
+        """
+        Schreibt mehrere Einträge in der angegebenen Reihenfolge; die Kompression
+        aller Teile läuft dabei gleichzeitig.
+        """
+        compressed = [(name, data, self.compress(data)) for name, data in entries]
+        for name, data, result in compressed:
+            self.write_entry(name, data, result)
+
+    def open(self, name: str) -> ZipStreamEntry:
+        """Öffnet einen Eintrag, dessen Inhalt stückweise geschrieben wird."""
+        return ZipStreamEntry(self, name)
+
+    def close(self):
+        """Schreibt das zentrale Verzeichnis."""
+        start = self.offset
+        for record in self.central_directory:
+            self.write_raw(record)
+        count = len(self.central_directory)
+        self.write_raw(struct.pack('<IHHHHIIH', 0x06054b50, 0, 0, count, count,
+                                   self.offset - start, start, 0))
@@ -0,0 +1,220 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# server.py
+# Lokaler HTTP-Dienst für PDF-zu-DOCX-Konvertierungen (ohne PyQt5)
+
+import os
+import json
+import shutil
+import socket
+import logging
+import tempfile
+from concurrent.futures import CancelledError, TimeoutError
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn
+from typing import Optional
+from urllib.parse import urlsplit, parse_qs
+
+from src.core.service import ConversionService, JobTimeout, ServiceOverloaded
+from src.core.scheduling import DEFAULT_PRIORITY, PRIORITY_CLASSES
+
+CHUNK_SIZE = 64 * 1024
+DOCX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+class ConversionRequestHandler(BaseHTTPRequestHandler):
+    """
+    Endpunkte:
+        GET  /health                 Zustand der Warteschlange als JSON
+        POST /convert                PDF im Anfragekörper, Antwort ist die DOCX-Datei
+        POST /convert?path=<pfad>    Lokale PDF-Datei konvertieren
+
+    Kopfzeilen:
+        X-Client-Id   Client für die faire Verteilung (Standard: Adresse des Clients)
+        X-Priority    Prioritätsklasse high, normal oder low (Standard: normal)
+    """
+
+    server_version = "PDFMagic/2.1"
+
+    def setup(self):
+        # Zeitlimit für das Lesen und Schreiben auf der Verbindung
+        self.timeout = self.server.io_timeout
+        super().setup()
+
+    def address_string(self) -> str:
+        if isinstance(self.client_address, tuple):
+            return self.client_address[0]
+        return "unix"
+
+    def log_message(self, format: str, *args):
+        logging.getLogger('ConversionService').info(f"{self.address_string()} - {format % args}")
+
+    def send_json(self, status: HTTPStatus, payload: dict, headers: Optional[dict] = None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if urlsplit(self.path).path == "/health":
+            self.send_json(HTTPStatus.OK, self.server.service.stats())
+        else:
+            self.send_json(HTTPStatus.NOT_FOUND, {"error": "Unbekannter Pfad"})
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != "/convert":
+            self.send_json(HTTPStatus.NOT_FOUND, {"error": "Unbekannter Pfad"})
+            return
+        service: ConversionService = self.server.service
+        client_id = self.headers.get("X-Client-Id") or self.address_string()
+        priority = self.headers.get("X-Priority", DEFAULT_PRIORITY).lower()
+        if priority not in PRIORITY_CLASSES:
+            self.send_json(HTTPStatus.BAD_REQUEST,
+                           {"error": f"Unbekannte Priorität, erlaubt: {', '.join(PRIORITY_CLASSES)}"})
+            return
+        error_msg = service.check_capacity(client_id)
+        if error_msg:
+            # Ablehnen, bevor der Anfragekörper gelesen wird
+            self.send_overloaded(error_msg)
+            return
+
+        work_dir = tempfile.mkdtemp(prefix="request_", dir=self.server.work_dir)
+        try:
+            local_path = parse_qs(url.query).get("path", [None])[0]
+            if local_path:
+                pdf_path = local_path
+                name = os.path.splitext(os.path.basename(local_path))[0]
+            else:
+                pdf_path = self.receive_upload(work_dir)
+                if pdf_path is None:
+                    return
+                name = os.path.splitext(self.headers.get("X-Filename", "upload.pdf"))[0]
+            docx_path = os.path.join(work_dir, "output.docx")
+
+            try:
+                job = service.submit(pdf_path, docx_path, client_id, priority)
+            except ServiceOverloaded as e:
+                self.send_overloaded(e.message)
+                return
+            try:
+                stats = job.future.result(timeout=self.server.request_timeout)
+            except (TimeoutError, CancelledError, JobTimeout):
+                service.abandon(job)
+                self.send_json(HTTPStatus.GATEWAY_TIMEOUT,
+                               {"error": f"Zeitüberschreitung nach {self.server.request_timeout} s"})
+                return
+            except Exception as e:
+                self.send_json(HTTPStatus.UNPROCESSABLE_ENTITY, {"error": str(e)})
+                return
+            self.send_docx(docx_path, f"{os.path.basename(name)}.docx", stats, job.wait_seconds)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def send_overloaded(self, message: str):
+        self.close_connection = True
+        self.send_json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": message}, {"Retry-After": "5"})
+
+    def receive_upload(self, work_dir: str) -> Optional[str]:
+        """
+        Schreibt den Anfragekörper blockweise in eine Datei, ohne ihn im Speicher zu halten.
+
+        Returns:
+            Optional[str]: Pfad der hochgeladenen PDF oder None, wenn bereits geantwortet wurde
+        """
+        length_header = self.headers.get("Content-Length")
+        if length_header is None:
+            self.send_json(HTTPStatus.LENGTH_REQUIRED, {"error": "Content-Length fehlt"})
+            return None
+        try:
+            length = int(length_header)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            self.send_json(HTTPStatus.BAD_REQUEST, {"error": "Ungültige Content-Length"})
+            return None
+        if length > self.server.max_upload_bytes:
+            self.close_connection = True
+            self.send_json(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Datei zu groß"})
+            return None
+
+        pdf_path = os.path.join(work_dir, "input.pdf")
+        remaining = length
+        try:
+            with open(pdf_path, 'wb') as pdf_file:
+                while remaining > 0:
+                    chunk = self.rfile.read(min(CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    pdf_file.write(chunk)
+                    remaining -= len(chunk)
+        except socket.timeout:
+            self.close_connection = True
+            self.send_json(HTTPStatus.REQUEST_TIMEOUT, {"error": "Zeitüberschreitung beim Hochladen"})
+            return None
+        if remaining:
+            self.close_connection = True
+            self.send_json(HTTPStatus.BAD_REQUEST, {"error": "Anfragekörper unvollständig"})
+            return None
+        return pdf_path
+
+    def send_docx(self, docx_path: str, file_name: str, stats: dict, wait_seconds: float):
+        """Sendet die DOCX-Datei blockweise an den Client."""
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", DOCX_CONTENT_TYPE)
+        self.send_header("Content-Length", str(os.path.getsize(docx_path)))
+        self.send_header("Content-Disposition", f'attachment; filename="{file_name}"')
+        self.send_header("X-Pages", str(stats["pages"]))
+        self.send_header("X-Duration", f"{stats['duration']:.3f}")
+        self.send_header("X-Queue-Wait", f"{wait_seconds:.3f}")
+        self.end_headers()
+        with open(docx_path, 'rb') as docx_file:
+            shutil.copyfileobj(docx_file, self.wfile, CHUNK_SIZE)
+
+
+class LocalHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+if hasattr(socket, 'AF_UNIX'):
+    from socketserver import UnixStreamServer
+
+    class UnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+        daemon_threads = True
+
+
+def create_server(service: ConversionService, host: str = "127.0.0.1", port: int = 8765,
+                  socket_path: Optional[str] = None, request_timeout: float = 300.0,
+                  io_timeout: float = 30.0, max_upload_mb: int = 200):
+    """
+    Erstellt den HTTP-Server, gebunden an localhost oder einen Unix-Socket.
+
+    Args:
+        service: Auftragswarteschlange mit Prozess-Pool
+        host: Adresse für TCP (Standard: nur localhost)
+        port: TCP-Port
+        socket_path: Pfad eines Unix-Sockets statt TCP
+        request_timeout: Maximale Wartezeit auf eine Konvertierung in Sekunden; die
+            Konvertierung selbst bricht nur ab, wenn der Dienst mit time_limit läuft
+        io_timeout: Zeitlimit für Lesen und Schreiben auf der Verbindung in Sekunden
+        max_upload_mb: Maximale Größe hochgeladener PDFs in MB
+    """
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = UnixHTTPServer(socket_path, ConversionRequestHandler)
+    else:
+        server = LocalHTTPServer((host, port), ConversionRequestHandler)
+    server.service = service
+    server.work_dir = tempfile.mkdtemp(prefix="pdf_magic_service_")
+    server.request_timeout = request_timeout
+    server.io_timeout = io_timeout
+    server.max_upload_bytes = max_upload_mb * 1024 * 1024
+    return server
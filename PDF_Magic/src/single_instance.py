@@ -0,0 +1,114 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# single_instance.py
+# Liegt außerhalb von src.ui, damit ein zweiter Start keine Widgets importiert
+
+import os
+import json
+import getpass
+import logging
+from typing import List
+
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+
+# Ein Server je Benutzer, damit sich mehrere Anmeldungen nicht gegenseitig stören
+SERVER_NAME = f"pdf_magic_{getpass.getuser()}"
+CONNECT_TIMEOUT_MS = 200
+
+
+def send_to_running_instance(files: List[str], server_name: str = SERVER_NAME) -> bool:
+    """
+    Übergibt Dateien an eine bereits laufende Instanz.
+
+    Benötigt keine QApplication, damit ein zweiter Start ohne Aufbau der
+    Oberfläche sofort wieder beendet werden kann.
+
+    Args:
+        files: Zu übergebende Dateipfade (dürfen leer sein, dann wird nur das Fenster gezeigt)
+        server_name: Name des lokalen Servers
+
+    Returns:
+        bool: True, wenn eine laufende Instanz die Dateien übernommen hat
+    """
+    socket = QLocalSocket()
+    socket.connectToServer(server_name)
+    if not socket.waitForConnected(CONNECT_TIMEOUT_MS):
+        return False
+    payload = json.dumps({"files": [os.path.abspath(path) for path in files]}) + "\n"
+    socket.write(payload.encode('utf-8'))
+    delivered = socket.bytesToWrite() == 0 or socket.waitForBytesWritten(CONNECT_TIMEOUT_MS)
+    socket.disconnectFromServer()
+    return delivered
+
+
+class SingleInstanceServer(QObject):
+    """Lokaler Server der ersten Instanz, der Dateien späterer Starts entgegennimmt"""
+
+    filesReceived = pyqtSignal(list)
+
+    def __init__(self, server_name: str = SERVER_NAME, parent=None):
+        super().__init__(parent)
+        self.server_name = server_name
+        self.server = QLocalServer(self)
+        self.server.newConnection.connect(self.handle_connection)
+        self.buffers = {}
+        self.logger = logging.getLogger('SingleInstanceServer')
+
+    def start(self) -> bool:
+        """
+        Startet den Server. Ein verwaister Socket nach einem Absturz wird nur
+        entfernt, wenn unter dem Namen tatsächlich keine Instanz mehr antwortet.
+
+        Returns:
+            bool: True, wenn der Server lauscht
+        """
+        if self.server.listen(self.server_name):
+            return True
+        if self.is_server_alive():
+            # Eine andere Instanz ist gleichzeitig gestartet, ihren Socket nicht entfernen
+            self.logger.warning("Einzelinstanz-Server läuft bereits in einer anderen Instanz")
+            return False
+        QLocalServer.removeServer(self.server_name)
+        if not self.server.listen(self.server_name):
+            self.logger.warning(f"Einzelinstanz-Server konnte nicht gestartet werden: "
+                                f"{self.server.errorString()}")
+            return False
+        return True
+
+    def is_server_alive(self) -> bool:
+        """Prüft, ob unter dem Servernamen eine Instanz Verbindungen annimmt."""
+        socket = QLocalSocket()
+        socket.connectToServer(self.server_name)
+        alive = socket.waitForConnected(CONNECT_TIMEOUT_MS)
+        if alive:
+            socket.disconnectFromServer()
+        return alive
+
+    def handle_connection(self):
+        """Nimmt eine neue Verbindung einer weiteren Instanz an"""
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            self.buffers[socket] = b""
+            socket.readyRead.connect(lambda s=socket: self.read_message(s))
+            socket.disconnected.connect(lambda s=socket: self.close_connection(s))
+
+    def read_message(self, socket: QLocalSocket):
+        """Liest zeilenweise JSON-Nachrichten und meldet die enthaltenen Dateien"""
+        self.buffers[socket] += bytes(socket.readAll())
+        while b"\n" in self.buffers[socket]:
+            line, self.buffers[socket] = self.buffers[socket].split(b"\n", 1)
+            try:
+                files = json.loads(line.decode('utf-8')).get("files", [])
+            except ValueError:
+                self.logger.warning("Ungültige Nachricht einer weiteren Instanz ignoriert")
+                continue
+            self.filesReceived.emit(files)
+
+    def close_connection(self, socket: QLocalSocket):
+        """Räumt eine beendete Verbindung auf"""
+        if socket in self.buffers:
+            self.read_message(socket)
+            del self.buffers[socket]
+        socket.deleteLater()
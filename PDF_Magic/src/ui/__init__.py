@@ -7,6 +7,7 @@
 from .dialogs import *
 from .main_window import *
 from .widgets import *
+from .worker import *
 
 # UI-spezifische Importe
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QPushButton, QTextEdit, QProgressBar
@@ -17,4 +18,5 @@ __all__ = [
     'dialogs',
     'main_window',
     'widgets',
+    'worker',
 ]
@@ -4,7 +4,7 @@
 # dialogs.py
 # Erstellt durch populate_files.py
 
-from PyQt5.QtWidgets import QMessageBox
+from PyQt5.QtWidgets import QMessageBox, QProgressBar, QTextEdit
 
 
 def show_error_message(message: str):
@@ -14,4 +14,13 @@ def show_error_message(message: str):
     error_box.setText("Ein Fehler ist aufgetreten")
     error_box.setInformativeText(message)
     error_box.setWindowTitle("Fehler")
-    error_box.exec_()
\ No newline at end of file
+    error_box.exec_()
+
+def update_log(log_window: QTextEdit, message: str):
+    """Aktualisiert das Log-Fenster mit einer neuen Nachricht."""
+    log_window.append(message)
+    log_window.verticalScrollBar().setValue(log_window.verticalScrollBar().maximum())
+
+def update_progress_bar(progress_bar: QProgressBar, value: int):
+    """Aktualisiert den Fortschrittsbalken."""
+    progress_bar.setValue(value)
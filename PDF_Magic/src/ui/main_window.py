@@ -4,27 +4,41 @@
 # Version: 2.1
 
 import os
+import threading
 from datetime import datetime
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QPushButton, 
                            QTextEdit, QProgressBar, QFileDialog,
                            QListWidget, QHBoxLayout, QMessageBox,
                            QLabel, QMainWindow, QStatusBar, QMenu,
                            QMenuBar, QAction, QSystemTrayIcon)
-from PyQt5.QtCore import Qt, QThread
+from PyQt5.QtCore import Qt, QThread, QTimer
 from PyQt5.QtGui import QFont
 
-from src.ui.widgets import EnhancedDragDrop
+from src.ui.widgets import EnhancedDragDrop, ErrorPanel
+from src.ui.worker import ConversionWorker
+from src.ui.dialogs import update_log, update_progress_bar, show_error_message
 from src.utils.style import apply_styles
-from src.core.utils import ConversionWorker, update_log, update_progress_bar, show_error_message
+from src.core.errors import ErrorCollection
+from src.core.engine import preload_dependencies
 
 class PDFMagicApp(QMainWindow):
     def __init__(self):
         super().__init__()
         self.output_dir = None
         self.pdf_files = []
+        self.running_files = []
         self.last_directory = None
+        self.error_log = ErrorCollection()
+        self.tray_icon = None
         self.init_ui()
+        # Tray-Icon und Vorladen erst, wenn das Fenster sichtbar ist
+        QTimer.singleShot(0, self.finish_startup)
+
+    def finish_startup(self):
+        """Erledigt nicht dringende Startaufgaben, nachdem das Fenster angezeigt wurde"""
         self.setup_system_tray()
+        # PyPDF2 und python-docx im Hintergrund laden, damit die erste Konvertierung nicht wartet
+        threading.Thread(target=preload_dependencies, name="preload", daemon=True).start()
 
     def init_ui(self):
         """Initialisiert die Benutzeroberfläche mit einem modernen und intuitiven Design"""
@@ -98,6 +112,10 @@ class PDFMagicApp(QMainWindow):
 
         main_layout.addLayout(content_layout)
 
+        # Fehlerübersicht (nicht-modal, filter- und exportierbar)
+        self.error_panel = ErrorPanel(self.error_log)
+        main_layout.addWidget(self.error_panel)
+
         # Fortschrittsanzeige
         progress_container = QVBoxLayout()
         progress_label = QLabel("Fortschritt:")
@@ -105,7 +123,7 @@ class PDFMagicApp(QMainWindow):
         progress_container.addWidget(progress_label)
 
         self.progress_bar = QProgressBar()
-        self.progress_bar.setFormat("%p% - %v von %m Dateien")
+        self.progress_bar.setFormat("%p% der Seiten")
         progress_container.addWidget(self.progress_bar)
         main_layout.addLayout(progress_container)
 
@@ -204,6 +222,17 @@ class PDFMagicApp(QMainWindow):
             self.add_pdf_file(file_path)
             self.show()  # Zeigt das Hauptfenster an
 
+    def receive_files(self, files):
+        """Übernimmt Dateien von der Kommandozeile oder einer weiteren Instanz und zeigt das Fenster"""
+        for file_path in files:
+            if os.path.isfile(file_path) and file_path.lower().endswith('.pdf'):
+                self.add_pdf_file(file_path)
+        if files:
+            self.log_message(f"{len(files)} Datei(en) übernommen")
+        self.showNormal()
+        self.raise_()
+        self.activateWindow()
+
     def add_pdf_file(self, file_path):
         """Fügt eine PDF-Datei zur Liste hinzu"""
         if file_path not in self.pdf_files:
@@ -226,6 +255,16 @@ class PDFMagicApp(QMainWindow):
 
     def convert_pdfs(self):
         """Startet den Konvertierungsprozess für die ausgewählten PDF-Dateien"""
+        self.start_conversion(clear_errors=True)
+
+    def start_conversion(self, clear_errors: bool):
+        """
+        Startet einen Lauf über die Dateien der Liste.
+
+        Args:
+            clear_errors: Fehlerübersicht leeren; bei Folgeläufen für zwischenzeitlich
+                hinzugefügte Dateien bleiben die Fehler des vorigen Laufs sichtbar
+        """
         if not self.pdf_files:
             show_error_message("Bitte wählen Sie zuerst PDF-Dateien aus.")
             return
@@ -238,10 +277,16 @@ class PDFMagicApp(QMainWindow):
         if not output_dir:
             return
 
-        self.progress_bar.setMaximum(len(self.pdf_files))
+        self.progress_bar.setMaximum(100)
         self.progress_bar.setValue(0)
-
-        self.worker = ConversionWorker(self.pdf_files, output_dir)
+        if clear_errors:
+            self.error_panel.clear()
+        self.conversion_result = (0, 0, len(self.pdf_files))
+
+        # Der Lauf arbeitet auf einer Kopie; währenddessen hinzugefügte Dateien
+        # bleiben in der Liste und werden im Anschluss konvertiert
+        self.running_files = list(self.pdf_files)
+        self.worker = ConversionWorker(self.running_files, output_dir)
         self.worker_thread = QThread()
         self.worker.moveToThread(self.worker_thread)
 
@@ -251,8 +296,11 @@ class PDFMagicApp(QMainWindow):
         self.worker_thread.finished.connect(self.worker_thread.deleteLater)
 
         self.worker.progress.connect(lambda value: update_progress_bar(self.progress_bar, value))
+        self.worker.status.connect(self.statusBar.showMessage)
         self.worker.log.connect(lambda message: update_log(self.log_window, message))
-        self.worker.error.connect(show_error_message)
+        self.worker.failed.connect(self.error_panel.add_error)
+        self.worker.summary.connect(self.store_conversion_result)
+        self.worker.paused.connect(self.show_conversion_paused)
 
         self.worker_thread.start()
 
@@ -262,13 +310,47 @@ class PDFMagicApp(QMainWindow):
         )
         self.worker_thread.finished.connect(self.conversion_finished)
 
+    def show_conversion_paused(self, message: str):
+        """Zeigt an, dass der Lauf wegen Speicherplatzmangels angehalten wurde"""
+        self.statusBar.showMessage("Konvertierung angehalten: zu wenig Speicherplatz")
+        update_log(self.log_window, message)
+        pause_box = QMessageBox(QMessageBox.Warning, "Konvertierung angehalten", message, parent=self)
+        resume_button = pause_box.addButton("Fortsetzen", QMessageBox.AcceptRole)
+        pause_box.addButton("Abbrechen", QMessageBox.RejectRole)
+        worker = self.worker
+        pause_box.buttonClicked.connect(
+            lambda button: worker.resume() if button is resume_button else worker.cancel())
+        pause_box.setModal(False)
+        pause_box.show()
+
+    def store_conversion_result(self, successful: int, failed: int, total: int):
+        """Merkt sich das Ergebnis des Laufs für die Abschlussmeldung"""
+        self.conversion_result = (successful, failed, total)
+
     def conversion_finished(self):
         """Wird aufgerufen, wenn die Konvertierung abgeschlossen ist"""
-        QMessageBox.information(self, "Konvertierung abgeschlossen", 
-                                "Alle PDF-Dateien wurden erfolgreich konvertiert!")
-        self.pdf_files.clear()
+        successful, failed, total = self.conversion_result
+        if successful < total:
+            # Eine einzige, nicht-modale Zusammenfassung statt eines Dialogs pro Fehler
+            summary_box = QMessageBox(QMessageBox.Warning, "Konvertierung abgeschlossen",
+                f"{successful} von {total} PDF-Dateien wurden konvertiert.\n"
+                f"{self.error_log.summary()} - Details in der Fehlerübersicht.", parent=self)
+            summary_box.setModal(False)
+            summary_box.show()
+        else:
+            QMessageBox.information(self, "Konvertierung abgeschlossen", 
+                                    "Alle PDF-Dateien wurden erfolgreich konvertiert!")
+        converted = set(self.running_files)
+        self.running_files = []
+        self.pdf_files = [file_path for file_path in self.pdf_files if file_path not in converted]
         self.file_list.clear()
+        self.file_list.addItems([os.path.basename(file_path) for file_path in self.pdf_files])
         self.update_status()
+        if self.pdf_files and self.output_dir:
+            self.log_message(f"{len(self.pdf_files)} während der Konvertierung hinzugefügte "
+                             f"Datei(en) werden jetzt konvertiert")
+            # Erst starten, wenn der alte Worker-Thread vollständig beendet ist
+            QTimer.singleShot(0, lambda: self.start_conversion(clear_errors=False))
 
     def show_about(self):
         """Zeigt Informationen über die Anwendung"""
@@ -286,7 +368,8 @@ class PDFMagicApp(QMainWindow):
 
         if reply == QMessageBox.Yes:
             event.accept()
-            self.tray_icon.hide()  # Entfernt das Tray-Icon beim Beenden
+            if self.tray_icon:
+                self.tray_icon.hide()  # Entfernt das Tray-Icon beim Beenden
         else:
             event.ignore()
             self.hide()  # Versteckt das Hauptfenster statt es zu schließen
@@ -350,7 +433,7 @@ class PDFMagicApp(QMainWindow):
     def hideEvent(self, event):
         """Wird aufgerufen, wenn das Fenster versteckt wird"""
         super().hideEvent(event)
-        if self.tray_icon.isVisible():
+        if self.tray_icon and self.tray_icon.isVisible():
             self.tray_icon.showMessage(
                 "PDF Magic",
                 "Die Anwendung läuft im Hintergrund weiter.",
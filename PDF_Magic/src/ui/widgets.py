@@ -9,10 +9,15 @@ import types
 from typing import List, Set
 from datetime import datetime
 
-from PyQt5.QtWidgets import (QWidget, QLabel, QVBoxLayout, 
-                            QApplication, QStyle, QProgressBar, QMessageBox)
+from PyQt5.QtWidgets import (QWidget, QLabel, QVBoxLayout, QHBoxLayout,
+                            QApplication, QStyle, QProgressBar, QMessageBox,
+                            QTableWidget, QTableWidgetItem, QLineEdit,
+                            QPushButton, QHeaderView, QFileDialog)
 from PyQt5.QtCore import Qt, pyqtSignal, QSize
-from PyQt5.QtGui import (QDragEnterEvent, QDropEvent, QDragLeaveEvent)
+from PyQt5.QtGui import (QDragEnterEvent, QDropEvent, QDragLeaveEvent, QFont)
+
+from src.core.errors import ErrorCollection, ErrorRecord
+from src.core.utils import create_error_report
 
 class EnhancedDragDrop(QWidget):
     """
@@ -85,9 +90,9 @@ class EnhancedDragDrop(QWidget):
         self.logger = logging.getLogger('EnhancedDragDrop')
         self.logger.setLevel(logging.DEBUG)
         
-        # Erstelle einen FileHandler
+        # Erstelle einen FileHandler; die Datei wird erst beim ersten Eintrag angelegt
         log_file = f'drag_drop_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'
-        file_handler = logging.FileHandler(log_file)
+        file_handler = logging.FileHandler(log_file, delay=True)
         file_handler.setLevel(logging.DEBUG)
         
         # Formatter
@@ -319,6 +324,109 @@ class EnhancedDragDrop(QWidget):
             f"Maximale Anzahl Dateien: {self.max_files}"
         )
 
+class ErrorPanel(QWidget):
+    """
+    Nicht-modale Fehlerübersicht, die alle Fehler eines Laufs in einer
+    filterbaren Tabelle sammelt und exportieren kann
+    """
+
+    COLUMNS = ["Zeit", "Kategorie", "Datei", "Meldung"]
+
+    def __init__(self, error_log: ErrorCollection, parent=None):
+        """Initialisiert das ErrorPanel Widget"""
+        super().__init__(parent)
+        self.error_log = error_log
+        self.init_ui()
+
+    def init_ui(self):
+        """Initialisiert die Benutzeroberfläche"""
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        # Kopfzeile mit Titel und Filter
+        header_layout = QHBoxLayout()
+        self.title_label = QLabel("Fehler:")
+        self.title_label.setFont(QFont('Segoe UI', 12, QFont.Bold))
+        header_layout.addWidget(self.title_label)
+
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Fehler filtern...")
+        self.filter_edit.textChanged.connect(self.apply_filter)
+        header_layout.addWidget(self.filter_edit)
+
+        self.export_button = QPushButton("Exportieren")
+        self.export_button.setToolTip("Fehlerbericht als Text- oder CSV-Datei speichern")
+        self.export_button.clicked.connect(self.export_errors)
+        header_layout.addWidget(self.export_button)
+
+        self.clear_button = QPushButton("Leeren")
+        self.clear_button.setToolTip("Alle Fehlereinträge entfernen")
+        self.clear_button.clicked.connect(self.clear)
+        header_layout.addWidget(self.clear_button)
+        layout.addLayout(header_layout)
+
+        # Fehlertabelle
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.setAlternatingRowColors(True)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
+        layout.addWidget(self.table)
+
+        self.setLayout(layout)
+        self.update_title()
+
+    def add_error(self, file_path: str, message: str, category: str = "Konvertierung") -> None:
+        """Nimmt einen neuen Fehler in die Sammlung und die Tabelle auf"""
+        record = self.error_log.add(file_path, message, category)
+        if record.matches(self.filter_edit.text()):
+            self.append_row(record)
+        self.update_title()
+
+    def append_row(self, record: ErrorRecord) -> None:
+        """Fügt einen Eintrag als Tabellenzeile hinzu"""
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        values = [record.timestamp.strftime("%H:%M:%S"), record.category,
+                  os.path.basename(record.file_path), record.message]
+        for column, value in enumerate(values):
+            item = QTableWidgetItem(value)
+            item.setToolTip(record.file_path if column == 2 else value)
+            self.table.setItem(row, column, item)
+
+    def apply_filter(self, text: str) -> None:
+        """Zeigt nur die Einträge an, die den Filtertext enthalten"""
+        self.table.setUpdatesEnabled(False)
+        self.table.setRowCount(0)
+        for record in self.error_log.filter(text):
+            self.append_row(record)
+        self.table.setUpdatesEnabled(True)
+
+    def update_title(self) -> None:
+        """Aktualisiert die Überschrift mit der Anzahl der Fehler"""
+        self.title_label.setText(f"Fehler ({len(self.error_log)}):")
+        self.export_button.setEnabled(len(self.error_log) > 0)
+
+    def export_errors(self) -> None:
+        """Exportiert die gesammelten Fehler als Fehlerbericht oder CSV-Datei"""
+        file_name, _ = QFileDialog.getSaveFileName(
+            self, "Fehlerbericht speichern", "",
+            "Text Dateien (*.txt);;CSV Dateien (*.csv)")
+        if not file_name:
+            return
+        if file_name.lower().endswith('.csv'):
+            self.error_log.export_csv(file_name)
+        else:
+            create_error_report(self.error_log, file_name)
+
+    def clear(self) -> None:
+        """Entfernt alle Fehlereinträge"""
+        self.error_log.clear()
+        self.table.setRowCount(0)
+        self.update_title()
+
 def apply_enhanced_drag_drop(app):
     """
     Wendet die verbesserte Drag & Drop Funktionalität auf die bestehende App an.
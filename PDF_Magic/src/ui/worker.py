@@ -0,0 +1,57 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# worker.py
+
+from typing import List
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from src.core.engine import ConversionEngine, ConversionEvent
+
+
+class ConversionWorker(QObject):
+    """Qt-Adapter, der die Ereignisse der ConversionEngine als Signale weitergibt"""
+    finished = pyqtSignal()
+    progress = pyqtSignal(int)  # Prozent, gewichtet nach Seiten
+    status = pyqtSignal(str)  # Aktuelle Datei, Seite und Durchsatz
+    log = pyqtSignal(str)
+    error = pyqtSignal(str)
+    failed = pyqtSignal(str, str)  # Dateipfad, Fehlermeldung
+    summary = pyqtSignal(int, int, int)  # Erfolgreich, Fehlgeschlagen, Gesamt
+    paused = pyqtSignal(str)  # Grund, warum der Lauf angehalten wurde
+
+    def __init__(self, pdf_files: List[str], output_dir: str):
+        super().__init__()
+        self.engine = ConversionEngine(pdf_files, output_dir, listener=self.dispatch)
+
+    def run(self):
+        """Führt die Konvertierung im Thread des Workers aus"""
+        self.engine.run()
+
+    def resume(self):
+        """Setzt einen angehaltenen Lauf fort"""
+        self.engine.resume()
+
+    def cancel(self):
+        """Bricht den Lauf vor der nächsten Datei ab"""
+        self.engine.cancel()
+
+    def dispatch(self, event: ConversionEvent):
+        """Übersetzt ein Ereignis der Engine in das passende Signal"""
+        data = event.data
+        if event.kind == ConversionEvent.PROGRESS:
+            self.progress.emit(data["percent"])
+        elif event.kind == ConversionEvent.STATUS:
+            self.status.emit(data["message"])
+        elif event.kind == ConversionEvent.LOG:
+            self.log.emit(data["message"])
+        elif event.kind == ConversionEvent.FAILED:
+            self.error.emit(data["full_message"])
+            self.failed.emit(data["file_path"], data["message"])
+        elif event.kind == ConversionEvent.PAUSED:
+            self.paused.emit(data["message"])
+        elif event.kind == ConversionEvent.SUMMARY:
+            self.summary.emit(data["successful"], data["failed"], data["total"])
+        elif event.kind == ConversionEvent.FINISHED:
+            self.finished.emit()
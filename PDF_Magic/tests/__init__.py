@@ -7,9 +7,39 @@
 from .test_converter import *
 from .test_file_handler import *
 from .test_validator import *
+from .test_prescan import *
+from .test_images import *
+from .test_ocr import *
+from .test_metrics import *
+from .test_manifest import *
+from .test_single_instance import *
+from .test_zipwriter import *
+from .test_service import *
+from .test_scheduling import *
+from .test_writers import *
+from .test_watcher import *
+from .test_volumes import *
+from .test_paths import *
+from .test_archive import *
+from .test_cli import *
 
 __all__ = [
     'test_converter',
     'test_file_handler',
     'test_validator',
+    'test_prescan',
+    'test_images',
+    'test_ocr',
+    'test_metrics',
+    'test_manifest',
+    'test_single_instance',
+    'test_zipwriter',
+    'test_service',
+    'test_scheduling',
+    'test_writers',
+    'test_watcher',
+    'test_volumes',
+    'test_paths',
+    'test_archive',
+    'test_cli',
 ]
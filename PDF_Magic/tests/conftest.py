@@ -0,0 +1,13 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# conftest.py
+# Gemeinsame Einstellungen der Tests: Importpfad und eigenes Home-Verzeichnis
+
+import os
+import sys
+import tempfile
+
+# Laufdaten, OCR-Cache usw. landen sonst im echten ~/.pdf_magic
+os.environ["HOME"] = tempfile.mkdtemp(prefix="pdf_magic_tests_")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,95 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# pdf_samples.py
+# Erzeugt kleine PDF-Dateien mit genau festgelegtem Inhaltsstrom für die Tests
+
+import io
+from typing import Dict, Optional
+
+from PyPDF2 import PageObject, PdfWriter
+from PyPDF2.generic import (ArrayObject, DecodedStreamObject, DictionaryObject, FloatObject,
+                            IndirectObject, NameObject, NumberObject)
+
+
+def text_content(text: str) -> bytes:
+    """Inhaltsstrom, der eine Zeile Text in Helvetica zeichnet."""
+    escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return f"BT /F1 12 Tf 20 100 Td ({escaped}) Tj ET".encode('latin-1')
+
+
+def image_content(name: str) -> bytes:
+    """Inhaltsstrom, der ein XObject zeichnet."""
+    return f"q 50 0 0 50 20 20 cm {name} Do Q".encode('latin-1')
+
+
+class PdfBuilder:
+    """Baut eine PDF-Datei aus Seiten mit vorgegebenen Inhaltsströmen und Ressourcen"""
+
+    def __init__(self):
+        self.writer = PdfWriter()
+        self.font = self.writer._add_object(DictionaryObject({
+            NameObject("/Type"): NameObject("/Font"),
+            NameObject("/Subtype"): NameObject("/Type1"),
+            NameObject("/BaseFont"): NameObject("/Helvetica"),
+        }))
+
+    def stream(self, data: bytes, entries: Optional[dict] = None) -> IndirectObject:
+        stream = DecodedStreamObject()
+        stream.set_data(data)
+        for key, value in (entries or {}).items():
+            stream[NameObject(key)] = value
+        return self.writer._add_object(stream)
+
+    def image(self, value: int = 0, width: int = 4, height: int = 4) -> IndirectObject:
+        """Graustufenbild einer Farbe (value 0-255)."""
+        return self.stream(bytes([value]) * (width * height), {
+            "/Type": NameObject("/XObject"),
+            "/Subtype": NameObject("/Image"),
+            "/Width": NumberObject(width),
+            "/Height": NumberObject(height),
+            "/ColorSpace": NameObject("/DeviceGray"),
+            "/BitsPerComponent": NumberObject(8),
+        })
+
+    def form(self, content: bytes, xobjects: Optional[Dict[str, IndirectObject]] = None) -> IndirectObject:
+        """Form-XObject mit eigenem Inhaltsstrom und eigenen Ressourcen."""
+        return self.stream(content, {
+            "/Type": NameObject("/XObject"),
+            "/Subtype": NameObject("/Form"),
+            "/BBox": ArrayObject([FloatObject(0), FloatObject(0), FloatObject(200), FloatObject(200)]),
+            "/Resources": self.resources(xobjects),
+        })
+
+    def resources(self, xobjects: Optional[Dict[str, IndirectObject]] = None) -> IndirectObject:
+        """Ressourcen mit der Schrift /F1 und den angegebenen XObjects (Name ohne /)."""
+        resources = DictionaryObject({NameObject("/Font"): DictionaryObject({NameObject("/F1"): self.font})})
+        if xobjects:
+            resources[NameObject("/XObject")] = DictionaryObject(
+                {NameObject("/" + name): reference for name, reference in xobjects.items()})
+        return self.writer._add_object(resources)
+
+    def page(self, content: bytes, resources: Optional[IndirectObject] = None):
+        """Fügt eine Seite hinzu; mehrere Seiten dürfen dieselben Ressourcen nutzen."""
+        page = PageObject.create_blank_page(None, 200, 200)
+        page[NameObject("/Resources")] = resources if resources is not None else self.resources()
+        page[NameObject("/Contents")] = self.stream(content)
+        self.writer.add_page(page)
+
+    def to_bytes(self) -> bytes:
+        output = io.BytesIO()
+        self.writer.write(output)
+        return output.getvalue()
+
+    def save(self, path: str) -> str:
+        with open(path, 'wb') as pdf_file:
+            pdf_file.write(self.to_bytes())
+        return path
+
+
+def text_pdf(path: str, pages: int = 3, prefix: str = "Seite") -> str:
+    """PDF-Datei mit einer Textzeile je Seite."""
+    builder = PdfBuilder()
+    for page_num in range(1, pages + 1):
+        builder.page(text_content(f"{prefix} {page_num}"))
+    return builder.save(path)
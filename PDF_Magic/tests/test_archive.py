@@ -0,0 +1,55 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# test_archive.py
+# Tests der Konvertierung direkt in ein Archiv
+
+import io
+import zipfile
+
+import pytest
+
+from src.cli import main
+from .pdf_samples import PdfBuilder, image_content, text_content
+
+
+def image_pdf(path) -> str:
+    builder = PdfBuilder()
+    resources = builder.resources({"Im1": builder.image(0)})
+    builder.page(text_content("Mit Bild") + b"\n" + image_content("/Im1"), resources)
+    return builder.save(str(path))
+
+
+def media_in_archive(archive_path) -> list:
+    with zipfile.ZipFile(archive_path) as archive:
+        document = zipfile.ZipFile(io.BytesIO(archive.read("a.docx")))
+    return [name for name in document.namelist() if name.startswith("word/media/")]
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_archive_passes_images_through(tmp_path, jobs):
+    image_pdf(tmp_path / "a.pdf")
+    archive_path = tmp_path / "ergebnis.zip"
+
+    assert main(["convert", str(tmp_path / "a.pdf"), "--archive", str(archive_path), "-j", jobs]) == 0
+    assert media_in_archive(archive_path) == []
+
+    assert main(["convert", str(tmp_path / "a.pdf"), "--archive", str(archive_path), "-j", jobs,
+                 "--images"]) == 0
+    assert len(media_in_archive(archive_path)) == 1
+
+
+@pytest.mark.parametrize("options", [
+    ["--if-exists", "skip"],
+    ["--if-exists", "overwrite"],
+    ["--skip-identical"],
+    ["--volume-pages", "10"],
+    ["--volume-mb", "1"],
+])
+def test_archive_rejects_directory_options(tmp_path, capsys, options):
+    image_pdf(tmp_path / "a.pdf")
+    archive_path = tmp_path / "ergebnis.zip"
+
+    assert main(["convert", str(tmp_path / "a.pdf"), "--archive", str(archive_path)] + options) != 0
+    assert "--archive kann nicht mit" in capsys.readouterr().out
+    assert not archive_path.exists()
@@ -0,0 +1,189 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# test_cli.py
+# Tests aller Befehle der Kommandozeile
+
+import io
+import json
+import zipfile
+import threading
+import http.client
+
+import docx
+
+import src.cli
+import src.server
+from src.cli import main
+from src.core.framing import FRAME_OK, read_response, write_frame
+from src.core.watcher import FolderWatcher
+from .pdf_samples import text_pdf
+
+
+def events(output: str) -> list:
+    return [json.loads(line) for line in output.splitlines() if line.startswith("{")]
+
+
+def summary(output: str) -> dict:
+    return [event for event in events(output) if event["event"] == "summary"][-1]
+
+
+def document_text(path) -> str:
+    return "\n".join(paragraph.text for paragraph in docx.Document(str(path)).paragraphs)
+
+
+def binary_stdio(monkeypatch, stdin: bytes = b"") -> io.TextIOWrapper:
+    """Ersetzt stdin/stdout durch Puffer; stdout.buffer enthält danach die Ausgabe."""
+    stdout = io.TextIOWrapper(io.BytesIO())
+    monkeypatch.setattr("sys.stdin", io.TextIOWrapper(io.BytesIO(stdin)))
+    monkeypatch.setattr("sys.stdout", stdout)
+    return stdout
+
+
+def test_convert(tmp_path, capsys):
+    inputs = [text_pdf(tmp_path / f"{name}.pdf", prefix=name) for name in ("a", "b")]
+    out = tmp_path / "out"
+
+    assert main(["convert"] + [str(path) for path in inputs] + ["-o", str(out), "-j", "2",
+                                                                "-f", "docx,txt"]) == 0
+
+    assert summary(capsys.readouterr().out)["ok"] == 2
+    assert sorted(path.name for path in out.iterdir()) == ["a.docx", "a.txt", "b.docx", "b.txt"]
+    assert "b 1" in document_text(out / "b.docx")
+
+
+def test_convert_to_archive_on_stdout(tmp_path, monkeypatch):
+    text_pdf(tmp_path / "a.pdf")
+    stdout = binary_stdio(monkeypatch)
+
+    assert main(["convert", str(tmp_path / "a.pdf"), "--archive", "-"]) == 0
+
+    with zipfile.ZipFile(io.BytesIO(stdout.buffer.getvalue())) as archive:
+        assert archive.namelist() == ["a.docx", "index.jsonl"]
+
+
+def test_merge(tmp_path, capsys):
+    inputs = [text_pdf(tmp_path / f"{name}.pdf", prefix=name) for name in ("a", "b")]
+    output = tmp_path / "out" / "gesamt.docx"
+
+    assert main(["merge"] + [str(path) for path in inputs] + ["-o", str(output)]) == 0
+
+    assert summary(capsys.readouterr().out)["pages"] == 6
+    text = document_text(output)
+    assert text.index("a 3") < text.index("b 1")
+
+
+def test_batch(tmp_path, capsys):
+    text_pdf(tmp_path / "a.pdf")
+    manifest = tmp_path / "manifest.csv"
+    manifest.write_text(f"input,output\n{tmp_path / 'a.pdf'},\n{tmp_path / 'fehlt.pdf'},\n",
+                        encoding="utf-8")
+    out = tmp_path / "out"
+
+    assert main(["batch", str(manifest), "-o", str(out)]) != 0
+
+    assert summary(capsys.readouterr().out) == {"event": "summary", "total": 2, "ok": 1,
+                                                "failed": 1, "skipped": 0}
+    rows = [json.loads(line) for line in (out / "results.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert [row["status"] for row in rows] == ["ok", "failed"]
+    assert (out / "a.docx").exists()
+
+
+def test_sync(tmp_path, capsys):
+    source = tmp_path / "quelle"
+    (source / "unter").mkdir(parents=True)
+    text_pdf(source / "unter" / "a.pdf")
+    out = tmp_path / "spiegel"
+
+    assert main(["sync", str(source), "-o", str(out)]) == 0
+    assert summary(capsys.readouterr().out)["converted"] == 1
+    assert (out / "unter" / "a.docx").exists()
+
+    assert main(["sync", str(source), "-o", str(out)]) == 0
+    result = summary(capsys.readouterr().out)
+    assert result["converted"] == 0 and result["up_to_date"] == 1
+
+
+def test_pipe(tmp_path, monkeypatch):
+    data = text_pdf(tmp_path / "a.pdf").read_bytes()
+    stdout = binary_stdio(monkeypatch, data)
+
+    assert main(["pipe"]) == 0
+
+    assert docx.Document(io.BytesIO(stdout.buffer.getvalue())).paragraphs
+
+
+def test_pipe_framed(tmp_path, monkeypatch):
+    data = text_pdf(tmp_path / "a.pdf").read_bytes()
+    frames = io.BytesIO()
+    for payload in (data, b"kein PDF"):
+        write_frame(frames, payload)
+    stdout = binary_stdio(monkeypatch, frames.getvalue())
+
+    assert main(["pipe", "--framed"]) != 0
+
+    responses = io.BytesIO(stdout.buffer.getvalue())
+    first, second = read_response(responses), read_response(responses)
+    assert first[0] == FRAME_OK and first[1][:2] == b"PK"
+    assert second[0] != FRAME_OK
+    assert read_response(responses) is None
+
+
+class OneShotWatcher(FolderWatcher):
+    """Beendet die Überwachung nach der ersten verarbeiteten Datei."""
+
+    def __init__(self, *args, on_event, **kwargs):
+        def stop_after_first(event: str, **fields):
+            on_event(event, **fields)
+            if event in ("done", "error"):
+                self.stop()
+
+        super().__init__(*args, on_event=stop_after_first, **kwargs)
+        # Sicherheitsnetz, damit ein Fehler den Testlauf nicht blockiert
+        self.timer = threading.Timer(60, self.stop)
+        self.timer.daemon = True
+        self.timer.start()
+
+
+def test_watch(tmp_path, capsys, monkeypatch):
+    inbox = tmp_path / "eingang"
+    inbox.mkdir()
+    text_pdf(inbox / "a.pdf")
+    out = tmp_path / "out"
+    monkeypatch.setattr(src.cli, "FolderWatcher", OneShotWatcher)
+
+    assert main(["watch", str(inbox), "-o", str(out), "--stable-seconds", "0.1",
+                 "--poll-interval", "0.1", "--polling"]) == 0
+
+    done = [event for event in events(capsys.readouterr().out) if event["event"] == "done"]
+    assert len(done) == 1
+    assert (out / "a.docx").exists()
+    assert (inbox / "done" / "a.pdf").exists()
+
+
+def test_serve(tmp_path, monkeypatch):
+    data = text_pdf(tmp_path / "a.pdf").read_bytes()
+    create_server = src.server.create_server
+    responses = []
+
+    def create_test_server(service, **kwargs):
+        server = create_server(service, **kwargs)
+
+        def request():
+            try:
+                connection = http.client.HTTPConnection(*server.server_address, timeout=60)
+                connection.request("POST", "/convert", body=data)
+                response = connection.getresponse()
+                responses.append((response.status, response.read()))
+            finally:
+                server.shutdown()
+
+        threading.Thread(target=request, daemon=True).start()
+        return server
+
+    monkeypatch.setattr(src.server, "create_server", create_test_server)
+
+    assert main(["serve", "--port", "0", "-j", "1"]) == 0
+
+    status, body = responses[0]
+    assert status == 200 and body[:2] == b"PK"
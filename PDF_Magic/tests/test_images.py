@@ -0,0 +1,90 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# test_images.py
+# Tests der Bildextraktion und -deduplizierung
+
+import io
+import zipfile
+import threading
+
+import docx
+from PIL import Image
+
+from src.core.batch import convert_many
+from src.core.engine import convert_pdf_to_docx, extract_pages
+
+from .pdf_samples import PdfBuilder, image_content, text_content
+
+
+def shared_resources_pdf() -> bytes:
+    """Drei Seiten mit einem gemeinsamen /Resources-Verzeichnis (Im1, Im2)."""
+    builder = PdfBuilder()
+    resources = builder.resources({"Im1": builder.image(0), "Im2": builder.image(255)})
+    builder.page(image_content("/Im1"), resources)
+    builder.page(image_content("/Im2"), resources)
+    builder.page(text_content("Nur Text"), resources)
+    return builder.to_bytes()
+
+
+def test_only_drawn_images_are_collected():
+    extracted = extract_pages(shared_resources_pdf(), images=True)
+    first, second, third = extracted["images"]
+    assert len(first) == 1 and len(second) == 1 and first != second
+    assert third == []
+    assert len(extracted["image_data"]) == 2
+
+
+def test_shared_resources_in_docx():
+    output = io.BytesIO()
+    stats = convert_pdf_to_docx(shared_resources_pdf(), output, images=True)
+    assert stats["images"] == 2
+    document = docx.Document(io.BytesIO(output.getvalue()))
+    assert len(document.inline_shapes) == 2
+    media = [name for name in zipfile.ZipFile(output).namelist() if name.startswith("word/media/")]
+    assert len(media) == 2
+
+
+def test_shared_image_is_stored_once():
+    builder = PdfBuilder()
+    resources = builder.resources({"Logo": builder.image(128)})
+    for page_num in range(5):
+        builder.page(text_content(f"Brief {page_num}") + b"\n" + image_content("/Logo"), resources)
+    output = io.BytesIO()
+    convert_pdf_to_docx(builder.to_bytes(), output, images=True)
+    document = docx.Document(io.BytesIO(output.getvalue()))
+    assert len(document.inline_shapes) == 5
+    media = [name for name in zipfile.ZipFile(output).namelist() if name.startswith("word/media/")]
+    assert len(media) == 1
+
+
+def test_images_in_form_xobjects_and_drawing_order():
+    builder = PdfBuilder()
+    first, second = builder.image(10), builder.image(200)
+    form = builder.form(image_content("/Im1"), {"Im1": first})
+    resources = builder.resources({"Fm1": form, "Im2": second})
+    # Im2 wird vor dem Formular gezeichnet, obwohl es in den Ressourcen danach steht
+    builder.page(image_content("/Im2") + b"\n" + image_content("/Fm1"), resources)
+    extracted = extract_pages(builder.to_bytes(), images=True)
+    keys = extracted["images"][0]
+    values = [Image.open(io.BytesIO(extracted["image_data"][key]["data"])).getpixel((0, 0)) for key in keys]
+    assert values == [200, 10]
+
+
+def test_pool_conversion_after_in_process_conversion(tmp_path):
+    convert_pdf_to_docx(shared_resources_pdf(), io.BytesIO(), images=True)
+    # Andere Bilder als oben, damit die Worker sie nicht aus dem geerbten Cache nehmen
+    for index in range(2):
+        builder = PdfBuilder()
+        builder.page(image_content("/Im1"), builder.resources({"Im1": builder.image(100 + index)}))
+        builder.save(tmp_path / f"{index}.pdf")
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    results = []
+    thread = threading.Thread(target=lambda: results.extend(convert_many(
+        [str(tmp_path / "0.pdf"), str(tmp_path / "1.pdf")], str(output_dir), jobs=2, images=True)),
+        daemon=True)
+    thread.start()
+    thread.join(timeout=60)
+    assert not thread.is_alive()
+    assert [result.status for result in results] == ["ok", "ok"]
@@ -0,0 +1,91 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# test_manifest.py
+# Tests der Manifest-Aufträge und der Fortsetzung aus dem Ergebnisprotokoll
+
+import os
+import json
+
+from src.core.manifest import iter_manifest_tasks, load_completed_rows
+from src.core.paths import OutputPathAllocator
+
+
+def write_results(path, statuses):
+    with open(path, 'w', encoding='utf-8') as results_file:
+        for row, status in statuses:
+            results_file.write(json.dumps({"row": row, "status": status}) + "\n")
+
+
+def write_manifest(path, rows):
+    with open(path, 'w', encoding='utf-8') as manifest_file:
+        for row in rows:
+            manifest_file.write(json.dumps(row) + "\n")
+
+
+def test_failed_rows_do_not_stop_completed_through(tmp_path):
+    results = tmp_path / "results.jsonl"
+    statuses = [(row, "failed" if row % 100 == 0 else "ok") for row in range(1, 1001)]
+    write_results(results, list(reversed(statuses)))
+    completed_through, completed_after, failed = load_completed_rows(str(results), retry_failed=True)
+    assert completed_through == 1000
+    assert completed_after == set()
+    assert failed == set(range(100, 1001, 100))
+
+
+def test_latest_result_of_a_row_counts(tmp_path):
+    results = tmp_path / "results.jsonl"
+    write_results(results, [(1, "failed"), (2, "failed"), (1, "ok"), (4, "ok")])
+    assert load_completed_rows(str(results), retry_failed=True) == (2, {4}, {2})
+    assert load_completed_rows(str(results)) == (2, {4}, set())
+
+
+def test_resume_converts_only_open_and_failed_rows(tmp_path):
+    manifest = tmp_path / "manifest.jsonl"
+    write_manifest(manifest, [{"input": f"{index}.pdf"} for index in range(1, 6)])
+    results = tmp_path / "results.jsonl"
+    write_results(results, [(1, "ok"), (2, "failed"), (4, "ok")])
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    completed = load_completed_rows(str(results), retry_failed=True)
+    tasks = iter_manifest_tasks(str(manifest), str(output_dir), OutputPathAllocator(str(output_dir)),
+                                completed=completed)
+    assert [row for row, _, _ in tasks] == [2, 3, 5]
+
+
+def test_duplicate_explicit_outputs_are_claimed(tmp_path):
+    target = tmp_path / "ziel" / "bericht.docx"
+    manifest = tmp_path / "manifest.jsonl"
+    write_manifest(manifest, [{"input": "a.pdf", "output": str(target)},
+                              {"input": "b.pdf", "output": str(target)},
+                              {"input": "c.pdf", "output": str(target), "if_exists": "skip"},
+                              {"input": "d.pdf", "output": str(target), "if_exists": "overwrite"}])
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    tasks = list(iter_manifest_tasks(str(manifest), str(output_dir), OutputPathAllocator(str(output_dir))))
+    outputs = [output for _, _, output in tasks]
+    assert outputs == [str(target), str(target.with_name("bericht_1.docx")), None, str(target)]
+    assert sorted(os.listdir(target.parent)) == ["bericht.docx", "bericht_1.docx"]
+
+
+def test_explicit_outputs_share_one_allocator_per_directory(tmp_path, monkeypatch):
+    target_dir = tmp_path / "ziel"
+    target_dir.mkdir()
+    (target_dir / "x.docx").write_bytes(b"vorhanden")
+    manifest = tmp_path / "manifest.jsonl"
+    write_manifest(manifest, [{"input": f"{index}.pdf", "output": str(target_dir / "x.docx")}
+                              for index in range(50)])
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    allocator = OutputPathAllocator(str(output_dir))
+    scans = []
+    original_init = OutputPathAllocator.__init__
+
+    def counting_init(self, directory):
+        scans.append(directory)
+        original_init(self, directory)
+    monkeypatch.setattr(OutputPathAllocator, "__init__", counting_init)
+    outputs = [output for _, _, output in iter_manifest_tasks(str(manifest), str(output_dir), allocator)]
+    assert scans == [str(target_dir)]
+    assert len(set(outputs)) == 50
+    assert str(target_dir / "x.docx") not in outputs
@@ -0,0 +1,69 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# test_metrics.py
+# Tests des Zeitmodells und der Verlaufsdatei
+
+import json
+import random
+
+import numpy as np
+
+from src.core.metrics import ConversionTimeModel, RunHistory, create_run_record, read_tail_lines
+
+
+def sample_records(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    return [create_run_record(rng.randint(10_000, 10_000_000), rng.randint(1, 300), rng.randint(0, 500_000),
+                              rng.choice(["Word", "LaTeX", "", "Scanner"]), rng.uniform(0.05, 5.0))
+            for _ in range(count)]
+
+
+def direct_fit(model: ConversionTimeModel, records):
+    """Referenz: Normalgleichungen direkt aus allen Messwerten des Fensters."""
+    x = np.array([model.features(r["size"], r["pages"], r["text_chars"], r["producer"]) for r in records])
+    y = np.array([r["duration"] for r in records])
+    ridge = 1e-3 * np.eye(x.shape[1])
+    ridge[0, 0] = 0.0
+    return np.linalg.solve(x.T @ x + ridge, x.T @ y)
+
+
+def test_running_sums_match_direct_fit():
+    model = ConversionTimeModel(max_records=200)
+    records = sample_records(1000)
+    for record in records:
+        model.observe(record)
+    model.fit()
+    assert len(model.records) == 200
+    assert model.producers == ["LaTeX", "Scanner", "Word"]
+    np.testing.assert_allclose(model.coefficients, direct_fit(model, records[-200:]), rtol=1e-6, atol=1e-9)
+
+
+def test_invalid_durations_are_ignored():
+    model = ConversionTimeModel()
+    for record in sample_records(5):
+        record["duration"] = 0.0
+        model.observe(record)
+    assert len(model.records) == 0
+    assert not model.is_fitted
+
+
+def test_history_loads_only_the_tail(tmp_path):
+    path = tmp_path / "history.jsonl"
+    records = sample_records(300)
+    path.write_text("".join(json.dumps(record) + "\n" for record in records))
+    history = RunHistory(str(path), max_records=50)
+    loaded = history.load()
+    assert loaded == records[-50:]
+    assert [json.loads(line) for line in read_tail_lines(str(path), 3, block_size=64)] == records[-3:]
+
+
+def test_history_is_compacted(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.core.metrics.COMPACT_CHECK_INTERVAL", 10)
+    path = tmp_path / "history.jsonl"
+    history = RunHistory(str(path), max_records=20, max_bytes=4096)
+    records = sample_records(500)
+    for record in records:
+        history.append(record)
+    assert path.stat().st_size <= 4096 + 10 * 300
+    assert history.load()[-1] == records[-1]
@@ -0,0 +1,89 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# test_ocr.py
+# Tests der Texterkennung mit einem tesseract-Ersatz
+
+import io
+import stat
+import threading
+
+import pytest
+from PyPDF2 import PdfReader
+
+from src.core.batch import convert_many
+from src.core.engine import extract_pages
+from src.core.ocr import largest_image
+
+from .pdf_samples import PdfBuilder, image_content, text_content
+
+FAKE_TESSERACT = """#!/bin/sh
+echo call >> "{log}"
+echo "Erkannt"
+printf '\\f'
+"""
+
+
+@pytest.fixture
+def fake_tesseract(tmp_path, monkeypatch):
+    """Legt ein tesseract-Skript in den PATH, das jeden Aufruf protokolliert."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    log = tmp_path / "calls.log"
+    script = bin_dir / "tesseract"
+    script.write_text(FAKE_TESSERACT.format(log=log))
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    # Ohne pdftoppm wird das eingebettete Bild der Seite erkannt
+    monkeypatch.setenv("PATH", str(bin_dir))
+    monkeypatch.setattr("src.core.ocr.DEFAULT_OCR_CACHE_DIR", str(tmp_path / "cache"))
+    return lambda: len(log.read_text().splitlines()) if log.exists() else 0
+
+
+def scan_pdf() -> bytes:
+    """Vier Bildseiten mit gemeinsamen Ressourcen, davon zwei mit demselben Bild, und eine Textseite."""
+    builder = PdfBuilder()
+    resources = builder.resources({"Im1": builder.image(0, 40, 40), "Im2": builder.image(255, 20, 20),
+                                   "Im3": builder.image(90, 30, 30)})
+    for name in ("/Im2", "/Im3", "/Im2"):
+        builder.page(image_content(name), resources)
+    builder.page(text_content("Echter Text"), resources)
+    builder.page(b"", resources)
+    return builder.to_bytes()
+
+
+def test_largest_image_ignores_undrawn_resources():
+    page = PdfReader(io.BytesIO(scan_pdf())).pages[0]
+    # Im1 ist größer, wird auf dieser Seite aber nicht gezeichnet
+    assert int(largest_image(page)["/Width"]) == 20
+
+
+def test_ocr_only_for_image_pages_and_cached(fake_tesseract):
+    extracted = extract_pages(scan_pdf(), ocr=True)
+    assert extracted["texts"][:3] == ["Erkannt"] * 3
+    assert extracted["texts"][3] == "Echter Text"
+    assert extracted["texts"][4] == ""
+    assert extracted["ocr_pages"] == 3
+    # Gleiche Seitenbilder im Dokument nur einmal, leere Seiten gar nicht
+    assert fake_tesseract() == 2
+    extract_pages(scan_pdf(), ocr=True)
+    assert fake_tesseract() == 2
+
+
+def test_pool_conversion_after_in_process_conversion(fake_tesseract, tmp_path):
+    extract_pages(scan_pdf(), ocr=True)
+    for index in range(2):
+        builder = PdfBuilder()
+        builder.page(image_content("/Im1"), builder.resources({"Im1": builder.image(150 + index, 10, 10)}))
+        builder.save(tmp_path / f"{index}.pdf")
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    results = []
+    thread = threading.Thread(target=lambda: results.extend(convert_many(
+        [str(tmp_path / "0.pdf"), str(tmp_path / "1.pdf")], str(output_dir), jobs=2, ocr=True)),
+        daemon=True)
+    thread.start()
+    thread.join(timeout=60)
+    assert not thread.is_alive()
+    assert [result.status for result in results] == ["ok", "ok"]
+    # Zwei Bilder aus scan_pdf im Prozess, je eines in den Workern
+    assert fake_tesseract() == 4
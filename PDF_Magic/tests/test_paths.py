@@ -0,0 +1,81 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# test_paths.py
+# Tests der Vergabe von Ausgabepfaden
+
+import os
+
+import pytest
+
+import src.cli
+from src.cli import main
+from src.core.batch import convert_many
+from src.core.paths import OutputPathAllocator, resolve_output_targets
+from .pdf_samples import text_pdf
+
+
+def names(directory) -> list:
+    return sorted(os.listdir(directory))
+
+
+@pytest.mark.parametrize("existing", ["a.docx", "a.txt"])
+def test_formats_share_one_stem(tmp_path, existing):
+    (tmp_path / existing).write_bytes(b"alt")
+    allocator = OutputPathAllocator(str(tmp_path))
+
+    targets = resolve_output_targets("in/a.pdf", str(tmp_path), "rename", allocator, ["docx", "txt"])
+
+    assert targets == {"docx": str(tmp_path / "a_1.docx"), "txt": str(tmp_path / "a_1.txt")}
+
+
+def test_group_claim_rolls_back(tmp_path):
+    allocator = OutputPathAllocator(str(tmp_path))
+    # Nach dem Einlesen von außen angelegt
+    (tmp_path / "a.txt").write_bytes(b"fremd")
+
+    paths = allocator.allocate_group("a", [".docx", ".txt"])
+
+    assert paths == {".docx": str(tmp_path / "a_1.docx"), ".txt": str(tmp_path / "a_1.txt")}
+    assert names(tmp_path) == ["a.txt", "a_1.docx", "a_1.txt"]
+
+
+def test_multi_part_extension(tmp_path):
+    (tmp_path / "a.volumes.json").write_bytes(b"{}")
+    allocator = OutputPathAllocator(str(tmp_path))
+
+    assert allocator.allocate("a.volumes.json", ".volumes.json") == str(tmp_path / "a_1.volumes.json")
+
+
+def test_failed_conversion_leaves_no_placeholder(tmp_path):
+    (tmp_path / "kaputt.pdf").write_bytes(b"%PDF-1.4 kein PDF")
+    out = tmp_path / "out"
+
+    assert main(["convert", str(tmp_path / "kaputt.pdf"), "-o", str(out), "-f", "docx,txt"]) != 0
+    assert names(out) == []
+
+
+def test_interrupted_conversion_leaves_no_placeholder(tmp_path, monkeypatch):
+    text_pdf(str(tmp_path / "a.pdf"))
+    out = tmp_path / "out"
+
+    def interrupt(*args, **kwargs):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(src.cli, "convert_job", interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        main(["convert", str(tmp_path / "a.pdf"), "-o", str(out)])
+    assert names(out) == []
+
+
+def test_closed_batch_leaves_no_placeholder(tmp_path):
+    inputs = [text_pdf(str(tmp_path / f"d{number}.pdf")) for number in range(8)]
+    out = tmp_path / "out"
+
+    results = convert_many(inputs, str(out), jobs=2)
+    first = next(results)
+    results.close()
+
+    written = names(out)
+    assert os.path.basename(first.output_path) in written
+    assert all(os.path.getsize(out / name) > 0 for name in written)
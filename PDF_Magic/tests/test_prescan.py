@@ -0,0 +1,108 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# test_prescan.py
+# Tests der Vorprüfung der Seiten (Text, Bild, leer)
+
+import io
+
+import pytest
+from PyPDF2 import PdfReader
+
+from src.core.prescan import (PAGE_EMPTY, PAGE_IMAGE, PAGE_TEXT, PrescanError, classify_page,
+                              iter_tokens, prescan_pdf)
+
+from .pdf_samples import PdfBuilder, image_content, text_content
+
+
+def build_page(content: bytes, xobjects=None):
+    builder = PdfBuilder()
+    builder.page(content, builder.resources(xobjects(builder) if xobjects else None))
+    return PdfReader(io.BytesIO(builder.to_bytes())).pages[0]
+
+
+def classify(content: bytes, xobjects=None):
+    """Art und extrahierter Text einer Seite mit dem angegebenen Inhaltsstrom."""
+    page = build_page(content, xobjects)
+    return classify_page(page), page.extract_text()
+
+
+@pytest.mark.parametrize("content", [
+    b"BT /F1 12 Tf 20 100 Td (Hallo) Tj ET",
+    b"BT /F1 12 Tf 20 100 Td (a(b(c)d)e) Tj ET",
+    b"BT /F1 12 Tf 20 100 Td (a(b(c(d(e)f)g)h)i) Tj ET",
+    b"BT /F1 12 Tf 20 100 Td (a\\)b\\(c) Tj ET",
+    b"BT /F1 12 Tf 20 100 Td [(Ha) -20 (llo)] TJ ET",
+    b"BT /F1 12 Tf 20 100 Td <48616C6C6F> Tj ET",
+    b"BT /F1 12 Tf 20 100 Td 14 TL (Hallo) ' ET",
+])
+def test_text_pages(content):
+    kind, text = classify(content)
+    assert text.strip()
+    assert kind == PAGE_TEXT
+
+
+@pytest.mark.parametrize("content", [
+    b"",
+    b"0 0 m 100 100 l S",
+    b"BT /F1 12 Tf 20 100 Td () Tj <> Tj ET",
+    b"% (Kommentar) Tj\n0 0 m 10 10 l S",
+])
+def test_empty_pages(content):
+    kind, text = classify(content)
+    assert not text.strip()
+    assert kind == PAGE_EMPTY
+
+
+def test_unterminated_string_counts_as_text():
+    # Im Zweifel muss die vollständige Extraktion die Seite prüfen
+    assert classify_page(build_page(b"BT /F1 12 Tf 20 100 Td (a(b) Tj ET")) == PAGE_TEXT
+
+
+def test_inline_image_data_is_skipped():
+    # Die Binärdaten enthalten Klammern und Operatoren, die nicht als Text zählen dürfen
+    content = b"q 50 0 0 50 0 0 cm BI /W 4 /H 1 /CS /G /BPC 8 ID (Tj)\nEI Q"
+    assert classify(content)[0] == PAGE_IMAGE
+    tokens = list(iter_tokens(content))
+    assert b"ID" in tokens and b"Tj" not in tokens and b"Q" in tokens
+
+
+def test_images_only_count_when_drawn():
+    assert classify(image_content("/Im1"), lambda b: {"Im1": b.image()})[0] == PAGE_IMAGE
+    assert classify(b"0 0 m 10 10 l S", lambda b: {"Im1": b.image()})[0] == PAGE_EMPTY
+
+
+def test_form_xobjects():
+    text_form = lambda b: {"Fm1": b.form(text_content("Im Formular"))}
+    kind, text = classify(image_content("/Fm1"), text_form)
+    assert kind == PAGE_TEXT and "Im Formular" in text
+
+    image_form = lambda b: {"Fm1": b.form(image_content("/Im1"), {"Im1": b.image()})}
+    assert classify(image_content("/Fm1"), image_form)[0] == PAGE_IMAGE
+    # Nicht gezeichnete Formulare zählen nicht
+    assert classify(b"0 0 m 10 10 l S", text_form)[0] == PAGE_EMPTY
+
+
+def test_deeply_nested_forms_count_as_text():
+    def nested(builder):
+        form = builder.form(b"0 0 m 10 10 l S")
+        for _ in range(5):
+            form = builder.form(image_content("/Fm1"), {"Fm1": form})
+        return {"Fm1": form}
+    assert classify(image_content("/Fm1"), nested)[0] == PAGE_TEXT
+
+
+def test_iter_tokens_rejects_unterminated_string():
+    with pytest.raises(PrescanError):
+        list(iter_tokens(b"(abc Tj"))
+
+
+def test_prescan_pdf_counts_kinds(tmp_path):
+    builder = PdfBuilder()
+    resources = builder.resources({"Im1": builder.image()})
+    builder.page(text_content("Text"), resources)
+    builder.page(image_content("/Im1"), resources)
+    builder.page(b"", resources)
+    result = prescan_pdf(builder.save(str(tmp_path / "gemischt.pdf")))
+    assert result["kinds"] == [PAGE_TEXT, PAGE_IMAGE, PAGE_EMPTY]
+    assert result["page_kinds"] == {PAGE_TEXT: 1, PAGE_IMAGE: 1, PAGE_EMPTY: 1}
@@ -0,0 +1,56 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# test_scheduling.py
+# Tests der fairen Verteilung auf die Worker
+
+import pytest
+
+from src.cli import build_parser
+from src.core.scheduling import FairScheduler
+
+
+class Job:
+    def __init__(self, client_id: str, priority: str = "normal"):
+        self.client_id = client_id
+        self.priority = priority
+        self.submitted_at = 0.0
+
+
+def test_idle_clients_are_forgotten():
+    scheduler = FairScheduler()
+    for index in range(1000):
+        scheduler.push(Job(f"client-{index}"))
+        job = scheduler.pop(0.0)
+        scheduler.finished(job)
+    assert scheduler.clients == {}
+    waiting = Job("wartend")
+    scheduler.push(waiting)
+    assert scheduler.remove(waiting)
+    assert scheduler.clients == {}
+
+
+def test_returning_client_starts_at_virtual_clock():
+    scheduler = FairScheduler()
+    for _ in range(10):
+        scheduler.push(Job("gross"))
+    for _ in range(5):
+        scheduler.finished(scheduler.pop(0.0))
+    for _ in range(3):
+        scheduler.push(Job("klein"))
+    # Ohne Untergrenze hätte "klein" fünf Aufträge Vorsprung und liefe dreimal nacheinander
+    order = [scheduler.pop(0.0).client_id for _ in range(4)]
+    assert order == ["klein", "gross", "klein", "gross"]
+
+
+@pytest.mark.parametrize("value", ["a=0", "a=-1", "a=x", "a", "=2", "a=nan"])
+def test_invalid_client_weight_is_rejected(value, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        build_parser().parse_args(["serve", "--client-weight", value])
+    assert exit_info.value.code == 2
+    assert "Ungültiges Gewicht" in capsys.readouterr().err
+
+
+def test_client_weight():
+    args = build_parser().parse_args(["serve", "--client-weight", "a=2", "--client-weight", "b=0.5"])
+    assert dict(args.client_weight) == {"a": 2.0, "b": 0.5}
@@ -0,0 +1,106 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# test_service.py
+# Tests des Konvertierungsdienstes (Warteschlange, Prozess-Pool, HTTP-Server)
+
+import os
+import json
+import signal
+import threading
+import http.client
+import multiprocessing
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from src.core.engine import convert_job
+from src.core.service import ConversionService, JobTimeout
+from src.server import create_server
+from .pdf_samples import text_pdf
+
+
+@pytest.fixture
+def service():
+    service = ConversionService(jobs=1)
+    yield service
+    service.shutdown()
+
+
+@pytest.fixture
+def server(service):
+    server = create_server(service, port=0, request_timeout=60)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def post(server, body: bytes, headers: dict):
+    connection = http.client.HTTPConnection(*server.server_address, timeout=60)
+    connection.putrequest("POST", "/convert")
+    for name, value in headers.items():
+        connection.putheader(name, value)
+    connection.endheaders()
+    connection.send(body)
+    response = connection.getresponse()
+    return response.status, response.read()
+
+
+def test_convert_job(service, tmp_path):
+    pdf_path = text_pdf(tmp_path / "a.pdf")
+    job = service.submit(str(pdf_path), str(tmp_path / "a.docx"))
+    assert job.future.result(timeout=60)["pages"] == 3
+    assert service.stats()["running"] == 0
+
+
+@pytest.mark.skipif(not hasattr(signal, "setitimer"), reason="Zeitlimit benötigt SIGALRM")
+def test_time_limit_stops_conversion_in_worker(tmp_path):
+    pdf_path = text_pdf(tmp_path / "gross.pdf", pages=400)
+    service = ConversionService(jobs=1, time_limit=0.01)
+    try:
+        job = service.submit(str(pdf_path), str(tmp_path / "gross.docx"))
+        with pytest.raises(JobTimeout):
+            job.future.result(timeout=60)
+        assert service.stats()["running"] == 0
+        assert not any(name.startswith("temp_") for name in os.listdir(tmp_path))
+    finally:
+        service.shutdown()
+
+
+def crash_on_request(pdf_path, docx_path):
+    """Beendet den Worker-Prozess wie ein Absturz, z.B. durch eine defekte Bibliothek."""
+    if pdf_path.endswith("crash.pdf"):
+        os._exit(1)
+    return convert_job(pdf_path, docx_path)
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork",
+                    reason="Der Ersatz von convert_job gelangt nur per fork in die Worker")
+def test_broken_pool_is_replaced(service, tmp_path, monkeypatch):
+    monkeypatch.setattr("src.core.service.convert_job", crash_on_request)
+    pdf_path = text_pdf(tmp_path / "a.pdf")
+    crash_path = text_pdf(tmp_path / "crash.pdf")
+    broken = service.executor
+    with pytest.raises(BrokenProcessPool):
+        service.submit(str(crash_path), str(tmp_path / "crash.docx")).future.result(timeout=60)
+    job = service.submit(str(pdf_path), str(tmp_path / "b.docx"))
+    assert job.future.result(timeout=60)["pages"] == 3
+    assert service.executor is not broken
+    assert service.stats()["running"] == 0
+    assert service.stats()["failed"] == 1
+
+
+@pytest.mark.parametrize("length", ["abc", "-5"])
+def test_invalid_content_length(server, length):
+    status, body = post(server, b"", {"Content-Length": length})
+    assert status == 400
+    assert "Content-Length" in json.loads(body)["error"]
+
+
+def test_upload(server, tmp_path):
+    data = text_pdf(tmp_path / "a.pdf").read_bytes()
+    status, body = post(server, data, {"Content-Length": str(len(data))})
+    assert status == 200
+    assert body[:2] == b"PK"
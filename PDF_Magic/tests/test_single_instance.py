@@ -0,0 +1,44 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# test_single_instance.py
+# Tests des Einzelinstanz-Servers
+
+import os
+import socket
+import tempfile
+
+import pytest
+from PyQt5.QtCore import QCoreApplication
+
+from src.single_instance import SingleInstanceServer
+
+
+@pytest.fixture
+def server_name():
+    app = QCoreApplication.instance() or QCoreApplication([])
+    yield f"pdf_magic_test_{os.getpid()}"
+    del app
+
+
+def test_second_server_keeps_running_instance(server_name):
+    first = SingleInstanceServer(server_name)
+    assert first.start()
+    second = SingleInstanceServer(server_name)
+    assert not second.start()
+    # Der Socket der ersten Instanz besteht weiter
+    assert second.is_server_alive()
+    first.server.close()
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Verwaiste Sockets gibt es nur unter Unix")
+def test_stale_socket_is_replaced(server_name):
+    path = os.path.join(tempfile.gettempdir(), server_name)
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()
+    server = SingleInstanceServer(server_name)
+    try:
+        assert server.start()
+    finally:
+        server.server.close()
@@ -0,0 +1,65 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# test_volumes.py
+# Tests der Aufteilung großer PDFs in DOCX-Bände
+
+import json
+
+import docx
+
+from src.cli import main
+from .pdf_samples import text_pdf
+
+
+def volume_texts(path) -> str:
+    return "\n".join(paragraph.text for paragraph in docx.Document(str(path)).paragraphs)
+
+
+def test_volumes_do_not_overwrite_other_outputs(tmp_path):
+    text_pdf(str(tmp_path / "b.pdf"), pages=4, prefix="Groß")
+    text_pdf(str(tmp_path / "b_001.pdf"), pages=1, prefix="Klein")
+    out = tmp_path / "out"
+
+    assert main(["convert", str(tmp_path / "b_001.pdf"), "-o", str(out)]) == 0
+    assert main(["convert", str(tmp_path / "b.pdf"), "-o", str(out), "--volume-pages", "2"]) == 0
+
+    assert "Klein 1" in volume_texts(out / "b_001.docx")
+    index = json.loads((out / "b.volumes.json").read_text(encoding="utf-8"))
+    files = [volume["file"] for volume in index["volumes"]]
+    assert files == ["b_001_1.docx", "b_002.docx"]
+    assert "Groß 1" in volume_texts(out / files[0])
+    assert not (out / "b.docx").exists()
+
+
+def test_volumes_skip_existing_index(tmp_path, capsys):
+    text_pdf(str(tmp_path / "b.pdf"), pages=2)
+    out = tmp_path / "out"
+    arguments = ["convert", str(tmp_path / "b.pdf"), "-o", str(out), "--volume-pages", "1"]
+
+    assert main(arguments) == 0
+    capsys.readouterr()
+    assert main(arguments + ["--if-exists", "skip"]) == 0
+    assert '"event": "skipped"' in capsys.readouterr().out
+    assert sorted(path.name for path in out.iterdir()) == ["b.volumes.json", "b_001.docx", "b_002.docx"]
+
+
+def test_volumes_overwrite_keeps_names(tmp_path):
+    text_pdf(str(tmp_path / "b.pdf"), pages=2)
+    out = tmp_path / "out"
+    arguments = ["convert", str(tmp_path / "b.pdf"), "-o", str(out), "--volume-pages", "1"]
+
+    assert main(arguments) == 0
+    assert main(arguments + ["--if-exists", "overwrite"]) == 0
+    assert sorted(path.name for path in out.iterdir()) == ["b.volumes.json", "b_001.docx", "b_002.docx"]
+
+
+def test_volume_index_is_renamed(tmp_path):
+    text_pdf(str(tmp_path / "b.pdf"), pages=2)
+    out = tmp_path / "out"
+    arguments = ["convert", str(tmp_path / "b.pdf"), "-o", str(out), "--volume-pages", "1"]
+
+    assert main(arguments) == 0
+    assert main(arguments) == 0
+    index = json.loads((out / "b_1.volumes.json").read_text(encoding="utf-8"))
+    assert [volume["file"] for volume in index["volumes"]] == ["b_1_001.docx", "b_1_002.docx"]
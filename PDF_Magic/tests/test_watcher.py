@@ -0,0 +1,88 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# test_watcher.py
+# Tests des überwachten Eingangsordners
+
+import os
+import time
+import threading
+import multiprocessing
+
+import pytest
+
+from src.core.engine import convert_job
+from src.core.watcher import FolderWatcher
+from .pdf_samples import text_pdf
+
+
+class WatcherThread:
+    """Lässt einen FolderWatcher im Hintergrund laufen und sammelt seine Ereignisse."""
+
+    def __init__(self, inbox, output_dir):
+        self.events = []
+        self.watcher = FolderWatcher([str(inbox)], str(output_dir), jobs=2, stable_seconds=0,
+                                     poll_interval=0.05, force_polling=True,
+                                     on_event=lambda event, **fields: self.events.append((event, fields)))
+        self.thread = threading.Thread(target=self.watcher.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.watcher.stop()
+        self.thread.join(timeout=60)
+        assert not self.thread.is_alive()
+
+    def wait_for(self, condition, timeout: float = 60):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            assert time.monotonic() < deadline, self.events
+            time.sleep(0.05)
+
+    def count(self, event: str, name: str) -> int:
+        return sum(1 for kind, fields in self.events
+                   if kind == event and os.path.basename(fields["input"]) == name)
+
+
+def test_file_that_cannot_be_moved_is_not_reconverted(tmp_path, monkeypatch):
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    original_replace = os.replace
+
+    def replace(source, target):
+        if str(source).startswith(str(inbox)):
+            raise PermissionError("Zugriff verweigert")
+        return original_replace(source, target)
+    monkeypatch.setattr(os, "replace", replace)
+    text_pdf(inbox / "a.pdf")
+    with WatcherThread(inbox, tmp_path / "out") as watcher:
+        watcher.wait_for(lambda: watcher.count("done", "a.pdf") == 1)
+        time.sleep(0.5)
+        assert watcher.count("queued", "a.pdf") == 1
+        assert watcher.count("error", "a.pdf") == 1
+        # Eine geänderte Datei gilt als neue Eingabe
+        text_pdf(inbox / "a.pdf", pages=2)
+        watcher.wait_for(lambda: watcher.count("done", "a.pdf") == 2)
+
+
+def crash_on_request(pdf_path, docx_path):
+    if pdf_path.endswith("crash.pdf"):
+        os._exit(1)
+    return convert_job(pdf_path, docx_path)
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork",
+                    reason="Der Ersatz von convert_job gelangt nur per fork in die Worker")
+def test_crashed_worker_does_not_stop_watcher(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.core.watcher.convert_job", crash_on_request)
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    text_pdf(inbox / "crash.pdf")
+    with WatcherThread(inbox, tmp_path / "out") as watcher:
+        watcher.wait_for(lambda: watcher.count("error", "crash.pdf") == 1)
+        text_pdf(inbox / "b.pdf")
+        watcher.wait_for(lambda: watcher.count("done", "b.pdf") == 1)
+    assert os.listdir(inbox / "failed") == ["crash.pdf"]
+    assert os.listdir(inbox / "done") == ["b.pdf"]
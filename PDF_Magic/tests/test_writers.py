@@ -0,0 +1,68 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# test_writers.py
+# Tests der Ausgabeformate
+
+import io
+import os
+from datetime import datetime
+
+import docx
+import pytest
+
+from src.core.engine import convert_job
+from src.core.writers import WRITERS, OutputWriter, get_writer, register_writer
+from .pdf_samples import text_pdf
+
+EXTRACTED = {"texts": ["Erste Seite", "", "Dritte <Seite>"], "pages": 3}
+
+
+class IncompleteWriter(OutputWriter):
+    extension = ".x"
+
+
+def test_incomplete_writer_fails_early():
+    with pytest.raises(TypeError):
+        IncompleteWriter()
+    with pytest.raises(TypeError, match="write_stream"):
+        register_writer("x", IncompleteWriter)
+    assert "x" not in WRITERS
+
+
+@pytest.mark.parametrize("output_format, expected", [
+    ("txt", b"Erste Seite\f\fDritte <Seite>"),
+    ("md", b"## Seite 1\n\nErste Seite\n\n## Seite 3\n\nDritte <Seite>\n\n"),
+])
+def test_text_formats(output_format, expected):
+    output = io.BytesIO()
+    get_writer(output_format).save(EXTRACTED, output)
+    assert output.getvalue() == expected
+
+
+def test_html_escapes_text():
+    output = io.BytesIO()
+    get_writer("html").save(EXTRACTED, output)
+    assert b"Dritte &lt;Seite&gt;" in output.getvalue()
+
+
+def docx_created(pdf_path, target):
+    convert_job(str(pdf_path), str(target))
+    return docx.Document(str(target)).core_properties.created.replace(tzinfo=None)
+
+
+def test_created_date_does_not_depend_on_file_mtime(tmp_path, monkeypatch):
+    monkeypatch.delenv("SOURCE_DATE_EPOCH", raising=False)
+    pdf_path = text_pdf(tmp_path / "a.pdf")
+    first = (tmp_path / "a.docx")
+    convert_job(str(pdf_path), str(first))
+    os.utime(pdf_path, (1_700_000_000, 1_700_000_000))
+    second = tmp_path / "b.docx"
+    convert_job(str(pdf_path), str(second))
+    assert first.read_bytes() == second.read_bytes()
+
+
+def test_created_date_from_source_date_epoch(tmp_path, monkeypatch):
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1700000000")
+    pdf_path = text_pdf(tmp_path / "a.pdf")
+    assert docx_created(pdf_path, tmp_path / "a.docx") == datetime(2023, 11, 14, 22, 13, 20)
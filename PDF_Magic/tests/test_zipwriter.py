@@ -0,0 +1,99 @@
+# Autor: Leon Gajtner
+# Datum: 07.11.2024
+# Version: 2.1
+# test_zipwriter.py
+# Tests des ZIP-Writers und seines Thread-Pools
+
+import io
+import zlib
+import zipfile
+import threading
+
+import docx
+
+from src.core.batch import convert_many
+from src.core.engine import convert_job, convert_pdf_to_docx
+from src.core import zipwriter
+from src.core.executors import SharedThreadPool
+from src.core.writers import docx_entries
+from src.core.zipwriter import CHUNK_SIZE, COMPRESSION_LEVELS, PARALLEL_MIN_SIZE, ZipWriter
+from .pdf_samples import text_pdf
+
+
+def test_pool_conversion_after_in_process_conversion(tmp_path):
+    # Genug Text, damit document.xml blockweise im Thread-Pool komprimiert wird
+    pdf_path = text_pdf(tmp_path / "lang.pdf", pages=600, prefix="Eine etwas längere Zeile auf Seite")
+    convert_pdf_to_docx(str(pdf_path), str(tmp_path / "vorher.docx"))
+    with zipfile.ZipFile(tmp_path / "vorher.docx") as archive:
+        assert archive.getinfo("word/document.xml").file_size >= PARALLEL_MIN_SIZE
+
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    results = []
+    # Geerbte, tote Pool-Threads ließen die Worker sonst für immer warten
+    thread = threading.Thread(target=lambda: results.extend(
+        convert_many([str(pdf_path)] * 2, str(output_dir), jobs=2)), daemon=True)
+    thread.start()
+    thread.join(timeout=60)
+    assert not thread.is_alive()
+    assert [result.status for result in results] == ["ok", "ok"]
+
+
+
+def test_docx_entries_match_python_docx(tmp_path):
+    document = docx.Document()
+    document.add_paragraph("Inhalt")
+    saved = io.BytesIO()
+    document.save(saved)
+    with zipfile.ZipFile(saved) as archive:
+        expected = [(item.filename, archive.read(item.filename)) for item in archive.infolist()]
+    assert docx_entries(document) == expected
+
+
+def test_store_writes_parts_without_deflate(tmp_path, monkeypatch):
+    pdf_path = text_pdf(tmp_path / "a.pdf")
+    calls = []
+    original_compressobj = zlib.compressobj
+    monkeypatch.setattr(zlib, "compressobj", lambda *args, **kwargs: calls.append(args)
+                        or original_compressobj(*args, **kwargs))
+    convert_job(str(pdf_path), str(tmp_path / "a.docx"), compression="store")
+    assert calls == []
+    with zipfile.ZipFile(tmp_path / "a.docx") as archive:
+        assert {item.compress_type for item in archive.infolist()} == {zipfile.ZIP_STORED}
+    assert docx.Document(str(tmp_path / "a.docx")).paragraphs
+
+
+def zip_entry(data: bytes, compression: str = "default") -> bytes:
+    output = io.BytesIO()
+    writer = ZipWriter(output, compression)
+    writer.write("teil.xml", data)
+    writer.close()
+    return output.getvalue()
+
+
+def one_shot_deflate(data: bytes, level: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush()
+
+
+def sample_data(size: int) -> bytes:
+    lines = (f"<w:p>Zeile {number} mit etwas Text</w:p>".encode() for number in range(size // 20))
+    return b"".join(lines)[:size]
+
+
+def test_small_parts_match_one_shot_deflate():
+    data = sample_data(PARALLEL_MIN_SIZE - 1)
+    assert one_shot_deflate(data, COMPRESSION_LEVELS["default"]) in zip_entry(data)
+
+
+def test_large_parts_do_not_depend_on_thread_count(monkeypatch):
+    data = sample_data(CHUNK_SIZE * 3 + 12345)
+    archives = []
+    for threads in (1, 4):
+        monkeypatch.setattr(zipwriter, "_pool", SharedThreadPool(threads, "deflate-test"))
+        archives.append(zip_entry(data))
+    assert archives[0] == archives[1]
+    with zipfile.ZipFile(io.BytesIO(archives[0])) as archive:
+        assert archive.read("teil.xml") == data
+    # Blockweise komprimiert: gültig und reproduzierbar, aber nicht wie in einem Stück
+    assert one_shot_deflate(data, COMPRESSION_LEVELS["default"]) not in archives[0]